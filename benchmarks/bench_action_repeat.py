@@ -0,0 +1,102 @@
+"""
+Action repeat (frame skip): cost per simulated second, and whether it matches
+stepping the plain env with each action repeated.
+
+For each --repeats k, plays seeded episodes with random actions in
+LunarLanderEnv(action_repeat=k) and in an action_repeat=1 env that is given
+every action k times (until the episode ends). Observations and done flags
+must match exactly, and each repeated step's reward must match the sum of the
+plain steps' rewards up to float32 rounding (they are added in another order).
+Both step paths (fast_step off and on) are checked. Then runs a policy
+closed-loop and reports policy calls, policy time and total time per
+simulated second. Exits non-zero on any mismatch.
+
+    python benchmarks/bench_action_repeat.py custom_lunar/best_model1.zip --repeats 1 2 4 8
+"""
+
+import argparse
+import math
+import os
+import sys
+import time
+import warnings
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+warnings.filterwarnings("ignore")
+
+from lunar_lander.Lunar_Lander_custom_env import LunarLanderEnv
+from lunar_lander.numpy_policy import NumpyPolicy
+
+
+def matches_plain(k, seed, fast_step):
+    repeated = LunarLanderEnv(render_mode="none", action_repeat=k, fast_step=fast_step)
+    plain = LunarLanderEnv(render_mode="none", fast_step=fast_step)
+    repeated.reset(seed=seed)
+    plain.reset(seed=seed)
+    rng = np.random.default_rng(seed)
+    done = False
+    while not done:
+        action = rng.uniform(-1, 1, 2).astype(np.float32)
+        obs, reward, done, _, _ = repeated.step(action)
+        total = 0.0
+        for _ in range(k):
+            plain_obs, plain_reward, plain_done, _, _ = plain.step(action)
+            total += plain_reward
+            if plain_done:
+                break
+        if (obs.tobytes() != plain_obs.tobytes() or done != plain_done or repeated.steps != plain.steps
+                or not math.isclose(reward, total, rel_tol=1e-6, abs_tol=1e-6)):
+            return False
+    return True
+
+
+def cost_per_second(policy, k, seconds):
+    """Closed-loop policy + env: (policy calls, policy us, total us) per simulated second."""
+    env = LunarLanderEnv(render_mode="none", action_repeat=k, fast_step=True)
+    obs, _ = env.reset(seed=0)
+    frames = calls = 0
+    policy_ns = 0
+    start = time.perf_counter_ns()
+    while frames < seconds * 60:
+        before = env.steps
+        t = time.perf_counter_ns()
+        action, _ = policy.predict(obs)
+        policy_ns += time.perf_counter_ns() - t
+        obs, _, done, _, _ = env.step(action)
+        calls += 1
+        frames += env.steps - before
+        if done:
+            obs, _ = env.reset()
+    elapsed = time.perf_counter_ns() - start
+    simulated = frames / 60
+    return calls / simulated, policy_ns / simulated / 1e3, elapsed / simulated / 1e3
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("model", nargs="?", default="custom_lunar/best_model1.zip")
+    parser.add_argument("--repeats", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--episodes", type=int, default=20, help="equivalence check episodes per k")
+    parser.add_argument("--seconds", type=float, default=300.0, help="simulated seconds timed per k")
+    args = parser.parse_args()
+
+    failed = []
+    for k in args.repeats:
+        for fast_step in (False, True):
+            failed += [(k, seed, fast_step) for seed in range(args.episodes) if not matches_plain(k, seed, fast_step)]
+    print(f"equivalence with repeated plain steps: {len(failed)} episodes differ {failed[:5]}")
+
+    policy = NumpyPolicy.from_model(args.model)
+    baseline = None
+    print(f"{'k':>3s} {'policy calls/s':>15s} {'policy us/s':>12s} {'total us/s':>11s} {'speedup':>8s}")
+    for k in args.repeats:
+        calls, policy_us, total_us = cost_per_second(policy, k, args.seconds)
+        baseline = baseline or total_us
+        print(f"{k:3d} {calls:15.1f} {policy_us:12.0f} {total_us:11.0f} {baseline / total_us:7.2f}x")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""
+Training throughput with no evaluation, EvalCallback and AsyncEvalCallback.
+
+Trains the custom_run PPO setup for --timesteps with each evaluation mode and
+reports timesteps/sec and how long training was paused inside the eval
+callback. The synchronous callback stops for every evaluation; the async one
+only pays for the state_dict snapshot, so with a spare core its throughput is
+close to the no-eval run. On a single core the evaluator process competes with
+training for CPU and the wall-clock gain shrinks, but the pause figure still
+shows what was moved off the training loop. Exits non-zero if the async run
+recorded no evaluations.
+
+    python benchmarks/bench_async_eval.py --timesteps 40960 --eval-freq 4096
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+import warnings
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+warnings.filterwarnings("ignore")
+
+from stable_baselines3 import PPO
+from stable_baselines3.common.callbacks import EvalCallback
+
+from lunar_lander.async_eval import AsyncEvalCallback
+from lunar_lander.custom_run import PPO_KWARGS
+from lunar_lander.Lunar_Lander_custom_env import LunarLanderEnv
+
+
+class Timed:
+    """Wraps a callback's _on_step and adds up the time spent in it."""
+
+    def __init__(self, callback):
+        self.seconds = 0.0
+        on_step = callback._on_step
+
+        def timed_on_step():
+            start = time.perf_counter()
+            result = on_step()
+            self.seconds += time.perf_counter() - start
+            return result
+
+        callback._on_step = timed_on_step
+
+
+def train(mode, timesteps, eval_freq, episodes, max_in_flight, log_dir):
+    env = LunarLanderEnv(render_mode="none")
+    model = PPO("MlpPolicy", env, verbose=0, seed=0, **PPO_KWARGS)
+    callback = None
+    timer = None
+    if mode == "sync":
+        callback = EvalCallback(LunarLanderEnv(render_mode="none"), best_model_save_path=log_dir,
+                                log_path=log_dir, eval_freq=eval_freq, n_eval_episodes=episodes, verbose=0)
+    elif mode == "async":
+        callback = AsyncEvalCallback(eval_freq=eval_freq, n_eval_episodes=episodes, best_model_save_path=log_dir,
+                                     log_path=log_dir, max_in_flight=max_in_flight, verbose=0)
+    if callback is not None:
+        timer = Timed(callback)
+    start = time.perf_counter()
+    model.learn(timesteps, callback=callback)
+    elapsed = time.perf_counter() - start
+    env.close()
+    evaluations = 0
+    if callback is not None:
+        evaluations = len(np.load(os.path.join(log_dir, "evaluations.npz"))["timesteps"])
+    return elapsed, timer.seconds if timer else 0.0, evaluations, getattr(callback, "skipped", 0)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--timesteps", type=int, default=40960)
+    parser.add_argument("--eval-freq", type=int, default=4096)
+    parser.add_argument("--episodes", type=int, default=5, help="episodes per evaluation")
+    parser.add_argument("--max-in-flight", type=int, default=1)
+    args = parser.parse_args()
+
+    print(f"{os.cpu_count()} cpus, {args.timesteps} timesteps, eval every {args.eval_freq} "
+          f"({args.episodes} episodes)")
+    async_evaluations = 0
+    baseline = None
+    for mode in ("none", "sync", "async"):
+        with tempfile.TemporaryDirectory() as log_dir:
+            elapsed, paused, evaluations, skipped = train(mode, args.timesteps, args.eval_freq, args.episodes,
+                                                          args.max_in_flight, log_dir)
+        rate = args.timesteps / elapsed
+        baseline = baseline or rate
+        print(f"{mode:>5s}  {rate:8.0f} timesteps/sec ({100 * rate / baseline:5.1f}%)  "
+              f"paused {paused:6.2f}s  evaluations {evaluations}  skipped {skipped}")
+        if mode == "async":
+            async_evaluations = evaluations
+    sys.exit(0 if async_evaluations else 1)
+
+
+if __name__ == "__main__":
+    main()
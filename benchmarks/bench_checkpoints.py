@@ -0,0 +1,100 @@
+"""
+Checkpoint stall time and disk use: model.save zips against CheckpointStore.
+
+Trains PPO on LunarLander-v3 like main.py (with --timesteps per iteration
+instead of 10000) and checkpoints after every iteration both ways. Reports
+how long training waits for each save and the disk each approach ends up
+using, then exports every retained checkpoint as a zip and exits non-zero
+unless its parameters equal the model.save zip taken at the same point and
+the export loads with PPO.load.
+
+    python benchmarks/bench_checkpoints.py --iterations 100
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+import warnings
+
+import gymnasium as gym
+import torch
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+warnings.filterwarnings("ignore")
+
+from stable_baselines3 import PPO
+from stable_baselines3.common.save_util import load_from_zip_file
+from stable_baselines3.common.utils import safe_mean
+
+from lunar_lander.checkpoints import CheckpointStore
+
+
+def same_params(a, b):
+    if isinstance(a, dict):
+        return a.keys() == b.keys() and all(same_params(a[key], b[key]) for key in a)
+    if isinstance(a, (list, tuple)):
+        return len(a) == len(b) and all(same_params(x, y) for x, y in zip(a, b))
+    if isinstance(a, torch.Tensor):
+        return torch.equal(a, b)
+    return a == b
+
+
+def directory_size(path):
+    return sum(os.path.getsize(os.path.join(d, f)) for d, _, files in os.walk(path) for f in files)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--iterations", type=int, default=60)
+    parser.add_argument("--timesteps", type=int, default=256, help="timesteps learned between checkpoints")
+    args = parser.parse_args()
+
+    env = gym.make("LunarLander-v3")
+    model = PPO("MlpPolicy", env, verbose=0, seed=0, n_steps=256, batch_size=64, n_epochs=1)
+    zip_stall = []
+    store_stall = []
+    with tempfile.TemporaryDirectory() as tmp:
+        zip_dir = os.path.join(tmp, "zips")
+        os.makedirs(zip_dir)
+        store = CheckpointStore(os.path.join(tmp, "store"), keep_last=5, keep_best=3)
+        for i in range(args.iterations):
+            model.learn(total_timesteps=args.timesteps, reset_num_timesteps=False)
+            name = args.timesteps * i
+            start = time.perf_counter()
+            model.save(os.path.join(zip_dir, str(name)))
+            zip_stall.append(time.perf_counter() - start)
+            start = time.perf_counter()
+            store.save(model, name=name, reward=safe_mean([ep["r"] for ep in model.ep_info_buffer]))
+            store_stall.append(time.perf_counter() - start)
+        start = time.perf_counter()
+        store.close()
+        drain = time.perf_counter() - start
+
+        kept = store.checkpoints()
+        mismatches = 0
+        for manifest in kept:
+            exported = store.export(manifest["name"], os.path.join(tmp, "export.zip"))
+            _, expected, _ = load_from_zip_file(os.path.join(zip_dir, manifest["name"] + ".zip"), device="cpu")
+            _, actual, _ = load_from_zip_file(exported, device="cpu")
+            if not same_params(expected, actual):
+                mismatches += 1
+        PPO.load(store.export("best", os.path.join(tmp, "best.zip")), device="cpu")
+
+        zip_bytes = directory_size(zip_dir)
+        store_bytes = store.disk_usage()
+        reused = store.blobs_reused / (store.blobs_reused + store.blobs_written)
+        print(f"{args.iterations} checkpoints")
+        print(f"model.save        stall {1e3 * sum(zip_stall) / len(zip_stall):7.2f} ms/checkpoint  "
+              f"disk {zip_bytes / 1e6:7.2f} MB ({args.iterations} zips)")
+        print(f"CheckpointStore   stall {1e3 * sum(store_stall) / len(store_stall):7.2f} ms/checkpoint  "
+              f"disk {store_bytes / 1e6:7.2f} MB ({len(kept)} kept: {', '.join(m['name'] for m in kept)})")
+        print(f"store wrote {store.bytes_written / 1e6:.2f} MB, {100 * reused:.0f}% of blobs already stored, "
+              f"close() waited {1e3 * drain:.1f} ms")
+        print(f"exported {len(kept)} checkpoints, {mismatches} differ from model.save")
+    sys.exit(1 if mismatches else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+"""
+Physics fidelity profiles: how far each one drifts from the most accurate
+profile, and how much faster it steps.
+
+Records seeded action sequences under the --reference profile (from a policy
+when a model is given, else random actions), then replays the same actions
+under every profile in physics.FIDELITY_PROFILES. Reports the lander
+position divergence from the reference (max over each episode, mean and p95
+over episodes), how many episodes end with a different outcome
+(landed/crashed/timeout), and env steps/sec. With a model, also plays every
+profile closed-loop on the same seeds and prints its success rate. Each
+profile is replayed twice; exits non-zero if the two runs differ.
+
+    python benchmarks/bench_fidelity.py custom_lunar/best_model1.zip --episodes 200
+"""
+
+import argparse
+import os
+import sys
+import time
+import warnings
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+warnings.filterwarnings("ignore")
+
+from lunar_lander.Lunar_Lander_custom_env import LunarLanderEnv
+from lunar_lander.physics import FIDELITY_PROFILES
+from lunar_lander.recorder import CRASHED, LANDED, OUTCOMES, TIMEOUT
+
+
+def outcome(env, terminated, truncated):
+    if terminated:
+        return LANDED if env.physics.landed_successfully else CRASHED
+    return TIMEOUT if truncated else None
+
+
+def play(env, seed, policy):
+    """One closed-loop episode: actions, lander positions after each step, outcome."""
+    obs, _ = env.reset(seed=seed)
+    rng = np.random.default_rng(seed)
+    actions, positions = [], []
+    result = None
+    while result is None:
+        action = policy.predict(obs)[0] if policy is not None else rng.uniform(-1, 1, 2).astype(np.float32)
+        obs, _, terminated, truncated, _ = env.step(action)
+        actions.append(action)
+        positions.append(tuple(env.physics.lander.position))
+        result = outcome(env, terminated, truncated)
+    return actions, np.array(positions), result
+
+
+def replay(env, seed, actions):
+    """
+    The recorded actions open-loop. The episode stops early if it ends sooner;
+    if it outlasts them (say a touchdown noticed a step later), zero actions
+    follow until it ends.
+    """
+    env.reset(seed=seed)
+    idle = np.zeros(2, dtype=np.float32)
+    positions = []
+    result = None
+    while result is None:
+        action = actions[len(positions)] if len(positions) < len(actions) else idle
+        _, _, terminated, truncated, _ = env.step(action)
+        positions.append(tuple(env.physics.lander.position))
+        result = outcome(env, terminated, truncated)
+    return np.array(positions), result
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("model", nargs="?", default=None, help="PPO zip whose policy picks the actions")
+    parser.add_argument("--episodes", type=int, default=100)
+    parser.add_argument("--reference", choices=sorted(FIDELITY_PROFILES), default="precise")
+    args = parser.parse_args()
+
+    policy = None
+    if args.model:
+        from lunar_lander.numpy_policy import NumpyPolicy
+
+        policy = NumpyPolicy.from_model(args.model)
+
+    reference_env = LunarLanderEnv(render_mode="none", fidelity=args.reference)
+    recorded = [play(reference_env, seed, policy) for seed in range(args.episodes)]
+    reference_env.close()
+
+    nondeterministic = []
+    print(f"{'profile':10s} {'steps/s':>9s} {'mean drift':>11s} {'p95 drift':>10s} {'outcome changes':>16s}"
+          + ("  closed-loop landed" if policy else ""))
+    for name in FIDELITY_PROFILES:
+        env = LunarLanderEnv(render_mode="none", fidelity=name)
+        runs = []
+        best = float("inf")
+        for _ in range(2):
+            start = time.perf_counter()
+            runs.append([replay(env, seed, actions) for seed, (actions, _, _) in enumerate(recorded)])
+            best = min(best, time.perf_counter() - start)
+        first, second = runs
+        if any(not np.array_equal(a[0], b[0]) or a[1] != b[1] for a, b in zip(first, second)):
+            nondeterministic.append(name)
+
+        drift = []
+        changes = {}
+        for (positions, result), (_, reference, reference_result) in zip(first, recorded):
+            common = min(len(positions), len(reference))
+            drift.append(np.linalg.norm(positions[:common] - reference[:common], axis=1).max())
+            if result != reference_result:
+                key = f"{OUTCOMES[reference_result]}->{OUTCOMES[result]}"
+                changes[key] = changes.get(key, 0) + 1
+        steps = sum(len(positions) for positions, _ in first)
+        line = (f"{name:10s} {steps / best:9.0f} {np.mean(drift):9.4f} m {np.percentile(drift, 95):8.4f} m "
+                f"{sum(changes.values()):16d}")
+        if policy is not None:
+            landed = sum(play(env, seed, policy)[2] == LANDED for seed in range(args.episodes))
+            line += f"  {landed / args.episodes:18.1%}"
+        print(line + (f"  {changes}" if changes else ""))
+        env.close()
+
+    print(f"nondeterministic profiles: {nondeterministic or 'none'}")
+    sys.exit(1 if nondeterministic else 0)
+
+
+if __name__ == "__main__":
+    main()
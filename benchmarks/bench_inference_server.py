@@ -0,0 +1,68 @@
+"""
+Batched inference server against a policy in every process.
+
+Starts an InferenceServer for the given PPO zip under several batching
+policies, drives it from --clients env processes for --seconds each, and
+prints env steps/sec with client-side predict p50/p99 (socket round trip
+included). The baseline loads its own NumpyPolicy in every client process.
+Exits non-zero if a served action differs from the local policy's by more
+than --tolerance (batch size changes float32 rounding in the matmuls).
+
+    python benchmarks/bench_inference_server.py custom_lunar/best_model1.zip --clients 16 --seconds 5
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import warnings
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+warnings.filterwarnings("ignore")
+
+from lunar_lander.inference_server import InferenceClient, run_load, start_server
+from lunar_lander.numpy_policy import NumpyPolicy
+
+# label -> (max_batch, max_wait in seconds)
+POLICIES = {
+    "server, no batching": (1, 0.0),
+    "server, same-iteration batching": (256, 0.0),
+    "server, max-wait 0.5 ms": (256, 0.0005),
+    "server, max-wait 2 ms": (256, 0.002),
+}
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("model", nargs="?", default="custom_lunar/best_model1.zip")
+    parser.add_argument("--clients", type=int, default=8)
+    parser.add_argument("--seconds", type=float, default=5.0)
+    parser.add_argument("--tolerance", type=float, default=1e-5)
+    args = parser.parse_args()
+
+    socket_path = os.path.join(tempfile.mkdtemp(), "policy.sock")
+    obs = np.random.default_rng(0).normal(size=(256, 6)).astype(np.float32)
+    expected, _ = NumpyPolicy.from_model(args.model).predict(obs)
+    mismatches = 0
+
+    result = run_load(None, args.clients, args.seconds, args.model)
+    print(f"{'local NumpyPolicy':32s} {result['steps_per_sec']:9.0f} steps/s  "
+          f"p50 {result['p50_us']:8.1f} us  p99 {result['p99_us']:8.1f} us")
+    for label, (max_batch, max_wait) in POLICIES.items():
+        server = start_server(args.model, socket_path, max_batch=max_batch, max_wait=max_wait)
+        with InferenceClient(socket_path) as client:
+            mismatches += int(np.abs(client.predict(obs)[0] - expected).max() > args.tolerance)
+            mismatches += int(np.abs(client.predict(obs[0])[0] - expected[0]).max() > args.tolerance)
+        result = run_load(socket_path, args.clients, args.seconds)
+        server.terminate()
+        server.join()
+        print(f"{label:32s} {result['steps_per_sec']:9.0f} steps/s  "
+              f"p50 {result['p50_us']:8.1f} us  p99 {result['p99_us']:8.1f} us")
+    print(f"{mismatches} served predictions differ from the local policy")
+    sys.exit(1 if mismatches else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""
+MultiLanderVecEnv (N landers in one b2World) against a DummyVecEnv of N
+LunarLanderEnvs: env steps/sec for each --num-envs, and a parity check.
+
+The parity check feeds both VecEnvs the same seeds and random actions for
+--parity-steps steps (several episodes per env, through auto-resets) and
+compares observations, rewards, dones and terminal observations bit for bit.
+Exits non-zero on any difference.
+
+    python benchmarks/bench_multi_lander.py --num-envs 16 64 256
+"""
+
+import argparse
+import os
+import sys
+import time
+import warnings
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+warnings.filterwarnings("ignore")
+
+from stable_baselines3.common.vec_env import DummyVecEnv
+
+from lunar_lander.Lunar_Lander_custom_env import LunarLanderEnv
+from lunar_lander.multi_lander import MultiLanderVecEnv
+
+
+def dummy_vec_env(num_envs, fidelity):
+    return DummyVecEnv([lambda: LunarLanderEnv(render_mode="none", fidelity=fidelity) for _ in range(num_envs)])
+
+
+def random_actions(rng, num_envs):
+    # thrust around the hover point so landers spend time near and on the ground
+    return np.stack([rng.uniform(0.0, 0.8, num_envs), rng.uniform(-3.0, 3.0, num_envs)], axis=-1).astype(np.float32)
+
+
+def check_parity(num_envs, steps, fidelity, seed=100):
+    """Number of steps on which the two VecEnvs disagree in any lane."""
+    envs = [MultiLanderVecEnv(num_envs, fidelity=fidelity), dummy_vec_env(num_envs, fidelity)]
+    for env in envs:
+        env.seed(seed)
+    observations = [env.reset() for env in envs]
+    mismatches = int(observations[0].tobytes() != observations[1].tobytes())
+    rng = np.random.default_rng(seed)
+    for _ in range(steps):
+        actions = random_actions(rng, num_envs)
+        (obs, rewards, dones, infos), (ref_obs, ref_rewards, ref_dones, ref_infos) = [env.step(actions) for env in envs]
+        same = (obs.tobytes() == ref_obs.tobytes() and rewards.tobytes() == ref_rewards.tobytes()
+                and np.array_equal(dones, ref_dones))
+        for i in np.flatnonzero(dones):
+            same = same and infos[i]["terminal_observation"].tobytes() == ref_infos[i]["terminal_observation"].tobytes()
+        mismatches += not same
+    return mismatches
+
+
+def steps_per_sec(env, steps, seed=0):
+    env.seed(seed)
+    env.reset()
+    rng = np.random.default_rng(seed)
+    actions = [random_actions(rng, env.num_envs) for _ in range(64)]
+    start = time.perf_counter()
+    for t in range(steps):
+        env.step(actions[t % len(actions)])
+    return steps * env.num_envs / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--num-envs", type=int, nargs="+", default=[16, 64, 256])
+    parser.add_argument("--steps", type=int, default=300, help="timed VecEnv steps per size")
+    parser.add_argument("--parity-envs", type=int, default=32)
+    parser.add_argument("--parity-steps", type=int, default=3000)
+    parser.add_argument("--fidelity", default="default")
+    args = parser.parse_args()
+
+    mismatches = check_parity(args.parity_envs, args.parity_steps, args.fidelity)
+    print(f"parity over {args.parity_envs} envs x {args.parity_steps} steps: {mismatches} steps differ")
+
+    print(f"{'envs':>5s} {'DummyVecEnv':>12s} {'MultiLander':>12s} {'speedup':>8s}   (env steps/s)")
+    for num_envs in args.num_envs:
+        baseline = steps_per_sec(dummy_vec_env(num_envs, args.fidelity), args.steps)
+        shared = steps_per_sec(MultiLanderVecEnv(num_envs, fidelity=args.fidelity), args.steps)
+        print(f"{num_envs:5d} {baseline:12.0f} {shared:12.0f} {shared / baseline:7.2f}x")
+    sys.exit(1 if mismatches else 0)
+
+
+if __name__ == "__main__":
+    main()
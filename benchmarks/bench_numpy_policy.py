@@ -0,0 +1,116 @@
+"""
+NumpyPolicy against PPO.predict: startup time, per-call latency and actions.
+
+Exports the given PPO zips, compares deterministic actions on observations
+from random-action rollouts of the matching env (max abs difference for Box
+actions, agreement for discrete ones), then times predict on one observation
+and on a batch, and how long a fresh interpreter takes to load each policy
+and produce its first action. Exits non-zero if any Box action differs by
+more than --tolerance or any discrete action differs.
+
+    python benchmarks/bench_numpy_policy.py custom_lunar/best_model1.zip models/PPO/880000.zip
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+import time
+import warnings
+
+import gymnasium as gym
+import numpy as np
+
+SRC = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src")
+sys.path.insert(0, SRC)
+warnings.filterwarnings("ignore")
+
+from stable_baselines3 import PPO
+
+from lunar_lander.Lunar_Lander_custom_env import LunarLanderEnv
+from lunar_lander.numpy_policy import NumpyPolicy, export_policy
+
+STARTUP = {
+    "PPO.predict": "from stable_baselines3 import PPO\nmodel = PPO.load({path!r}, device='cpu')",
+    "NumpyPolicy": "from lunar_lander.numpy_policy import NumpyPolicy\nmodel = NumpyPolicy.load({npz!r})",
+}
+
+
+def observations(model, count):
+    """Observations from random-action rollouts in the env the model was trained on."""
+    env = LunarLanderEnv(render_mode="none") if model.observation_space.shape == (6,) else gym.make("LunarLander-v3")
+    env.action_space.seed(0)
+    obs, _ = env.reset(seed=0)
+    collected = []
+    while len(collected) < count:
+        collected.append(obs)
+        obs, _, terminated, truncated, _ = env.step(env.action_space.sample())
+        if terminated or truncated:
+            obs, _ = env.reset()
+    return np.array(collected, dtype=np.float32)
+
+
+def per_call_us(predict, obs, calls):
+    best = float("inf")
+    for _ in range(3):
+        start = time.perf_counter()
+        for _ in range(calls):
+            predict(obs)
+        best = min(best, time.perf_counter() - start)
+    return best / calls * 1e6
+
+
+def startup_seconds(code, obs_dim):
+    script = "\n".join([
+        "import sys, time, warnings", "start = time.perf_counter()", f"sys.path.insert(0, {SRC!r})",
+        "warnings.filterwarnings('ignore')", "import numpy as np", code,
+        f"model.predict(np.zeros({obs_dim}, dtype=np.float32))", "print(time.perf_counter() - start)",
+    ])
+    runs = [float(subprocess.run([sys.executable, "-c", script], capture_output=True, text=True,
+                                 check=True).stdout.split()[-1]) for _ in range(3)]
+    return min(runs)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("models", nargs="+", help="saved PPO zips")
+    parser.add_argument("--observations", type=int, default=5000)
+    parser.add_argument("--batch", type=int, default=256)
+    parser.add_argument("--calls", type=int, default=2000)
+    parser.add_argument("--tolerance", type=float, default=1e-4)
+    args = parser.parse_args()
+
+    failed = False
+    with tempfile.TemporaryDirectory() as tmp:
+        for path in args.models:
+            npz = export_policy(path, os.path.join(tmp, os.path.basename(path) + ".npz"))
+            model = PPO.load(path, device="cpu")
+            policy = NumpyPolicy.load(npz)
+            obs = observations(model, args.observations)
+
+            expected, _ = model.predict(obs, deterministic=True)
+            actual, _ = policy.predict(obs)
+            single = np.array([policy.predict(o)[0] for o in obs[:500]])
+            if policy.action_kind == "argmax":
+                mismatches = int((expected != actual).sum() + (expected[:500] != single).sum())
+                agreement = f"{mismatches} of {len(obs) + 500} discrete actions differ"
+                failed |= mismatches > 0
+            else:
+                error = max(np.abs(expected - actual).max(), np.abs(expected[:500] - single).max())
+                agreement = f"max abs action difference {error:.2e}"
+                failed |= error > args.tolerance
+
+            print(f"{path}: {os.path.getsize(npz) / 1e3:.0f} kB npz, {agreement}")
+            batch = obs[:args.batch]
+            for name, predict in (("PPO.predict", lambda o: model.predict(o, deterministic=True)),
+                                  ("NumpyPolicy", policy.predict)):
+                code = STARTUP[name].format(path=os.path.abspath(path), npz=npz)
+                print(f"  {name:12s} single {per_call_us(predict, obs[0], args.calls):8.1f} us  "
+                      f"batch of {args.batch} {per_call_us(predict, batch, args.calls // 10):8.1f} us  "
+                      f"startup {startup_seconds(code, obs.shape[1]):6.2f} s")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
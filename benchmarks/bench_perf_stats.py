@@ -0,0 +1,130 @@
+"""
+Cost of the perf_stats instrumentation in LunarLanderEnv.
+
+Checks that timing does not change observations or rewards, measures step
+throughput with perf_stats off and on, and bounds what the disabled path costs:
+when off, a default step runs PERF_CHECKS_PER_STEP `perf is not None` checks
+plus two attribute loads, which are timed on their own and compared with the
+step time. Exits non-zero if that is more than --max-overhead of a step.
+
+    python benchmarks/bench_perf_stats.py
+"""
+
+import argparse
+import os
+import sys
+import time
+import timeit
+import warnings
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+warnings.filterwarnings("ignore")
+
+from lunar_lander.Lunar_Lander_custom_env import LunarLanderEnv
+
+# env.step: 6 checks when not rendering; PhysicsWorld.step: 3
+PERF_CHECKS_PER_STEP = 9
+
+
+def random_actions(steps, seed=0):
+    rng = np.random.default_rng(seed)
+    return np.stack([rng.uniform(0.0, 0.8, steps), rng.uniform(-3.0, 3.0, steps)], axis=-1).astype(np.float32)
+
+
+def rollout(env, actions):
+    obs, _ = env.reset(seed=0)
+    trajectory = [obs]
+    rewards = []
+    for action in actions:
+        obs, reward, done, _, _ = env.step(action)
+        trajectory.append(obs)
+        rewards.append(reward)
+        if done:
+            obs, _ = env.reset()
+    return np.array(trajectory), np.array(rewards)
+
+
+def steps_per_sec(env, actions, rounds):
+    best = float("inf")
+    for _ in range(rounds):
+        env.reset(seed=0)
+        start = time.perf_counter()
+        for action in actions:
+            _, _, done, _, _ = env.step(action)
+            if done:
+                env.reset()
+        best = min(best, time.perf_counter() - start)
+    return len(actions) / best
+
+
+class _Holder:
+    perf = None
+
+
+def disabled_check_ns():
+    """Time of the disabled-path checks for one step, minus an empty call."""
+    holder = _Holder()
+
+    def checks():
+        perf = holder.perf
+        if perf is not None: pass
+        if perf is not None: pass
+        if perf is not None: pass
+        if perf is not None: pass
+        if perf is not None: pass
+        if perf is not None: pass
+        perf = holder.perf
+        if perf is not None: pass
+        if perf is not None: pass
+        if perf is not None: pass
+
+    def empty():
+        pass
+
+    number = 200000
+    checked = min(timeit.repeat(checks, number=number, repeat=5)) / number
+    bare = min(timeit.repeat(empty, number=number, repeat=5)) / number
+    return max(checked - bare, 0.0) * 1e9
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--steps", type=int, default=5000)
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--max-overhead", type=float, default=0.01,
+                        help="allowed disabled-path cost as a fraction of a step (default 0.01)")
+    args = parser.parse_args()
+
+    actions = random_actions(args.steps)
+    off = LunarLanderEnv(render_mode="none")
+    on = LunarLanderEnv(render_mode="none", perf_stats=True)
+
+    off_obs, off_rewards = rollout(off, actions)
+    on_obs, on_rewards = rollout(on, actions)
+    identical = np.array_equal(off_obs, on_obs) and np.array_equal(off_rewards, on_rewards)
+    print(f"identical results with perf_stats on: {identical}")
+
+    off_rate = steps_per_sec(off, actions, args.rounds)
+    on_rate = steps_per_sec(on, actions, args.rounds)
+    print(f"perf_stats off  {off_rate:10,.0f} steps/sec")
+    print(f"perf_stats on   {on_rate:10,.0f} steps/sec  ({100 * (off_rate / on_rate - 1):.1f}% slower)")
+
+    step_ns = 1e9 / off_rate
+    check_ns = disabled_check_ns()
+    overhead = check_ns / step_ns
+    print(f"disabled checks {check_ns:10.1f} ns/step  ({100 * overhead:.2f}% of a {step_ns / 1e3:.1f} us step)")
+
+    print("\nphase timings with perf_stats on:")
+    for phase, entry in sorted(on.get_perf_stats().items()):
+        print(f"  {phase:14s} {entry['count']:8d} calls  mean {entry['mean_us']:8.2f} us  "
+              f"p50 {entry['p50_us']:8.2f} us  p99 {entry['p99_us']:8.2f} us")
+    off.close()
+    on.close()
+
+    sys.exit(0 if identical and overhead <= args.max_overhead else 1)
+
+
+if __name__ == "__main__":
+    main()
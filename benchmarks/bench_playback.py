@@ -0,0 +1,102 @@
+"""
+Human-mode playback: pacing, CPU use and frame timing.
+
+Plays --episodes episodes of the policy in a human-mode window (SDL's dummy
+video driver unless a display is configured, so it runs headless) with the
+old loop, which drew every step inside step() and then again with
+env.render(), and with PlaybackRunner at 1x and --fast-speed, plus
+PlaybackRunner without rendering. For each it reports wall seconds per
+simulated second, the share of a core used, frames drawn per second and the
+p99 interval between frames. Exits non-zero if 1x playback strays more than
+10% from real time.
+
+    python benchmarks/bench_playback.py custom_lunar/best_model1.zip --episodes 3
+"""
+
+import argparse
+import os
+import sys
+import time
+import warnings
+
+import numpy as np
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+warnings.filterwarnings("ignore")
+
+from lunar_lander.Lunar_Lander_custom_env import LunarLanderEnv
+from lunar_lander.numpy_policy import NumpyPolicy
+from lunar_lander.playback import PlaybackRunner
+
+
+def count_frames(env):
+    """Timestamps of every frame the env's renderer presents."""
+    stamps = []
+    update = env.renderer.update
+
+    def counted():
+        update()
+        stamps.append(time.perf_counter())
+
+    env.renderer.update = counted
+    return stamps
+
+
+def old_loop(env, policy, episodes):
+    frames = 0
+    for _ in range(episodes):
+        obs, _ = env.reset()
+        done = False
+        while not done:
+            action, _ = policy.predict(obs)
+            obs, _, terminated, truncated, _ = env.step(action)
+            env.render()
+            done = terminated or truncated
+        frames += env.steps
+    return frames
+
+
+def measure(label, play, env):
+    stamps = count_frames(env) if env.renderer is not None else []
+    wall, cpu = time.perf_counter(), time.process_time()
+    frames = play()
+    wall, cpu = time.perf_counter() - wall, time.process_time() - cpu
+    simulated = frames / 60
+    intervals = np.diff(stamps) * 1e3 if len(stamps) > 1 else np.zeros(1)
+    print(f"{label:30s} {wall / simulated:10.3f} {cpu / wall:8.0%} {len(stamps) / wall:8.1f} "
+          f"{np.percentile(intervals, 99):11.1f}")
+    return wall / simulated
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("model", nargs="?", default="custom_lunar/best_model1.zip")
+    parser.add_argument("--episodes", type=int, default=3)
+    parser.add_argument("--fast-speed", type=float, default=8.0)
+    args = parser.parse_args()
+
+    policy = NumpyPolicy.from_model(args.model)
+    print(f"{'loop':30s} {'wall/sim s':>10s} {'CPU':>8s} {'frames/s':>8s} {'p99 gap ms':>11s}")
+
+    env = LunarLanderEnv(render_mode="human")
+    measure("old: render in and after step", lambda: old_loop(env, policy, args.episodes), env)
+    env.close()
+
+    real_time = None
+    for label, speed in (("PlaybackRunner 1x", 1.0), (f"PlaybackRunner {args.fast_speed:g}x", args.fast_speed)):
+        env = LunarLanderEnv(render_mode="human")
+        runner = PlaybackRunner(env, policy, speed=speed, end_pause=0.0)
+        ratio = measure(label, lambda: sum(frames for _, frames in runner.run(args.episodes)), env)
+        real_time = real_time or ratio
+        env.close()
+
+    env = LunarLanderEnv(render_mode="none")
+    runner = PlaybackRunner(env, policy, render=False)
+    measure("PlaybackRunner, no render", lambda: sum(frames for _, frames in runner.run(args.episodes)), env)
+    sys.exit(0 if abs(real_time - 1.0) <= 0.1 else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,134 @@
+"""
+EpisodeRecorder overhead, replay determinism and stats scan time.
+
+The recorder's cost per step is timed around an env that returns canned
+results, since it is too small to resolve reliably by comparing two
+LunarLanderEnv runs, and is reported against a real step. The script then
+records random-action episodes on unseeded resets, re-simulates each one from
+its recorded terrain and actions on an env built from the recording's
+settings, and exits non-zero unless every observation and reward matches the
+recording exactly, or if appending from an env with other settings is allowed.
+
+    python benchmarks/bench_recorder.py --episodes 500 [--action-repeat 4 --fidelity fast]
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+import warnings
+
+import gymnasium as gym
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+warnings.filterwarnings("ignore")
+
+from lunar_lander.Lunar_Lander_custom_env import LunarLanderEnv
+from lunar_lander.recorder import EpisodeRecorder, EpisodeReplayer
+
+
+def random_actions(steps, seed=0):
+    rng = np.random.default_rng(seed)
+    return np.stack([rng.uniform(0.0, 0.8, steps), rng.uniform(-3.0, 3.0, steps)], axis=-1).astype(np.float32)
+
+
+class CannedEnv(gym.Env):
+    """Returns the same step result every time, so timing it measures only the wrapper."""
+
+    action_repeat = 1
+
+    def __init__(self, physics):
+        self.physics = physics
+        self.obs = np.zeros(6, dtype=np.float32)
+
+    def reset(self, seed=None, options=None):
+        return self.obs, {}
+
+    def step(self, action):
+        return self.obs, np.float32(0.0), False, False, {}
+
+
+def ns_per_step(env, steps):
+    action = np.array([0.4, 0.0], dtype=np.float32)
+    env.reset()
+    best = float("inf")
+    for _ in range(5):
+        start = time.perf_counter()
+        for _ in range(steps):
+            env.step(action)
+        best = min(best, time.perf_counter() - start)
+    return best / steps * 1e9
+
+
+def run(env, actions, episodes=None):
+    env.reset(seed=0)
+    finished = 0
+    start = time.perf_counter()
+    for action in actions:
+        _, _, done, _, _ = env.step(action)
+        if done:
+            finished += 1
+            if finished == episodes:
+                break
+            env.reset()
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--steps", type=int, default=20000, help="steps per overhead measurement round")
+    parser.add_argument("--episodes", type=int, default=300, help="episodes recorded for the replay check")
+    parser.add_argument("--action-repeat", type=int, default=1, help="action_repeat of the recorded env")
+    parser.add_argument("--fidelity", default="default", help="fidelity of the recorded env")
+    args = parser.parse_args()
+
+    actions = random_actions(args.steps)
+    with tempfile.TemporaryDirectory() as tmp:
+        env = LunarLanderEnv(render_mode="none")
+        step_ns = min(run(env, actions) for _ in range(3)) / len(actions) * 1e9
+        canned = CannedEnv(env.physics)
+        recorded = EpisodeRecorder(CannedEnv(env.physics), os.path.join(tmp, "overhead"))
+        recorder_ns = ns_per_step(recorded, args.steps) - ns_per_step(canned, args.steps)
+        recorded.close()
+        print(f"LunarLanderEnv.step  {step_ns / 1e3:8.2f} us")
+        print(f"recorder per step    {recorder_ns / 1e3:8.2f} us  ({100 * recorder_ns / step_ns:.1f}% of a step)")
+
+        path = os.path.join(tmp, "episodes")
+        settings = dict(action_repeat=args.action_repeat, fidelity=args.fidelity)
+        env = EpisodeRecorder(LunarLanderEnv(render_mode="none", **settings), path)
+        run(env, random_actions(args.episodes * LunarLanderEnv.MAX_STEPS, seed=1), args.episodes)
+        env.close()
+
+        other = dict(action_repeat=args.action_repeat % 4 + 1, fidelity=args.fidelity)
+        try:
+            EpisodeRecorder(LunarLanderEnv(render_mode="none", **other), path).close()
+            refused = False
+        except ValueError:
+            refused = True
+        print(f"appending from an env with {other}: {'refused' if refused else 'ALLOWED'}")
+
+        replayer = EpisodeReplayer(path)
+        start = time.perf_counter()
+        stats = replayer.stats()
+        print(f"stats over {len(replayer)} episodes in {1e3 * (time.perf_counter() - start):.2f} ms: {stats}")
+
+        replay_env = replayer.make_env()
+        mismatches = 0
+        for index in range(len(replayer)):
+            _, recorded_obs, recorded_rewards = replayer.episode(index)
+            observations, rewards = replayer.resimulate(index, replay_env)
+            if not (np.array_equal(observations, recorded_obs) and np.array_equal(rewards, recorded_rewards)):
+                mismatches += 1
+        print(f"re-simulated {len(replayer)} episodes, {mismatches} differ from the recording")
+
+        frames = sum(1 for _ in replayer.render(0, LunarLanderEnv(render_mode="rgb_array", render_size=(84, 84),
+                                                                  **replayer.env_settings)))
+        print(f"rendered episode 0 from stored states: {frames} frames")
+
+    sys.exit(1 if mismatches or not refused else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""
+Render throughput in frames/sec for rgb_array at a few resolutions (human mode
+draws the same way but is capped at the env's step_fps). Also checks that an 800x600
+rgb_array frame matches what human mode draws on screen.
+
+    python benchmarks/bench_render.py --sizes 800x600 160x120 84x84
+"""
+
+import argparse
+import os
+import sys
+import time
+import warnings
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+
+import numpy as np
+import pygame
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+warnings.filterwarnings("ignore")
+
+from lunar_lander.Lunar_Lander_custom_env import LunarLanderEnv
+
+
+def frames_per_sec(env, frames):
+    env.reset(seed=0)
+    action = np.array([0.5, 0.5], dtype=np.float32)
+    env.step(action)
+    env.render()  # warm-up, creates the renderer
+    start = time.perf_counter()
+    for _ in range(frames):
+        env.render()
+    return frames / (time.perf_counter() - start)
+
+
+def check_frame_matches_screen():
+    human = LunarLanderEnv(render_mode="human")
+    offscreen = LunarLanderEnv(render_mode="rgb_array")
+    for env in (human, offscreen):
+        env.reset(seed=0)
+        env.step(np.array([0.5, 0.5], dtype=np.float32))
+    offscreen_frame = offscreen.render()
+    human.render()
+    screen = pygame.surfarray.array3d(human.renderer.screen).transpose(1, 0, 2)
+    same = offscreen_frame.shape == (600, 800, 3) and np.array_equal(offscreen_frame, screen)
+    human.close()
+    offscreen.close()
+    return same
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", nargs="+", default=["800x600", "160x120", "84x84"])
+    parser.add_argument("--frames", type=int, default=2000)
+    args = parser.parse_args()
+
+    same = check_frame_matches_screen()
+    print(f"rgb_array frame matches human screen: {same}")
+
+    for size in args.sizes:
+        width, height = map(int, size.split("x"))
+        env = LunarLanderEnv(render_mode="rgb_array", render_size=(width, height))
+        rate = frames_per_sec(env, args.frames)
+        env.close()
+        print(f"rgb_array {size:>9s}  {rate:10,.0f} frames/sec")
+    sys.exit(0 if same else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+"""
+CompactReplayBuffer against stable-baselines3's ReplayBuffer.
+
+Fills both with transitions from LunarLanderEnv (random actions, stored in the
+[-1, 1] scale SAC/TD3 use), then reports storage size, add() and sample()
+throughput, in memory and memory-mapped, and the largest decode error per
+observation dimension. Exits non-zero if a decoded observation or action is
+off by more than half a quantization step, or a memory-mapped buffer does not
+survive a pickle round trip.
+
+    python benchmarks/bench_replay_buffer.py --size 1000000 --batch-size 256
+"""
+
+import argparse
+import os
+import pickle
+import sys
+import tempfile
+import time
+import warnings
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+warnings.filterwarnings("ignore")
+
+from stable_baselines3.common.buffers import ReplayBuffer
+
+from lunar_lander.Lunar_Lander_custom_env import LunarLanderEnv
+from lunar_lander.replay_buffer import FIELDS, CompactReplayBuffer
+
+
+def collect(transitions, seed=0):
+    env = LunarLanderEnv(render_mode="none")
+    rng = np.random.default_rng(seed)
+    low, high = env.action_space.low, env.action_space.high
+    data = []
+    obs, _ = env.reset(seed=seed)
+    episode = 0
+    while len(data) < transitions:
+        scaled = rng.uniform(-1, 1, 2).astype(np.float32)
+        next_obs, reward, terminated, truncated, _ = env.step(low + 0.5 * (scaled + 1) * (high - low))
+        data.append((obs, next_obs, scaled, reward, terminated, [{"TimeLimit.truncated": truncated}]))
+        obs = next_obs
+        if terminated or truncated:
+            episode += 1
+            obs, _ = env.reset(seed=seed + episode)
+    env.close()
+    return env, data
+
+
+def fill(buffer, data, count):
+    start = time.perf_counter()
+    for i in range(count):
+        obs, next_obs, action, reward, done, infos = data[i % len(data)]
+        buffer.add(obs, next_obs, action, np.array([reward]), np.array([done]), infos)
+    return count / (time.perf_counter() - start)
+
+
+def samples_per_sec(buffer, batch_size, batches):
+    start = time.perf_counter()
+    for _ in range(batches):
+        buffer.sample(batch_size)
+    return batches * batch_size / (time.perf_counter() - start)
+
+
+def check_decoding(buffer, data):
+    n = len(data)
+    obs = np.array([d[0] for d in data], dtype=np.float32)
+    actions = np.array([d[2] for d in data], dtype=np.float32)
+    decoded_obs = buffer.decode_observations(buffer.observations[:n, 0])
+    decoded_actions = buffer.decode_actions(buffer.actions[:n, 0])
+    obs_error = np.abs(decoded_obs - obs).max(axis=0)
+    # half a step, plus float32 rounding of the decoded value
+    obs_ok = np.all(obs_error <= buffer.observation_step / 2 + np.abs(obs).max(axis=0) * 2.0 ** -23)
+    action_error = np.abs(decoded_actions - actions).max()
+    action_ok = action_error <= buffer.action_step.max() / 2 + 1e-6
+    names = ("dx", "dy", "vx", "vy", "angle", "angular_velocity")
+    print("decode: max obs error " + ", ".join(f"{name} {error:.2e} (step {step:.1e})" for name, error, step
+                                               in zip(names, obs_error, buffer.observation_step)))
+    print(f"decode: max action error {action_error:.4f} (step {buffer.action_step.max():.4f})")
+    return obs_ok and action_ok
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--size", type=int, default=1_000_000, help="buffer capacity in transitions")
+    parser.add_argument("--transitions", type=int, default=20_000, help="env transitions collected and cycled")
+    parser.add_argument("--adds", type=int, default=200_000, help="add() calls timed")
+    parser.add_argument("--batch-size", type=int, default=256)
+    parser.add_argument("--batches", type=int, default=2000)
+    args = parser.parse_args()
+
+    env, data = collect(args.transitions)
+    obs_space, action_space = env.observation_space, env.action_space
+    ok = True
+
+    with tempfile.TemporaryDirectory() as tmp:
+        buffers = {
+            "ReplayBuffer (SB3)": ReplayBuffer(args.size, obs_space, action_space, device="cpu"),
+            "CompactReplayBuffer": CompactReplayBuffer(args.size, obs_space, action_space, device="cpu"),
+            "CompactReplayBuffer, mmap": CompactReplayBuffer(args.size, obs_space, action_space, device="cpu",
+                                                             path=os.path.join(tmp, "replay")),
+        }
+        stock_bytes = None
+        for name, buffer in buffers.items():
+            nbytes = sum(getattr(buffer, field).nbytes for field in FIELDS)
+            stock_bytes = stock_bytes or nbytes
+            adds = fill(buffer, data, args.adds)
+            fill(buffer, data, args.size - args.adds)  # fill to capacity before sampling
+            rate = samples_per_sec(buffer, args.batch_size, args.batches)
+            print(f"{name:28s} {nbytes / 2 ** 20:8.1f} MB ({nbytes / args.size:4.0f} B/transition, "
+                  f"{stock_bytes / nbytes:.1f}x smaller)  add {adds:10,.0f}/s  sample {rate:12,.0f} transitions/s")
+
+        compact = buffers["CompactReplayBuffer"]
+        fresh = CompactReplayBuffer(len(data), obs_space, action_space, device="cpu")
+        fill(fresh, data, len(data))
+        ok &= check_decoding(fresh, data)
+
+        mapped = buffers["CompactReplayBuffer, mmap"]
+        restored = pickle.loads(pickle.dumps(mapped))
+        same = (np.array_equal(restored.observations, compact.observations)
+                and np.array_equal(restored.actions, compact.actions) and restored.full
+                and len(pickle.dumps(mapped)) < 100_000)
+        print(f"memory-mapped buffer pickles by reference and reopens intact: {same}")
+        ok &= same
+        del restored, buffers, mapped
+
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""
+Reset latency of LunarLanderEnv and a memory soak over many resets.
+
+    python benchmarks/bench_reset.py                     # latency only
+    python benchmarks/bench_reset.py --soak 1000000      # plus 1M-reset soak
+"""
+
+import argparse
+import os
+import resource
+import sys
+import tempfile
+import time
+import warnings
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+warnings.filterwarnings("ignore")
+
+from lunar_lander.Lunar_Lander_custom_env import LunarLanderEnv
+from lunar_lander.physics import PhysicsWorld
+from lunar_lander.terrain_bank import build_terrain_bank
+
+
+def rss_mb():
+    with open("/proc/self/statm") as f:
+        pages = int(f.read().split()[1])
+    return pages * resource.getpagesize() / 2 ** 20
+
+
+def time_per_call(fn, repeats):
+    start = time.perf_counter()
+    for _ in range(repeats):
+        fn()
+    return (time.perf_counter() - start) / repeats * 1e6
+
+
+def bench_latency(repeats):
+    env = LunarLanderEnv(render_mode="none")
+    env.reset()
+
+    results = {
+        "new PhysicsWorld()": time_per_call(PhysicsWorld, repeats),
+        "env.reset(), new terrain": time_per_call(env.reset, repeats),
+        "env.reset(), repeated terrain": time_per_call(lambda: env.reset(seed=0), repeats),
+    }
+    env.close()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        bank_env = LunarLanderEnv(render_mode="none",
+                                  terrain_bank=build_terrain_bank(os.path.join(tmp, "bank.npy"), 1000))
+        bank_env.reset(seed=0)
+        results["env.reset(), terrain bank"] = time_per_call(bank_env.reset, repeats)
+        bank_env.close()
+    return results
+
+
+def soak(resets, report_every):
+    env = LunarLanderEnv(render_mode="none")
+    env.reset()
+    samples = []
+    for i in range(1, resets + 1):
+        env.reset()
+        if i % report_every == 0:
+            samples.append((i, rss_mb()))
+            print(f"  {i:>9,} resets  rss {samples[-1][1]:8.1f} MB", flush=True)
+    env.close()
+    return samples
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--repeats", type=int, default=2000)
+    parser.add_argument("--soak", type=int, default=0, help="number of resets for the memory soak")
+    parser.add_argument("--max-growth-mb", type=float, default=5.0)
+    args = parser.parse_args()
+
+    for name, micros in bench_latency(args.repeats).items():
+        print(f"{name:32s} {micros:8.1f} us")
+
+    if args.soak:
+        samples = soak(args.soak, max(args.soak // 10, 1))
+        # measure growth after the first sample so allocator warm-up doesn't count
+        growth = samples[-1][1] - samples[0][1]
+        print(f"rss growth after warm-up: {growth:.1f} MB")
+        sys.exit(0 if growth <= args.max_growth_mb else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+"""
+Rollout throughput of SharedMemoryVecEnv as the worker count grows, with the
+single in-process LunarLanderEnv (what custom_run.py used before) as reference.
+
+    python benchmarks/bench_rollout_pool.py --workers 1 2 4 8 16 32 --envs-per-worker 4
+"""
+
+import argparse
+import os
+import sys
+import time
+import warnings
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+warnings.filterwarnings("ignore")
+
+from stable_baselines3.common.vec_env import DummyVecEnv
+from lunar_lander.Lunar_Lander_custom_env import LunarLanderEnv
+from lunar_lander.shared_vec_env import SharedMemoryVecEnv
+
+
+def random_actions(num_envs, seed=0):
+    rng = np.random.default_rng(seed)
+    return np.stack([rng.uniform(0.0, 0.8, num_envs), rng.uniform(-3.0, 3.0, num_envs)], axis=-1).astype(np.float32)
+
+
+def measure(vec_env, steps):
+    vec_env.seed(0)
+    vec_env.reset()
+    actions = random_actions(vec_env.num_envs)
+    vec_env.step(actions)  # warm-up
+    start = time.perf_counter()
+    for _ in range(steps):
+        vec_env.step(actions)
+    elapsed = time.perf_counter() - start
+    vec_env.close()
+    return vec_env.num_envs * steps / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8, 16, 32])
+    parser.add_argument("--envs-per-worker", type=int, default=4)
+    parser.add_argument("--steps", type=int, default=500)
+    args = parser.parse_args()
+
+    print(f"cpus: {os.cpu_count()}")
+    baseline = measure(DummyVecEnv([lambda: LunarLanderEnv(render_mode="none")]), args.steps)
+    print(f"single LunarLanderEnv            {baseline:10,.0f} steps/sec")
+    for workers in args.workers:
+        rate = measure(SharedMemoryVecEnv(workers, args.envs_per_worker), args.steps)
+        print(f"{workers:3d} workers x {args.envs_per_worker} envs           "
+              f"{rate:10,.0f} steps/sec  ({rate / baseline:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""
+Import and worker start-up time.
+
+Times, in fresh interpreters, `import lunar_lander`, importing the headless
+env and taking its first step, and importing the rendered / SB3 pieces, and
+lists which heavy modules (pygame, torch, stable_baselines3) each one pulled
+in. Then times SharedMemoryVecEnv construction plus the first reset for each
+multiprocessing start method: with spawn and forkserver every worker imports
+what it needs from scratch. Exits non-zero if the headless env loads pygame,
+torch or stable_baselines3.
+
+    python benchmarks/bench_startup.py --workers 4
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+import warnings
+
+SRC = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src")
+sys.path.insert(0, SRC)
+warnings.filterwarnings("ignore")
+
+HEAVY = ("pygame", "torch", "stable_baselines3")
+
+IMPORTS = {
+    "package": "import lunar_lander",
+    "headless env": "from lunar_lander import LunarLanderEnv\n"
+                    "env = LunarLanderEnv(render_mode='none')\nenv.reset(seed=0)\nenv.step(env.action_space.sample())",
+    "rgb_array env": "from lunar_lander import LunarLanderEnv\n"
+                     "env = LunarLanderEnv(render_mode='rgb_array')\nenv.reset(seed=0)\nenv.render()",
+    "SharedMemoryVecEnv": "from lunar_lander import SharedMemoryVecEnv",
+}
+
+
+def import_seconds(code, runs):
+    script = "\n".join([
+        "import json, sys, time, warnings", "start = time.perf_counter()", f"sys.path.insert(0, {SRC!r})",
+        "warnings.filterwarnings('ignore')", code,
+        f"print(json.dumps([time.perf_counter() - start, [m for m in {HEAVY!r} if m in sys.modules]]))",
+    ])
+    env = dict(os.environ, SDL_VIDEODRIVER="dummy")
+    results = [json.loads(subprocess.run([sys.executable, "-c", script], capture_output=True, text=True, env=env,
+                                         check=True).stdout.splitlines()[-1]) for _ in range(runs)]
+    return min(seconds for seconds, _ in results), results[0][1]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--runs", type=int, default=3, help="fresh interpreters per import measurement")
+    args = parser.parse_args()
+
+    headless_heavy = []
+    for name, code in IMPORTS.items():
+        seconds, heavy = import_seconds(code, args.runs)
+        print(f"{name:20s} {1e3 * seconds:8.0f} ms  loads {', '.join(heavy) or 'none of ' + '/'.join(HEAVY)}")
+        if name == "headless env":
+            headless_heavy = heavy
+
+    # imported here: spawned workers re-import this script, and should not pay for SB3 doing so
+    from lunar_lander.shared_vec_env import SharedMemoryVecEnv
+
+    for method in ("fork", "forkserver", "spawn"):
+        start = time.perf_counter()
+        vec_env = SharedMemoryVecEnv(args.workers, 1, start_method=method)
+        vec_env.reset()
+        elapsed = time.perf_counter() - start
+        vec_env.close()
+        print(f"{args.workers} workers, {method:10s} {elapsed:8.2f} s to first reset")
+    sys.exit(1 if headless_heavy else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+"""
+State snapshot/restore: latency, and whether a restored episode continues
+bit-for-bit.
+
+Times LunarLanderEnv.get_state()/set_state() (lander in the air and resting on
+the ground, where Box2D contacts are part of the state) against reset(), and
+fanning one snapshot out to VectorLunarLanderEnv lanes. Then plays seeded
+episodes with random actions, snapshots every --every steps, and replays the
+rest of the episode from each snapshot, both in the env it came from and in a
+second env with a different history. Exits non-zero if any replayed
+observation, reward or termination differs in a single bit.
+
+    python benchmarks/bench_state_snapshot.py --episodes 50 --every 20 --lanes 256
+"""
+
+import argparse
+import os
+import sys
+import time
+import warnings
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+warnings.filterwarnings("ignore")
+
+from lunar_lander.Lunar_Lander_custom_env import LunarLanderEnv
+from lunar_lander.physics import CONTACT_FIELDS, STATE_CONTACT, STATE_SIZE
+from lunar_lander.vector_env import VectorLunarLanderEnv
+
+
+def time_per_call(fn, repeats):
+    start = time.perf_counter()
+    for _ in range(repeats):
+        fn()
+    return (time.perf_counter() - start) / repeats * 1e6
+
+
+def touching(state):
+    return state[STATE_CONTACT + 1::len(CONTACT_FIELDS)].any()
+
+
+def play(env, seed):
+    """Random-action episode: actions, per-step (obs bytes, reward, terminated, truncated), snapshots."""
+    env.reset(seed=seed)
+    rng = np.random.default_rng(seed)
+    actions, outcomes, snapshots = [], [], []
+    done = False
+    while not done:
+        snapshots.append(env.get_state())
+        # small thrust and torque, so many episodes scrape or rest on the terrain
+        action = rng.uniform(-1, 1, 2).astype(np.float32)
+        obs, reward, terminated, truncated, _ = env.step(action)
+        actions.append(action)
+        outcomes.append((obs.tobytes(), reward, terminated, truncated))
+        done = terminated or truncated
+    return actions, outcomes, snapshots
+
+
+def replays_exactly(env, snapshot, actions, outcomes):
+    env.set_state(snapshot)
+    for action, expected in zip(actions, outcomes):
+        obs, reward, terminated, truncated, _ = env.step(action)
+        if (obs.tobytes(), reward, terminated, truncated) != expected:
+            return False
+    return True
+
+
+def bench_latency(repeats, lanes):
+    env = LunarLanderEnv(render_mode="none")
+    _, _, snapshots = play(env, seed=0)
+    airborne = snapshots[len(snapshots) // 2]
+    resting = next((s for seed in range(1, 200) for s in play(env, seed)[2] if touching(s)), None)
+    out = np.empty(STATE_SIZE)
+    env.set_state(airborne)
+
+    results = {
+        "env.get_state(out)": time_per_call(lambda: env.get_state(out), repeats),
+        "env.set_state(), airborne": time_per_call(lambda: env.set_state(airborne), repeats),
+    }
+    if resting is not None:
+        env.set_state(resting)
+        results["env.get_state(out), on ground"] = time_per_call(lambda: env.get_state(out), repeats)
+        results["env.set_state(), on ground"] = time_per_call(lambda: env.set_state(resting), repeats)
+    results["env.reset(), repeated terrain"] = time_per_call(lambda: env.reset(seed=0), repeats // 10)
+
+    vec = VectorLunarLanderEnv(lanes, seed=0)
+    vec.reset()
+    vec.set_state(airborne)
+    results[f"vector set_state(), {lanes} lanes"] = time_per_call(lambda: vec.set_state(airborne), repeats // 10)
+    env.close()
+    return results
+
+
+def check_replays(episodes, every):
+    env = LunarLanderEnv(render_mode="none")
+    other = LunarLanderEnv(render_mode="none")
+    other.reset(seed=10_000)
+    checked = {False: 0, True: 0}
+    failed = {False: [], True: []}
+    for seed in range(episodes):
+        actions, outcomes, snapshots = play(env, seed)
+        for t in range(0, len(actions), every):
+            on_ground = bool(touching(snapshots[t]))
+            for target in (env, other):
+                checked[on_ground] += 1
+                if not replays_exactly(target, snapshots[t], actions[t:], outcomes[t:]):
+                    failed[on_ground].append((seed, t, "same env" if target is env else "other env"))
+    env.close()
+    other.close()
+    return checked, failed
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--repeats", type=int, default=20000)
+    parser.add_argument("--lanes", type=int, default=256, help="VectorLunarLanderEnv size for the fan-out")
+    parser.add_argument("--episodes", type=int, default=50)
+    parser.add_argument("--every", type=int, default=20, help="snapshot every this many steps")
+    args = parser.parse_args()
+
+    for name, micros in bench_latency(args.repeats, args.lanes).items():
+        print(f"{name:36s} {micros:8.1f} us")
+
+    checked, failed = check_replays(args.episodes, args.every)
+    for on_ground, label in ((False, "airborne"), (True, "on the ground")):
+        print(f"restores from {label:14s} {checked[on_ground]:6d} replayed, {len(failed[on_ground])} differ "
+              f"{failed[on_ground][:5]}")
+    sys.exit(1 if failed[False] or failed[True] else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""
+LunarLanderEnv.step: default path against fast_step=True. Checks that both give
+identical observations and rewards on the same seeded episodes, then reports
+steps/sec and the tracemalloc peak of memory allocated within one step, both
+for the whole step and for the env-side work alone (physics step skipped).
+
+    python benchmarks/bench_step.py
+"""
+
+import argparse
+import os
+import sys
+import time
+import tracemalloc
+import warnings
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+warnings.filterwarnings("ignore")
+
+from lunar_lander.Lunar_Lander_custom_env import LunarLanderEnv
+
+
+def action_sequence(steps, seed=0):
+    rng = np.random.default_rng(seed)
+    return np.stack([rng.uniform(0.0, 0.8, steps), rng.uniform(-3.0, 3.0, steps)], axis=-1).astype(np.float32)
+
+
+def rollout(env, actions, seed):
+    """Observations and rewards for consecutive episodes over the action sequence."""
+    observations, rewards = [], []
+    obs, _ = env.reset(seed=seed)
+    for action in actions:
+        obs, reward, done, _, _ = env.step(action)
+        observations.append(np.array(obs))
+        rewards.append(reward)
+        if done:
+            obs, _ = env.reset()
+    return np.array(observations), np.array(rewards)
+
+
+def check_identical(steps):
+    actions = action_sequence(steps)
+    default_obs, default_rewards = rollout(LunarLanderEnv(render_mode="none"), actions, seed=0)
+    fast_obs, fast_rewards = rollout(LunarLanderEnv(render_mode="none", fast_step=True), actions, seed=0)
+    return np.array_equal(default_obs, fast_obs) and np.array_equal(default_rewards, fast_rewards)
+
+
+def steps_per_sec(env, actions):
+    env.reset(seed=0)
+    start = time.perf_counter()
+    for action in actions:
+        _, _, done, _, _ = env.step(action)
+        if done:
+            env.reset()
+    return len(actions) / (time.perf_counter() - start)
+
+
+def bytes_per_step(env, actions, env_side_only=False):
+    """Average peak of memory allocated and released within one step."""
+    env.reset(seed=0)
+    if env_side_only:
+        env.physics.step = lambda: None
+    total = 0
+    tracemalloc.start()
+    for action in actions:
+        current = tracemalloc.get_traced_memory()[0]
+        tracemalloc.reset_peak()
+        _, _, done, _, _ = env.step(action)
+        total += tracemalloc.get_traced_memory()[1] - current
+        if done:
+            env.reset()
+    tracemalloc.stop()
+    if env_side_only:
+        del env.physics.step
+    return total / len(actions)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--steps", type=int, default=20000)
+    args = parser.parse_args()
+
+    identical = check_identical(5000)
+    print(f"identical observations and rewards: {identical}")
+
+    actions = action_sequence(args.steps, seed=1)
+    for name, kwargs in [("default", {}), ("fast_step", {"fast_step": True})]:
+        env = LunarLanderEnv(render_mode="none", **kwargs)
+        rate = steps_per_sec(env, actions)
+        whole = bytes_per_step(env, actions[:5000])
+        env_side = bytes_per_step(env, actions[:5000], env_side_only=True)
+        print(f"{name:10s} {rate:10,.0f} steps/sec  peak alloc/step: {whole:6.0f} B whole, "
+              f"{env_side:6.0f} B env-side")
+        env.close()
+    sys.exit(0 if identical else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+"""
+Cost of the static terrain in the Box2D world.
+
+Counts the ground's bodies, fixtures and broadphase proxies, and times
+PhysicsWorld construction, a reset onto new terrain and world.Step while the
+lander falls onto the terrain and lies on it. Then plays seeded episodes with
+a fixed random action stream and reduces each to its outcome (steps, landed,
+successful, final observation) plus a checksum of its first rendered frame.
+
+    python benchmarks/bench_terrain_shape.py --save outcomes.json    # record
+    python benchmarks/bench_terrain_shape.py --check outcomes.json   # compare after a change
+
+--check exits non-zero if any episode lands differently (touch-down, success)
+or its first frame differs from the recording. Episodes where the lander
+scrapes the terrain before the landing check fires can take a different path
+after a change in collision shapes; those are counted, not failed.
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import sys
+import time
+import warnings
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+warnings.filterwarnings("ignore")
+
+from lunar_lander.Lunar_Lander_custom_env import LunarLanderEnv
+from lunar_lander.physics import PhysicsWorld
+
+
+def time_per_call(fn, repeats):
+    start = time.perf_counter()
+    for _ in range(repeats):
+        fn()
+    return (time.perf_counter() - start) / repeats * 1e6
+
+
+def ground_counts(physics):
+    bodies = [body for body in physics.world.bodies if body != physics.lander]
+    fixtures = sum(len(body.fixtures) for body in bodies)
+    proxies = sum(fixture.shape.childCount for body in bodies for fixture in body.fixtures)
+    return len(bodies), fixtures, proxies
+
+
+def step_micros(terrains, steps):
+    """Mean world.Step time over drops with no thrust: free fall, impact, then resting on the ground."""
+    physics = PhysicsWorld(seed=0)
+    total = 0.0
+    for seed in range(terrains):
+        physics.reset(seed=seed)
+        world = physics.world
+        start = time.perf_counter()
+        for _ in range(steps):
+            world.Step(physics.time_step, physics.vel_iters, physics.pos_iters)
+        total += time.perf_counter() - start
+    return total / (terrains * steps) * 1e6
+
+
+def outcomes(episodes):
+    env = LunarLanderEnv(render_mode="rgb_array", render_size=(200, 150))
+    results = []
+    for seed in range(episodes):
+        obs, _ = env.reset(seed=seed)
+        frame = hashlib.blake2b(env.render().tobytes(), digest_size=8).hexdigest()
+        rng = np.random.default_rng(seed)
+        steps = 0
+        terminated = truncated = False
+        while not (terminated or truncated):
+            obs, _, terminated, truncated, info = env.step(rng.uniform(-1, 1, 2).astype(np.float32))
+            steps += 1
+        results.append({
+            "seed": seed, "steps": steps, "landed": bool(env.physics.has_landed),
+            "success": bool(env.physics.landed_successfully),
+            "obs": [round(float(x), 5) for x in obs], "frame": frame,
+        })
+    env.close()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--repeats", type=int, default=2000)
+    parser.add_argument("--terrains", type=int, default=50, help="terrains dropped onto for the Step timing")
+    parser.add_argument("--steps", type=int, default=300, help="Step calls per drop")
+    parser.add_argument("--episodes", type=int, default=200)
+    parser.add_argument("--save", default=None, help="write episode outcomes to this JSON file")
+    parser.add_argument("--check", default=None, help="compare episode outcomes with this JSON file")
+    args = parser.parse_args()
+
+    bodies, fixtures, proxies = ground_counts(PhysicsWorld(seed=0))
+    print(f"ground: {bodies} bodies, {fixtures} fixtures, {proxies} broadphase proxies")
+    print(f"{'new PhysicsWorld()':32s} {time_per_call(PhysicsWorld, args.repeats // 4):8.1f} us")
+    physics = PhysicsWorld(seed=0)
+    print(f"{'reset, new terrain':32s} {time_per_call(physics.reset, args.repeats):8.1f} us")
+    print(f"{'world.Step, drop onto ground':32s} {step_micros(args.terrains, args.steps):8.1f} us")
+
+    results = outcomes(args.episodes)
+    landed = sum(r["landed"] for r in results)
+    success = sum(r["success"] for r in results)
+    print(f"{args.episodes} episodes: {landed} touched down, {success} successful, "
+          f"{sum(r['steps'] for r in results)} steps")
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump(results, f)
+    if args.check:
+        with open(args.check) as f:
+            expected = json.load(f)
+        differing = [r["seed"] for r, e in zip(results, expected)
+                     if (r["landed"], r["success"], r["frame"]) != (e["landed"], e["success"], e["frame"])]
+        paths = [r["seed"] for r, e in zip(results, expected) if (r["steps"], r["obs"]) != (e["steps"], e["obs"])]
+        print(f"compared with {args.check}: {len(differing)} landings/frames differ {differing[:20]}, "
+              f"{len(paths)} trajectories differ {paths[:20]}")
+        sys.exit(1 if differing or len(results) != len(expected) else 0)
+
+
+if __name__ == "__main__":
+    main()
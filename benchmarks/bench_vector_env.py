@@ -0,0 +1,184 @@
+"""
+Throughput of VectorLunarLanderEnv against the Box2D LunarLanderEnv, plus a
+parity check that replays the same seeded terrains and action sequences through
+both backends.
+
+Random actions mostly fly the landers out of bounds, so a second check drops
+landers onto the terrain (too little thrust to hover, no torque) and, with
+--model, flies a policy down; the landed/crashed/timeout outcome of every
+episode must agree between the backends. Exits non-zero on any difference.
+
+    python benchmarks/bench_vector_env.py
+    python benchmarks/bench_vector_env.py --parity-only --model custom_lunar/best_model1.zip
+"""
+
+import argparse
+import os
+import sys
+import time
+import warnings
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+warnings.filterwarnings("ignore")
+
+from lunar_lander.Lunar_Lander_custom_env import LunarLanderEnv
+from lunar_lander.vector_env import VectorLunarLanderEnv
+
+OBS_TOLERANCE = 1e-3
+# touchdowns in this speed range need the contact solver to end the same way
+TOUCHDOWN_SPEEDS = (3.0, 10.0)
+
+
+def random_actions(rng, num_envs, steps):
+    # thrust around the hover point (~0.375) so episodes run long enough to matter
+    thrust = rng.uniform(0.0, 0.8, (num_envs, steps))
+    torque = rng.uniform(-3.0, 3.0, (num_envs, steps))
+    return np.stack([thrust, torque], axis=-1)
+
+
+def drop_actions(rng, num_envs):
+    # below the hover thrust: landers fall onto the terrain at a few m/s
+    return np.stack([rng.uniform(0.0, 0.3, num_envs), np.zeros(num_envs)], axis=-1).astype(np.float32)
+
+
+def outcome(info):
+    return "landed" if info["landed_successfully"] else "crashed" if info["game_over"] else "timeout"
+
+
+def check_touchdowns(num_envs, seed, policy=None):
+    """
+    One episode per env on both backends, flown by policy or dropped with
+    drop_actions; return (touchdowns within TOUCHDOWN_SPEEDS, outcome mismatches).
+    """
+    drops = drop_actions(np.random.default_rng(seed), num_envs)
+
+    env = LunarLanderEnv(render_mode="none")
+    reference = []
+    for i in range(num_envs):
+        obs, _ = env.reset(seed=seed + i)
+        done = False
+        while not done:
+            action = policy.predict(obs)[0] if policy else drops[i]
+            obs, _, done, _, info = env.step(action)
+        reference.append((outcome(info), np.hypot(obs[2], obs[3])))
+    env.close()
+
+    vec_env = VectorLunarLanderEnv(num_envs, seed=seed)
+    obs = vec_env.reset()
+    results = [None] * num_envs
+    while any(result is None for result in results):
+        obs, _, dones, infos = vec_env.step(policy.predict(obs)[0] if policy else drops)
+        for i in np.flatnonzero(dones):
+            if results[i] is None:
+                results[i] = outcome(infos[i])
+    vec_env.close()
+
+    low, high = TOUCHDOWN_SPEEDS
+    touchdowns = sum(result != "timeout" and low <= speed <= high for result, speed in reference)
+    mismatches = sum(result != ref for result, (ref, _) in zip(results, reference))
+    return touchdowns, mismatches
+
+
+def check_parity(num_envs=64, seed=100):
+    """Run one episode per env on both backends; return (max obs error, outcome mismatches)."""
+    steps = LunarLanderEnv.MAX_STEPS
+    actions = random_actions(np.random.default_rng(seed), num_envs, steps)
+
+    env = LunarLanderEnv(render_mode="none")
+    reference = []
+    for i in range(num_envs):
+        # VectorLunarLanderEnv seeds env i with seed + i
+        obs, _ = env.reset(seed=seed + i)
+        trajectory = [obs]
+        for t in range(steps):
+            obs, reward, done, _, info = env.step(actions[i, t])
+            trajectory.append(obs)
+            if done:
+                break
+        reference.append((np.array(trajectory), t, info["landed_successfully"]))
+    env.close()
+
+    vec_env = VectorLunarLanderEnv(num_envs, seed=seed)
+    obs = vec_env.reset()
+    max_error = max(np.abs(obs[i] - reference[i][0][0]).max() for i in range(num_envs))
+    mismatches = 0
+    running = np.ones(num_envs, dtype=bool)
+    for t in range(steps):
+        obs, rewards, dones, infos = vec_env.step(actions[:, t])
+        for i in np.flatnonzero(running):
+            trajectory, last_step, landed = reference[i]
+            current = infos[i]["terminal_observation"] if dones[i] else obs[i]
+            max_error = max(max_error, np.abs(current - trajectory[t + 1]).max())
+            if dones[i] or t == last_step:
+                if not (dones[i] and t == last_step and infos[i]["landed_successfully"] == landed):
+                    mismatches += 1
+                running[i] = False
+        if not running.any():
+            break
+    vec_env.close()
+    return max_error, mismatches
+
+
+def bench_single(steps):
+    env = LunarLanderEnv(render_mode="none")
+    env.reset(seed=0)
+    action = np.array([0.4, 0.0], dtype=np.float32)
+    start = time.perf_counter()
+    for _ in range(steps):
+        _, _, done, _, _ = env.step(action)
+        if done:
+            env.reset()
+    elapsed = time.perf_counter() - start
+    env.close()
+    return steps / elapsed
+
+
+def bench_vector(num_envs, steps):
+    vec_env = VectorLunarLanderEnv(num_envs, seed=0)
+    vec_env.reset()
+    actions = random_actions(np.random.default_rng(0), num_envs, 1)[:, 0]
+    start = time.perf_counter()
+    for _ in range(steps):
+        vec_env.step(actions)
+    elapsed = time.perf_counter() - start
+    vec_env.close()
+    return num_envs * steps / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--parity-only", action="store_true")
+    parser.add_argument("--num-envs", type=int, nargs="+", default=[1, 256, 1024, 4096])
+    parser.add_argument("--steps", type=int, default=200)
+    parser.add_argument("--touchdown-envs", type=int, default=256)
+    parser.add_argument("--model", default=None, help="PPO zip whose policy also flies touchdown episodes")
+    args = parser.parse_args()
+
+    max_error, mismatches = check_parity()
+    print(f"parity: max obs error {max_error:.2e}, outcome mismatches {mismatches}")
+    ok = max_error < OBS_TOLERANCE and mismatches == 0
+
+    low, high = TOUCHDOWN_SPEEDS
+    runs = [("drops", None)]
+    if args.model:
+        from lunar_lander.numpy_policy import NumpyPolicy
+
+        runs.append(("policy", NumpyPolicy.from_model(args.model)))
+    for name, policy in runs:
+        touchdowns, mismatches = check_touchdowns(args.touchdown_envs, seed=200, policy=policy)
+        print(f"touchdowns ({name}): {touchdowns} of {args.touchdown_envs} at {low:g}-{high:g} m/s, "
+              f"outcome mismatches {mismatches}")
+        ok = ok and touchdowns > 0 and mismatches == 0
+    if args.parity_only:
+        sys.exit(0 if ok else 1)
+
+    print(f"LunarLanderEnv (Box2D): {bench_single(5000):,.0f} steps/sec")
+    for num_envs in args.num_envs:
+        print(f"VectorLunarLanderEnv n={num_envs}: {bench_vector(num_envs, args.steps):,.0f} steps/sec")
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,231 @@
+"""
+Benchmark suite for the physics, env, renderer and training loop.
+
+Every benchmark runs with fixed seeds and reports one number. Results are
+printed and written as JSON, and compared against a stored baseline so a change
+that makes things slower than the threshold fails the run (exit code 1).
+
+    python benchmarks/suite.py --save-baseline          # record this box's baseline
+    python benchmarks/suite.py                          # compare against it
+    python benchmarks/suite.py --only env_step env_reset --threshold 0.05
+
+Baselines are machine specific; record one on the box that gates changes.
+"""
+
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+import warnings
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+
+import numpy as np
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(BENCH_DIR, "..", "src"))
+warnings.filterwarnings("ignore")
+
+from lunar_lander.Lunar_Lander_custom_env import LunarLanderEnv
+from lunar_lander.physics import PhysicsWorld
+
+DEFAULT_BASELINE = os.path.join(BENCH_DIR, "baseline.json")
+SEED = 0
+
+
+def best_time(fn, number, repeats):
+    """Best average seconds per call over several rounds, like timeit."""
+    best = float("inf")
+    for _ in range(repeats):
+        start = time.perf_counter()
+        for _ in range(number):
+            fn()
+        best = min(best, (time.perf_counter() - start) / number)
+    return best
+
+
+def action_sequence(steps, seed=SEED):
+    rng = np.random.default_rng(seed)
+    return np.stack([rng.uniform(0.0, 0.8, steps), rng.uniform(-3.0, 3.0, steps)], axis=-1).astype(np.float32)
+
+
+def bench_physics_construct(scale):
+    return best_time(lambda: PhysicsWorld(seed=SEED), 50 * scale, 3) * 1e6, "us", False
+
+
+def bench_physics_step(scale):
+    physics = PhysicsWorld(seed=SEED)
+
+    def step():
+        # keep the lander airborne so every call does the same work
+        physics.game_over = False
+        physics.apply_thrust(0.375)
+        physics.step()
+        if physics.lander.position.y > 20:
+            physics.reset(seed=SEED)
+
+    return best_time(step, 2000 * scale, 3) * 1e6, "us", False
+
+
+def bench_check_landing(scale):
+    physics = PhysicsWorld(seed=SEED)
+    # just above the landing zone, so the terrain lookup is not skipped
+    landing_zone = physics.get_landing_zone()
+    physics.lander.transform = (((landing_zone['left'] + landing_zone['right']) / 2, landing_zone['y'] + 1.0), 0.0)
+
+    def check():
+        physics.game_over = False
+        physics.check_landing()
+
+    return best_time(check, 5000 * scale, 3) * 1e6, "us", False
+
+
+def _env_steps(env, actions):
+    env.reset(seed=SEED)
+    for action in actions:
+        _, _, done, _, _ = env.step(action)
+        if done:
+            env.reset()
+
+
+def _bench_env_step(scale, **env_kwargs):
+    env = LunarLanderEnv(render_mode="none", **env_kwargs)
+    actions = action_sequence(2000 * scale)
+    seconds = best_time(lambda: _env_steps(env, actions), 1, 3)
+    env.close()
+    return len(actions) / seconds, "steps/s", True
+
+
+def bench_env_step(scale):
+    return _bench_env_step(scale)
+
+
+def bench_env_step_fast(scale):
+    return _bench_env_step(scale, fast_step=True)
+
+
+def bench_env_reset(scale):
+    env = LunarLanderEnv(render_mode="none")
+    env.reset(seed=SEED)
+    seconds = best_time(env.reset, 200 * scale, 3)
+    env.close()
+    return seconds * 1e6, "us", False
+
+
+def bench_env_set_state(scale):
+    env = LunarLanderEnv(render_mode="none")
+    env.reset(seed=SEED)
+    for action in action_sequence(100):
+        env.step(action)
+    state = env.get_state()
+    seconds = best_time(lambda: env.set_state(state), 2000 * scale, 3)
+    env.close()
+    return seconds * 1e6, "us", False
+
+
+def bench_render_frame(scale):
+    # rgb_array draws the same 800x600 frame as human mode without the fps cap
+    env = LunarLanderEnv(render_mode="rgb_array")
+    env.reset(seed=SEED)
+    env.physics.apply_thrust(10.0)
+    seconds = best_time(env.render, 100 * scale, 3)
+    env.close()
+    return seconds * 1e3, "ms", False
+
+
+def bench_ppo(scale):
+    from stable_baselines3 import PPO
+    from lunar_lander.custom_run import PPO_KWARGS
+
+    env = LunarLanderEnv(render_mode="none")
+    model = PPO("MlpPolicy", env, seed=SEED, verbose=0, **PPO_KWARGS)
+    timesteps = PPO_KWARGS["n_steps"] * 2 * scale
+    start = time.perf_counter()
+    model.learn(total_timesteps=timesteps)
+    elapsed = time.perf_counter() - start
+    env.close()
+    return timesteps / elapsed, "timesteps/s", True
+
+
+# name -> fn(scale) returning (value, unit, higher_is_better)
+BENCHMARKS = {
+    "physics_construct": bench_physics_construct,
+    "physics_step": bench_physics_step,
+    "check_landing": bench_check_landing,
+    "env_step": bench_env_step,
+    "env_step_fast": bench_env_step_fast,
+    "env_reset": bench_env_reset,
+    "env_set_state": bench_env_set_state,
+    "render_frame": bench_render_frame,
+    "ppo_train": bench_ppo,
+}
+
+
+def compare(results, baseline, threshold):
+    """Return the names of benchmarks that regressed by more than threshold."""
+    regressions = []
+    for name, result in results.items():
+        if name not in baseline:
+            continue
+        reference = baseline[name]["value"]
+        if result["higher_is_better"]:
+            change = (reference - result["value"]) / reference
+        else:
+            change = (result["value"] - reference) / reference
+        result["baseline"] = reference
+        result["regression"] = change
+        if change > threshold:
+            regressions.append(name)
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--only", nargs="+", choices=sorted(BENCHMARKS), help="run a subset")
+    parser.add_argument("--scale", type=int, default=1, help="multiply iteration counts")
+    parser.add_argument("--json", help="write results to this file")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE)
+    parser.add_argument("--save-baseline", action="store_true", help="store these results as the baseline")
+    parser.add_argument("--threshold", type=float, default=0.10,
+                        help="allowed slowdown as a fraction of the baseline (default 0.10)")
+    args = parser.parse_args()
+
+    results = {}
+    for name in args.only or BENCHMARKS:
+        value, unit, higher_is_better = BENCHMARKS[name](args.scale)
+        results[name] = {"value": value, "unit": unit, "higher_is_better": higher_is_better}
+        print(f"{name:20s} {value:12.2f} {unit}", flush=True)
+
+    regressions = []
+    if args.save_baseline:
+        baseline = {}
+        if os.path.exists(args.baseline):
+            with open(args.baseline) as f:
+                baseline = json.load(f)["results"]
+        baseline.update(results)
+        with open(args.baseline, "w") as f:
+            json.dump({"machine": platform.node(), "python": platform.python_version(),
+                       "results": baseline}, f, indent=2)
+        print(f"baseline saved to {args.baseline}")
+    elif os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            baseline = json.load(f)["results"]
+        regressions = compare(results, baseline, args.threshold)
+        for name, result in results.items():
+            if "baseline" in result:
+                print(f"{name:20s} {100 * -result['regression']:+7.1f}% vs baseline")
+        for name in regressions:
+            print(f"REGRESSION: {name} is {100 * results[name]['regression']:.1f}% worse than baseline")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"python": platform.python_version(), "threshold": args.threshold,
+                       "results": results, "regressions": regressions}, f, indent=2)
+    sys.exit(1 if regressions else 0)
+
+
+if __name__ == "__main__":
+    main()
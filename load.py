@@ -1,20 +1,34 @@
 import gymnasium as gym
-from stable_baselines3 import PPO
 import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "src"))
+from lunar_lander.checkpoints import CheckpointStore
+from lunar_lander.numpy_policy import NumpyPolicy
 
 
 models_dir = "models/PPO"
+checkpoints_dir = "models/checkpoints"
 
 env = gym.make('LunarLander-v3',  render_mode="human")
 
 model_path = f"{models_dir}/880000.zip"
-model = PPO.load(model_path, env=env)
+if not os.path.exists(model_path):
+    # main.py keeps its checkpoints in a store, write the one we want out as a regular zip
+    # ("latest" and "best" work as names too)
+    CheckpointStore(checkpoints_dir).export(os.path.splitext(os.path.basename(model_path))[0], model_path)
+model = NumpyPolicy.from_model(model_path)
 
 episodes = 5
 
 
-obs = env.reset()
-while True:
-    action, _states = model.predict(obs[0])
-    obs = env.step(action)
-    env.render()
+for episode in range(episodes):
+    obs, info = env.reset()
+    done = False
+    while not done:
+        action, _states = model.predict(obs)
+        # human mode renders (at render_fps) inside step(), no env.render() needed
+        obs, reward, terminated, truncated, info = env.step(action)
+        done = terminated or truncated
+
+env.close()
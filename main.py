@@ -1,9 +1,14 @@
 import gymnasium as gym
 from stable_baselines3 import PPO
+from stable_baselines3.common.utils import safe_mean
 import os
+import sys
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "src"))
+from lunar_lander.checkpoints import CheckpointStore
 
-models_dir = "models/PPO"
+
+models_dir = "models/checkpoints"
 logdir = "logs"
 
 if not os.path.exists(models_dir):
@@ -17,8 +22,14 @@ env.reset()
 
 model = PPO('MlpPolicy', env, verbose=1, tensorboard_log=logdir)
 
+# checkpoints are written in the background and deduplicated; the store keeps the
+# last 5, the 3 with the best mean training reward and a thinning sample of older ones
+# (export one as a regular zip with: python -m lunar_lander.checkpoints export ...)
+store = CheckpointStore(models_dir, keep_last=5, keep_best=3)
+
 TIMESTEPS = 10000
 iters = 0
 for i in range(100):
     model.learn(total_timesteps=TIMESTEPS, reset_num_timesteps=False, tb_log_name="PPO")
-    model.save(f"{models_dir}/{TIMESTEPS*i}")
+    store.save(model, name=TIMESTEPS*i, reward=safe_mean([ep["r"] for ep in model.ep_info_buffer]))
+store.close()
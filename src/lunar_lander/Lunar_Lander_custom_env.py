@@ -8,31 +8,83 @@ Author: Dans To
 Date: 03/24/2025
 """
 
+import sys
 import gymnasium as gym
 import numpy as np
 from gymnasium import spaces
-import pygame
-from physics import PhysicsWorld
-from rendering import Renderer
+from time import perf_counter_ns
+from .perf import PerfStats
+from .physics import STATE_STEPS, TIME_STEP, PhysicsWorld
+from .terrain_bank import TerrainBank
 
 
 class LunarLanderEnv(gym.Env):
     """My Custom Lunar Lander Environment for Reinforcement Learning."""
 
-    metadata = {"render_modes": ["human", "none"], "render_fps": 30}
+    # frame rate PlaybackRunner draws at, interpolating between physics steps;
+    # plain human-mode stepping draws every step and paces itself at step_fps
+    metadata = {"render_modes": ["human", "rgb_array", "none"], "render_fps": 30}
     MAX_STEPS = 1000
 
-    def __init__(self, render_mode=None):
+    def __init__(self, render_mode=None, terrain_bank=None, fast_step=False, perf_stats=False,
+                 render_size=(800, 600), fidelity="default", action_repeat=1):
+        """
+        render_mode "rgb_array" draws offscreen (no window or display needed) and
+        render() returns the frame as an (H, W, 3) uint8 array. The array is the
+        renderer's own pixel buffer and is redrawn by the next render(), so copy
+        frames you keep. render_size is (width, height), e.g. (84, 84) for CNNs.
+
+        terrain_bank: optional TerrainBank or path to a bank file (see terrain_bank.py).
+        Resets then look terrains up by seed instead of generating them.
+
+        fast_step: write observations into one preallocated array and only fill
+        info on the final step of an episode. The returned observation is reused
+        by the next step, so copy it if you keep it (SB3 vec envs already do).
+        Observations and rewards are identical to the default path.
+
+        perf_stats: time the step phases (Box2D step, check_landing, observation,
+        reward, render) plus reset and terrain building; read them with
+        get_perf_stats(). Off by default.
+
+        fidelity: physics solver profile, "fast", "default" or "precise" (see
+        physics.FIDELITY_PROFILES). Every profile simulates 1/60 s per step.
+
+        action_repeat: apply each action for this many 1/60 s physics frames
+        (frame skip). The reward is the sum of the frames' rewards, a touchdown
+        or timeout ends the step at that frame, and the observation is built
+        once, after the last frame. self.steps, MAX_STEPS and the HUD count
+        frames, so an episode still lasts at most MAX_STEPS / 60 seconds, in
+        ceil(MAX_STEPS / action_repeat) env steps.
+        """
         super().__init__()
         if render_mode is not None and render_mode not in self.metadata["render_modes"]:
             raise ValueError(f"Invalid render mode {render_mode}. Allowed modes are {self.metadata['render_modes']}")
             
+        if int(action_repeat) != action_repeat or action_repeat < 1:
+            raise ValueError(f"action_repeat must be a positive integer, got {action_repeat}")
         self.render_mode = render_mode
+        # human mode draws every step; PlaybackRunner turns this off and draws at its own pace
+        self.render_on_step = render_mode == "human"
+        self.action_repeat = int(action_repeat)
+        # env steps per simulated second; drawing one frame per step at this rate is real time
+        self.step_fps = 1.0 / (TIME_STEP * self.action_repeat)
+        self.render_size = tuple(render_size)
         self.window = None
         self.renderer = None
         self.steps = 0
-        
-        self.physics = PhysicsWorld()
+        self.fast_step = fast_step
+        self._obs_buf = np.zeros(6, dtype=np.float32)
+        self._frame_buf = np.zeros(3, dtype=np.float32)
+        self._landing_center = None
+        self.perf = PerfStats() if perf_stats else None
+
+        if isinstance(terrain_bank, str):
+            terrain_bank = TerrainBank(terrain_bank)
+        self.terrain_bank = terrain_bank
+
+        self.fidelity = fidelity
+        self.physics = PhysicsWorld(terrain_bank=self.terrain_bank, perf=self.perf, fidelity=fidelity)
+        self._cache_landing_center()
         if self.render_mode == "human":
             self._init_pygame()
 
@@ -46,17 +98,30 @@ class LunarLanderEnv(gym.Env):
         self.observation_space = spaces.Box(low=-np.inf, high=np.inf, shape=(6,), dtype=np.float32)
 
     def _init_pygame(self):
+        # pygame and the renderer are only imported once something is drawn, so
+        # render_mode="none" envs (training workers) never load them
+        import pygame
+        from .rendering import Renderer
+
         try:
-            if not pygame.get_init():
+            headless = self.render_mode == "rgb_array"
+            if headless:
+                # offscreen surface only, fonts are the one pygame module it needs
+                pygame.font.init()
+            elif not pygame.get_init():
                 pygame.init()
             if self.renderer is None:
-                self.renderer = Renderer()
+                fps = None if headless else self.step_fps
+                self.renderer = Renderer(*self.render_size, headless=headless, fps=fps)
         except Exception as e:
             self._cleanup_pygame()
             raise RuntimeError(f"Failed to initialize renderer: {str(e)}")
 
     def _cleanup_pygame(self):
+        pygame = sys.modules.get("pygame")
         try:
+            if pygame is None:
+                return
             if hasattr(pygame, 'display') and pygame.display.get_init():
                 pygame.display.quit()
             if pygame.get_init():
@@ -66,6 +131,10 @@ class LunarLanderEnv(gym.Env):
         finally:
             self.renderer = None
 
+    def _cache_landing_center(self):
+        landing_zone = self.physics.get_landing_zone()
+        self._landing_center = ((landing_zone['left'] + landing_zone['right']) / 2.0, landing_zone['y'])
+
     def _get_obs(self):
         try:
             state = self.physics.get_lander_state()
@@ -91,19 +160,33 @@ class LunarLanderEnv(gym.Env):
         Apply the action to the simulation, step forward, compute reward,
         and return observation, reward, done, truncated, and info.
         """
+        if self.fast_step:
+            return self._fast_step(action)
+
         try:
-            self.steps += 1
-            
-            thrust, torque = action
+            perf = self.perf
+            if perf is not None:
+                step_start = start = perf_counter_ns()
 
-            prev_state = self._get_obs()
+            thrust, torque = action
+            if self.action_repeat > 1:
+                earlier_reward = self._repeat_frames(thrust, torque)
+            else:
+                earlier_reward = 0.0
+                self.steps += 1
 
-            self.physics.apply_thrust(thrust)
-            self.physics.apply_torque(torque)
+                self.physics.apply_thrust(thrust)
+                self.physics.apply_torque(torque)
+                if perf is not None:
+                    perf.record('controls', start)
 
-            self.physics.step()
+                self.physics.step(self.steps % self.physics.landing_check_every == 0)
 
+            if perf is not None:
+                start = perf_counter_ns()
             obs = self._get_obs()
+            if perf is not None:
+                start = perf.record('observation', start)
 
             timeout = self.steps >= self.MAX_STEPS
             
@@ -121,10 +204,12 @@ class LunarLanderEnv(gym.Env):
 
             lin_vel_y = obs[3]
             reward -= 0.3 * (abs(lin_vel_y))
+            reward += earlier_reward
 
             done = self.physics.game_over or timeout
             info = {
                 "landed_successfully": self.physics.landed_successfully,
+                "game_over": self.physics.game_over,
                 "timeout": timeout,
                 "distance":distance
             }
@@ -134,22 +219,144 @@ class LunarLanderEnv(gym.Env):
                     reward += 400.0
                 else:
                     reward -= 100.0
+            if perf is not None:
+                start = perf.record('reward', start)
 
-            if self.render_mode == "human":
+            if self.render_on_step:
+                self.render()
+                if perf is not None:
+                    perf.record('render', start)
+
+            if perf is not None:
+                perf.record('step', step_start)
+            return obs, reward, done, False, info
+        except Exception as e:
+            raise RuntimeError(f"Error during environment step: {str(e)}")
+
+    def _fast_step(self, action):
+        """step() without the per-call dicts and arrays; see fast_step in __init__."""
+        try:
+            perf = self.perf
+            if perf is not None:
+                step_start = start = perf_counter_ns()
+
+            physics = self.physics
+
+            thrust, torque = action
+            if self.action_repeat > 1:
+                earlier_reward = self._repeat_frames(thrust, torque)
+            else:
+                earlier_reward = 0.0
+                self.steps += 1
+                physics.apply_thrust(thrust)
+                physics.apply_torque(torque)
+                if perf is not None:
+                    perf.record('controls', start)
+                physics.step(self.steps % physics.landing_check_every == 0)
+
+            if perf is not None:
+                start = perf_counter_ns()
+            lander = physics.lander
+            position = lander.position
+            velocity = lander.linearVelocity
+            landing_center_x, landing_center_y = self._landing_center
+            obs = self._obs_buf
+            obs[:] = (position.x - landing_center_x, position.y - landing_center_y,
+                      velocity.x, velocity.y, lander.angle, lander.angularVelocity)
+            if perf is not None:
+                start = perf.record('observation', start)
+
+            timeout = self.steps >= self.MAX_STEPS
+
+            # same arithmetic, in the same order, as step() so rewards match bit for bit
+            distance = np.sqrt((obs[0] - landing_center_x) ** 2 + (obs[1] - landing_center_y) ** 2)
+            reward = 5.0 - 0.31 * distance
+            reward -= 0.3 * (abs(obs[3]))
+            reward += earlier_reward
+
+            done = physics.game_over or timeout
+            if not done:
+                info = {}
+            else:
+                info = {
+                    "landed_successfully": physics.landed_successfully,
+                    "game_over": physics.game_over,
+                    "timeout": timeout,
+                    "distance": distance
+                }
+                if physics.landed_successfully:
+                    reward += 400.0
+                else:
+                    reward -= 100.0
+                # the buffer is overwritten next step, hand back a copy that can outlive it
+                obs = obs.copy()
+            if perf is not None:
+                start = perf.record('reward', start)
+
+            if self.render_on_step:
                 self.render()
+                if perf is not None:
+                    perf.record('render', start)
 
+            if perf is not None:
+                perf.record('step', step_start)
             return obs, reward, done, False, info
         except Exception as e:
             raise RuntimeError(f"Error during environment step: {str(e)}")
 
+    def _repeat_frames(self, thrust, torque):
+        """
+        Up to action_repeat physics frames with the same controls, stopping at
+        the frame that ends the episode. Returns the summed reward of all but
+        the last frame, computed like step() does; the caller adds the last.
+        """
+        physics = self.physics
+        lander = physics.lander
+        landing_center_x, landing_center_y = self._landing_center
+        frame = self._frame_buf
+        reward = 0.0
+        for i in range(self.action_repeat):
+            if i:
+                position = lander.position
+                # float32 like the observation the reward is normally computed from
+                frame[:] = (position.x - landing_center_x, position.y - landing_center_y,
+                            lander.linearVelocity.y)
+                distance = np.sqrt((frame[0] - landing_center_x) ** 2 + (frame[1] - landing_center_y) ** 2)
+                frame_reward = 5.0 - 0.31 * distance
+                frame_reward -= 0.3 * (abs(frame[2]))
+                reward += frame_reward
+            self.steps += 1
+            physics.apply_thrust(thrust)
+            physics.apply_torque(torque)
+            physics.step(self.steps % physics.landing_check_every == 0)
+            if physics.game_over or self.steps >= self.MAX_STEPS:
+                break
+        return reward
+
     def reset(self, seed=None, options=None):
+        """
+        options may hold "terrain": (landing_center, xs, ys) to start on that
+        terrain instead of a generated one (see PhysicsWorld.reset).
+        """
         try:
+            perf = self.perf
+            if perf is not None:
+                start = perf_counter_ns()
+
             self.steps = 0
             
             if seed is not None:
                 np.random.seed(seed)
-                
-            self.physics = PhysicsWorld()
+
+            terrain = options.get("terrain") if options else None
+            if self.physics is None:
+                self.physics = PhysicsWorld(terrain_bank=self.terrain_bank, seed=seed, perf=self.perf,
+                                            fidelity=self.fidelity)
+                if terrain is not None:
+                    self.physics.reset(terrain=terrain)
+            else:
+                self.physics.reset(seed=seed, terrain=terrain)
+            self._cache_landing_center()
             
             if self.render_mode == "human":
                 if self.renderer is None:
@@ -159,27 +366,61 @@ class LunarLanderEnv(gym.Env):
                 
             obs = self._get_obs()
             
-            if self.render_mode == "human":
+            if self.render_on_step:
                 self.render()
-                
+
+            if perf is not None:
+                perf.record('reset', start)
             return obs, {}
         except Exception as e:
             raise RuntimeError(f"Failed to reset environment: {str(e)}")
 
-    def render(self):
-        if self.render_mode != "human":
+    def get_state(self, out=None):
+        """
+        Mid-episode snapshot: lander pose and velocities, step counter, episode
+        flags and a terrain reference in one small float64 array (see
+        physics.STATE_FIELDS). set_state() on this or any other LunarLanderEnv
+        in the process continues the episode exactly as this env would.
+        """
+        state = self.physics.get_state(out)
+        state[STATE_STEPS] = self.steps
+        return state
+
+    def set_state(self, state):
+        """Restore a get_state() snapshot and return its observation."""
+        self.physics.set_state(state)
+        self.steps = int(state[STATE_STEPS])
+        self._cache_landing_center()
+        return self._get_obs()
+
+    def get_perf_stats(self, clear=False):
+        """
+        Phase timings since construction (or the last clear), as
+        phase -> {count, total_ns, mean_us, p50_us, p99_us, histogram}.
+        'step' and 'reset' are whole calls, the rest are parts of them. Empty
+        unless the env was created with perf_stats=True.
+        """
+        if self.perf is None:
+            return {}
+        stats = self.perf.summary()
+        if clear:
+            self.perf.clear()
+        return stats
+
+    def render(self, pose=None):
+        """pose: optional (position, angle) to draw the lander at instead of its physics pose."""
+        if self.render_mode not in ("human", "rgb_array"):
             return
             
         if self.renderer is None:
             self._init_pygame()
             
         try:
-            self.renderer.clear()
-            for segment in self.physics.ground_segments:
-                self.renderer.draw_ground(segment)
-
-            self.renderer.draw_landing_zone(self.physics.get_landing_zone())
+            self.renderer.draw_background(self.physics.ground_segments, self.physics.get_landing_zone(),
+                                          self.physics.terrain_profile)
             state = self.physics.get_lander_state()
+            if pose is not None:
+                state['position'], state['angle'] = pose
             self.renderer.draw_lander(state['position'], state['angle'])
             if state.get('is_thrusting'):
                 self.renderer.draw_thrust_effect(state['position'], state['angle'])
@@ -188,6 +429,7 @@ class LunarLanderEnv(gym.Env):
             
             self.renderer.draw_game_state(state)
             self.renderer.update()
+            return self.renderer.frame
         except Exception as e:
             print(f"Warning: Render failed: {str(e)}")
             self._cleanup_pygame()  # Try to clean up if rendering fails
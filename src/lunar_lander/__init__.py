@@ -0,0 +1,51 @@
+"""
+Custom Lunar Lander environment for reinforcement learning
+
+The names below are imported on first use, so `import lunar_lander` costs
+almost nothing and the headless core (physics and LunarLanderEnv with
+render_mode="none") never loads pygame, stable-baselines3 or torch. Those come
+in with the renderer, the SB3 VecEnvs and callbacks, or a training script.
+
+    from lunar_lander import LunarLanderEnv
+    env = LunarLanderEnv(render_mode="none")
+"""
+
+import importlib
+
+# public name -> module that defines it
+_EXPORTS = {
+    "LunarLanderEnv": "Lunar_Lander_custom_env",
+    "PhysicsWorld": "physics",
+    "TerrainBank": "terrain_bank",
+    "PerfStats": "perf",
+    "Renderer": "rendering",
+    "VectorLunarLanderEnv": "vector_env",
+    "SharedMemoryVecEnv": "shared_vec_env",
+    "EpisodeRecorder": "recorder",
+    "EpisodeReplayer": "recorder",
+    "AsyncEvalCallback": "async_eval",
+    "PerfStatsCallback": "callbacks",
+    "CheckpointStore": "checkpoints",
+    "CompactReplayBuffer": "replay_buffer",
+    "NumpyPolicy": "numpy_policy",
+    "export_policy": "numpy_policy",
+    "InferenceServer": "inference_server",
+    "InferenceClient": "inference_server",
+    "PlaybackRunner": "playback",
+    "MultiLanderWorld": "multi_lander",
+    "MultiLanderVecEnv": "multi_lander",
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name):
+    if name not in _EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f".{_EXPORTS[name]}", __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
@@ -0,0 +1,214 @@
+"""
+Asynchronous evaluation during training
+
+AsyncEvalCallback is a drop-in for stable-baselines3's EvalCallback that does
+not pause training. Every eval_freq calls it copies the policy weights and
+hands them to an evaluator process with its own LunarLanderEnv, then lets PPO
+carry on. Finished evaluations are picked up at the end of a rollout: they
+go into evaluations.npz (same keys as EvalCallback, plus successes =
+landed_successfully) and the eval/ logs. A new best saves best_model.zip with
+the weights that were evaluated.
+
+At most max_in_flight evaluations are queued or running. When the evaluator
+is behind, an evaluation point is skipped (counted in eval/skipped) rather than
+queued. If the evaluator fails (an exception, or the process is killed) the
+callback raises in the training process with its traceback or exit code.
+"""
+
+import multiprocessing as mp
+import os
+import queue
+import traceback
+
+import numpy as np
+from stable_baselines3.common.callbacks import BaseCallback
+
+
+def _zero_schedule(_):
+    return 0.0
+
+
+def _evaluator(requests, results, policy_class, observation_space, action_space, policy_kwargs,
+               n_eval_episodes, deterministic, env_kwargs):
+    # imported in the child so the spawn start method only pays for what it needs
+    import torch
+    from stable_baselines3.common.evaluation import evaluate_policy
+    from stable_baselines3.common.monitor import Monitor
+    from stable_baselines3.common.vec_env import DummyVecEnv
+
+    from .Lunar_Lander_custom_env import LunarLanderEnv
+
+    # leave the cores to training: one thread, and lower priority where the cpu is contended
+    torch.set_num_threads(1)
+    if hasattr(os, "nice"):
+        os.nice(10)
+    # failures go back as ("error", eval_id, traceback) for the callback to raise
+    try:
+        policy = policy_class(observation_space, action_space, _zero_schedule, **policy_kwargs)
+        policy.set_training_mode(False)
+        env = DummyVecEnv([lambda: Monitor(LunarLanderEnv(render_mode="none", **env_kwargs))])
+    except Exception:
+        results.put(("error", None, traceback.format_exc()))
+        return
+
+    while True:
+        request = requests.get()
+        if request is None:
+            break
+        eval_id, state = request
+        successes = []
+
+        def log_success(locals_, globals_):
+            if locals_["done"]:
+                successes.append(bool(locals_["info"].get("landed_successfully", False)))
+
+        try:
+            policy.load_state_dict({name: torch.as_tensor(value) for name, value in state.items()})
+            rewards, lengths = evaluate_policy(policy, env, n_eval_episodes=n_eval_episodes,
+                                               deterministic=deterministic, return_episode_rewards=True,
+                                               callback=log_success)
+        except Exception:
+            results.put(("error", eval_id, traceback.format_exc()))
+            continue
+        results.put((eval_id, rewards, lengths, successes))
+    env.close()
+
+
+class AsyncEvalCallback(BaseCallback):
+    """
+    Like EvalCallback(eval_env, best_model_save_path, log_path, eval_freq,
+    n_eval_episodes, deterministic), but the eval env is built in the
+    evaluator process from env_kwargs (LunarLanderEnv keyword arguments).
+    """
+
+    def __init__(self, eval_freq=10000, n_eval_episodes=5, best_model_save_path=None, log_path=None,
+                 deterministic=True, max_in_flight=1, env_kwargs=None, start_method="spawn", verbose=1):
+        super().__init__(verbose)
+        self.eval_freq = eval_freq
+        self.n_eval_episodes = n_eval_episodes
+        self.best_model_save_path = best_model_save_path
+        self.log_path = os.path.join(log_path, "evaluations") if log_path is not None else None
+        self.deterministic = deterministic
+        self.max_in_flight = max_in_flight
+        self.env_kwargs = env_kwargs or {}
+        self.start_method = start_method
+
+        self.best_mean_reward = -np.inf
+        self.last_mean_reward = -np.inf
+        self.skipped = 0
+        self.evaluations_timesteps = []
+        self.evaluations_results = []
+        self.evaluations_length = []
+        self.evaluations_successes = []
+        self._in_flight = {}  # eval id -> (timesteps, weights)
+        self._next_id = 0
+        self._process = None
+
+    def _init_callback(self):
+        for path in (self.best_model_save_path, self.log_path and os.path.dirname(self.log_path)):
+            if path:
+                os.makedirs(path, exist_ok=True)
+
+        ctx = mp.get_context(self.start_method)
+        self._requests = ctx.Queue()
+        self._results = ctx.Queue()
+        policy = self.model.policy
+        self._process = ctx.Process(
+            target=_evaluator,
+            args=(self._requests, self._results, self.model.policy_class, policy.observation_space,
+                  policy.action_space, self.model.policy_kwargs, self.n_eval_episodes, self.deterministic,
+                  self.env_kwargs),
+            daemon=True,
+        )
+        self._process.start()
+
+    def _on_step(self):
+        if self.eval_freq > 0 and self.n_calls % self.eval_freq == 0:
+            if not self._process.is_alive():
+                self._evaluator_died()
+            if len(self._in_flight) >= self.max_in_flight:
+                self.skipped += 1
+                self.logger.record("eval/skipped", self.skipped)
+            else:
+                state = {name: tensor.detach().cpu().numpy().copy()
+                         for name, tensor in self.model.policy.state_dict().items()}
+                self._in_flight[self._next_id] = (self.num_timesteps, state)
+                self._requests.put((self._next_id, state))
+                self._next_id += 1
+        return True
+
+    def _on_rollout_end(self):
+        self._collect(block=False)
+
+    def _on_training_end(self):
+        # the last evaluations still count, wait for them before shutting down
+        self._collect(block=True)
+        self._requests.put(None)
+        self._process.join(timeout=30)
+
+    def _collect(self, block):
+        while self._in_flight:
+            # checked before reading: a dead evaluator has flushed everything it sent
+            alive = self._process.is_alive()
+            try:
+                result = self._results.get(timeout=1.0) if block else self._results.get_nowait()
+            except queue.Empty:
+                if not alive:
+                    self._evaluator_died()
+                if block:
+                    continue
+                return
+            if result[0] == "error":
+                raise RuntimeError(f"evaluation failed in the evaluator process:\n{result[2]}")
+            eval_id, rewards, lengths, successes = result
+            timesteps, state = self._in_flight.pop(eval_id)
+            self._record(timesteps, state, rewards, lengths, successes)
+
+    def _evaluator_died(self):
+        """Raise the dead evaluator's traceback if it sent one, its exit code otherwise."""
+        while True:
+            try:
+                result = self._results.get_nowait()
+            except queue.Empty:
+                break
+            if result[0] == "error":
+                raise RuntimeError(f"evaluation failed in the evaluator process:\n{result[2]}")
+        raise RuntimeError(f"the evaluator process exited with code {self._process.exitcode}; "
+                           f"{len(self._in_flight)} evaluations were pending")
+
+    def _record(self, timesteps, state, rewards, lengths, successes):
+        if self.log_path is not None:
+            self.evaluations_timesteps.append(timesteps)
+            self.evaluations_results.append(rewards)
+            self.evaluations_length.append(lengths)
+            self.evaluations_successes.append(successes)
+            np.savez(self.log_path, timesteps=self.evaluations_timesteps, results=self.evaluations_results,
+                     ep_lengths=self.evaluations_length, successes=self.evaluations_successes)
+
+        mean_reward, std_reward = np.mean(rewards), np.std(rewards)
+        self.last_mean_reward = float(mean_reward)
+        if self.verbose >= 1:
+            print(f"Eval num_timesteps={timesteps}, episode_reward={mean_reward:.2f} +/- {std_reward:.2f}")
+        self.logger.record("eval/mean_reward", float(mean_reward))
+        self.logger.record("eval/mean_ep_length", float(np.mean(lengths)))
+        self.logger.record("eval/success_rate", float(np.mean(successes)))
+        self.logger.record("eval/timesteps", timesteps)
+
+        if mean_reward > self.best_mean_reward:
+            self.best_mean_reward = float(mean_reward)
+            if self.verbose >= 1:
+                print("New best mean reward!")
+            if self.best_model_save_path is not None:
+                self._save_with_weights(state, os.path.join(self.best_model_save_path, "best_model"))
+
+    def _save_with_weights(self, state, path):
+        """Save the model with the evaluated weights (the optimizer state is the current one)."""
+        import torch
+
+        policy = self.model.policy
+        current = {name: tensor.detach().clone() for name, tensor in policy.state_dict().items()}
+        policy.load_state_dict({name: torch.as_tensor(value) for name, value in state.items()})
+        try:
+            self.model.save(path)
+        finally:
+            policy.load_state_dict(current)
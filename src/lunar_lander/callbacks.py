@@ -0,0 +1,30 @@
+"""
+Training callbacks for stable-baselines3
+
+Kept out of the env modules so that only training code imports SB3.
+AsyncEvalCallback lives in async_eval.py.
+"""
+
+from stable_baselines3.common.callbacks import BaseCallback
+
+from .perf import merge_stats
+
+
+class PerfStatsCallback(BaseCallback):
+    """
+    Logs the env phase timings (see LunarLanderEnv.get_perf_stats) after every
+    rollout under perf/, e.g. perf/physics_step_mean_us and perf/physics_step_share
+    (fraction of env.step time). Needs envs created with perf_stats=True.
+    """
+
+    def _on_step(self):
+        return True
+
+    def _on_rollout_end(self):
+        stats = merge_stats(self.training_env.env_method("get_perf_stats", clear=True))
+        step_ns = stats.get("step", {}).get("total_ns", 0)
+        for phase, entry in stats.items():
+            self.logger.record(f"perf/{phase}_mean_us", entry["mean_us"])
+            self.logger.record(f"perf/{phase}_p99_us", entry["p99_us"])
+            if step_ns and phase not in ("step", "reset", "terrain"):
+                self.logger.record(f"perf/{phase}_share", entry["total_ns"] / step_ns)
@@ -0,0 +1,362 @@
+"""
+Deduplicated checkpoint store
+
+CheckpointStore keeps training checkpoints of an SB3 model in one directory:
+
+    objects/ab/abcdef...      content-addressed blobs: one per tensor, per
+                              entry of the model's data dict and per
+                              state_dict skeleton (the non-tensor structure)
+    checkpoints/<name>.json   one manifest per checkpoint, listing its blobs
+
+A blob is only written if no checkpoint has it yet, so the parts that do not
+change between saves (observation/action spaces, policy class, schedules,
+untouched tensors) are stored once. save() only copies the tensors and
+serializes the data dict; hashing and writing run on a background thread.
+
+After every save the retention policy decides which checkpoints survive:
+the keep_last newest, the keep_best with the highest reward, and (with
+thin=True) the oldest checkpoint in each power-of-two age bucket, so older
+history gets sparser instead of disappearing. Blobs no surviving checkpoint
+uses are then deleted.
+
+export() writes any checkpoint back as a regular SB3 zip for PPO.load:
+
+    python -m lunar_lander.checkpoints list models/checkpoints
+    python -m lunar_lander.checkpoints export models/checkpoints 880000 models/PPO/880000.zip
+"""
+
+import argparse
+import hashlib
+import io
+import json
+import os
+import pickle
+import queue
+import threading
+import time
+import zipfile
+
+import numpy as np
+
+FORMAT_VERSION = 1
+
+
+def _digest(data):
+    return hashlib.blake2b(data, digest_size=20).hexdigest()
+
+
+def _split_tensors(obj, tensors):
+    """Replace the torch tensors in a (nested) state_dict by ("__tensor__", index) and collect them as arrays."""
+    if hasattr(obj, "detach"):
+        tensors.append(obj.detach().cpu().numpy().copy())
+        return ("__tensor__", len(tensors) - 1)
+    if isinstance(obj, dict):
+        return type(obj)((key, _split_tensors(value, tensors)) for key, value in obj.items())
+    if isinstance(obj, (list, tuple)):
+        return type(obj)(_split_tensors(value, tensors) for value in obj)
+    return obj
+
+
+def _join_tensors(obj, tensors):
+    if isinstance(obj, tuple) and len(obj) == 2 and obj[0] == "__tensor__":
+        return tensors[obj[1]]
+    if isinstance(obj, dict):
+        return type(obj)((key, _join_tensors(value, tensors)) for key, value in obj.items())
+    if isinstance(obj, (list, tuple)):
+        return type(obj)(_join_tensors(value, tensors) for value in obj)
+    return obj
+
+
+def snapshot(model, cache=None):
+    """
+    Everything model.save() would write, taken now: the data dict already
+    serialized to JSON per key, and the state_dicts / torch variables with
+    their tensors copied out as numpy arrays.
+
+    cache (a dict kept between calls) skips re-pickling the classes and spaces
+    in the data dict while they are the same objects.
+    """
+    import stable_baselines3
+    from gymnasium.spaces import Space
+    from stable_baselines3.common.save_util import data_to_json, recursive_getattr
+
+    # same selection as BaseAlgorithm.save
+    data = model.__dict__.copy()
+    exclude = set(model._excluded_save_params())
+    state_dicts_names, torch_variable_names = model._get_torch_save_params()
+    for torch_var in state_dicts_names + torch_variable_names:
+        exclude.add(torch_var.split(".")[0])
+    for name in exclude:
+        data.pop(name, None)
+
+    cache = {} if cache is None else cache
+    encoded = {key: cache[key][1] for key, value in data.items() if key in cache and cache[key][0] is value}
+    fresh = {key: value for key, value in data.items() if key not in encoded}
+    for key, value in json.loads(data_to_json(fresh)).items():
+        encoded[key] = json.dumps(value).encode()
+        if isinstance(data[key], (type, Space)):
+            cache[key] = (data[key], encoded[key])
+    state = {
+        "data": {key: encoded[key] for key in data},
+        "params": {},
+        "sb3_version": stable_baselines3.__version__,
+    }
+    parts = dict(model.get_parameters())
+    if torch_variable_names:
+        parts["pytorch_variables"] = {name: recursive_getattr(model, name) for name in torch_variable_names}
+    for part, value in parts.items():
+        tensors = []
+        skeleton = _split_tensors(value, tensors)
+        state["params"][part] = (pickle.dumps(skeleton), tensors)
+    return state
+
+
+class CheckpointStore:
+    def __init__(self, root, keep_last=5, keep_best=3, thin=True, max_pending=2):
+        self.root = root
+        self.keep_last = keep_last
+        self.keep_best = keep_best
+        self.thin = thin
+        self._objects = os.path.join(root, "objects")
+        self._manifests = os.path.join(root, "checkpoints")
+        os.makedirs(self._objects, exist_ok=True)
+        os.makedirs(self._manifests, exist_ok=True)
+
+        # bounded, so a slow disk makes save() wait instead of piling up snapshots
+        self._jobs = queue.Queue(maxsize=max_pending)
+        self._error = None
+        self._thread = None
+        self._serialized = {}
+        self.bytes_written = 0
+        self.blobs_written = 0
+        self.blobs_reused = 0
+
+    # ------------------------------------------------------------------ saving
+
+    def save(self, model, name=None, reward=None):
+        """
+        Queue a checkpoint of model under name (default: its num_timesteps).
+        reward (e.g. a mean evaluation reward) ranks it for keep_best.
+        Returns the name once the snapshot is taken; use wait() to know it is on disk.
+        """
+        self._raise_error()
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._worker, name="checkpoint-writer", daemon=True)
+            self._thread.start()
+        name = str(model.num_timesteps if name is None else name)
+        if reward is not None and np.isnan(reward):
+            reward = None  # e.g. safe_mean of an empty episode buffer
+        info = {"name": name, "timesteps": int(model.num_timesteps),
+                "reward": None if reward is None else float(reward), "created": time.time()}
+        self._jobs.put((info, snapshot(model, self._serialized)))
+        return name
+
+    def wait(self):
+        """Block until every queued checkpoint is written and pruned."""
+        if self._thread is not None:
+            self._jobs.join()
+        self._raise_error()
+
+    def close(self):
+        if self._thread is not None:
+            self._jobs.join()
+            self._jobs.put(None)
+            self._thread.join()
+            self._thread = None
+        self._raise_error()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _raise_error(self):
+        if self._error is not None:
+            error, self._error = self._error, None
+            raise RuntimeError(f"writing a checkpoint failed: {error}") from error
+
+    def _worker(self):
+        while True:
+            job = self._jobs.get()
+            try:
+                if job is None:
+                    return
+                self._write(*job)
+                self.prune()
+            except Exception as e:
+                self._error = e
+            finally:
+                self._jobs.task_done()
+
+    def _put(self, data):
+        digest = _digest(data)
+        path = self._blob_path(digest)
+        if os.path.exists(path):
+            self.blobs_reused += 1
+            return digest
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = f"{path}.{threading.get_ident()}.tmp"
+        with open(tmp, "wb") as f:
+            f.write(data)
+        os.replace(tmp, path)
+        self.bytes_written += len(data)
+        self.blobs_written += 1
+        return digest
+
+    def _write(self, info, state):
+        manifest = dict(info, version=FORMAT_VERSION, sb3_version=state["sb3_version"])
+        manifest["data"] = {key: self._put(value) for key, value in state["data"].items()}
+        manifest["params"] = {}
+        for part, (skeleton, tensors) in state["params"].items():
+            manifest["params"][part] = {
+                "skeleton": self._put(skeleton),
+                "tensors": [[self._put(np.ascontiguousarray(array).tobytes()), array.dtype.str, list(array.shape)]
+                            for array in tensors],
+            }
+        path = self._manifest_path(info["name"])
+        with open(path + ".tmp", "w") as f:
+            json.dump(manifest, f)
+        # the manifest goes last, so a checkpoint exists only once all of its blobs do
+        os.replace(path + ".tmp", path)
+
+    def _blob_path(self, digest):
+        return os.path.join(self._objects, digest[:2], digest)
+
+    def _manifest_path(self, name):
+        return os.path.join(self._manifests, f"{name}.json")
+
+    # ---------------------------------------------------------------- retention
+
+    def checkpoints(self):
+        """Manifests of the stored checkpoints, oldest first."""
+        manifests = []
+        for file_name in os.listdir(self._manifests):
+            if file_name.endswith(".json"):
+                with open(os.path.join(self._manifests, file_name)) as f:
+                    manifests.append(json.load(f))
+        return sorted(manifests, key=lambda m: (m["timesteps"], m["created"]))
+
+    def retained(self, manifests):
+        """Names of the checkpoints the retention policy keeps."""
+        if not manifests:
+            return set()
+        keep = {m["name"] for m in manifests[max(len(manifests) - self.keep_last, 0):]}
+        rated = sorted((m for m in manifests if m["reward"] is not None), key=lambda m: m["reward"])
+        keep.update(m["name"] for m in rated[max(len(rated) - self.keep_best, 0):])
+        if self.thin:
+            # the oldest checkpoint in each age bucket [2^k, 2^(k+1)) timesteps before the newest
+            newest = manifests[-1]["timesteps"]
+            oldest_in_bucket = {}
+            for m in manifests:
+                oldest_in_bucket.setdefault((newest - m["timesteps"]).bit_length(), m["name"])
+            keep.update(oldest_in_bucket.values())
+        return keep
+
+    def prune(self):
+        """Delete the checkpoints the retention policy drops, then the blobs nothing refers to."""
+        manifests = self.checkpoints()
+        keep = self.retained(manifests)
+        live = set()
+        for m in manifests:
+            if m["name"] not in keep:
+                os.remove(self._manifest_path(m["name"]))
+                continue
+            live.update(m["data"].values())
+            for part in m["params"].values():
+                live.add(part["skeleton"])
+                live.update(digest for digest, _, _ in part["tensors"])
+        for prefix in os.listdir(self._objects):
+            directory = os.path.join(self._objects, prefix)
+            for digest in os.listdir(directory):
+                if digest not in live and not digest.endswith(".tmp"):
+                    os.remove(os.path.join(directory, digest))
+
+    # ---------------------------------------------------------------- exporting
+
+    def _manifest(self, name):
+        manifests = self.checkpoints()
+        if not manifests:
+            raise FileNotFoundError(f"no checkpoints in {self.root}")
+        if name == "latest":
+            return manifests[-1]
+        if name == "best":
+            rated = [m for m in manifests if m["reward"] is not None]
+            return max(rated, key=lambda m: m["reward"]) if rated else manifests[-1]
+        for m in manifests:
+            if m["name"] == str(name):
+                return m
+        raise KeyError(f"no checkpoint named {name} in {self.root} "
+                       f"(have {', '.join(m['name'] for m in manifests)})")
+
+    def _get(self, digest):
+        with open(self._blob_path(digest), "rb") as f:
+            return f.read()
+
+    def _load_part(self, part):
+        import torch
+
+        tensors = [torch.from_numpy(np.frombuffer(self._get(digest), dtype=dtype).reshape(shape).copy())
+                   for digest, dtype, shape in part["tensors"]]
+        return _join_tensors(pickle.loads(self._get(part["skeleton"])), tensors)
+
+    def export(self, name, path):
+        """
+        Write checkpoint name ("latest", "best" or a saved name) as a standard
+        SB3 zip at path (a file path or a binary file object) and return path.
+        """
+        import torch
+        from stable_baselines3.common.utils import get_system_info
+
+        self.wait()
+        manifest = self._manifest(name)
+        data = {key: json.loads(self._get(digest)) for key, digest in manifest["data"].items()}
+        # same archive layout as stable_baselines3.common.save_util.save_to_zip_file
+        if isinstance(path, str):
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with zipfile.ZipFile(path, mode="w") as archive:
+            archive.writestr("data", json.dumps(data, indent=4))
+            for part_name, part in manifest["params"].items():
+                with archive.open(part_name + ".pth", mode="w", force_zip64=True) as f:
+                    torch.save(self._load_part(part), f)
+            archive.writestr("_stable_baselines3_version", manifest["sb3_version"])
+            archive.writestr("system_info.txt", get_system_info(print_info=False)[1])
+        return path
+
+    def load(self, name, algorithm, **kwargs):
+        """algorithm.load (e.g. PPO.load) straight from the store, without a zip on disk."""
+        buffer = io.BytesIO()
+        self.export(name, buffer)
+        buffer.seek(0)
+        return algorithm.load(buffer, **kwargs)
+
+    def disk_usage(self):
+        total = 0
+        for directory, _, files in os.walk(self.root):
+            total += sum(os.path.getsize(os.path.join(directory, f)) for f in files)
+        return total
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Inspect or export a checkpoint store")
+    sub = parser.add_subparsers(dest="command", required=True)
+    list_parser = sub.add_parser("list", help="stored checkpoints")
+    list_parser.add_argument("root")
+    export_parser = sub.add_parser("export", help="write a checkpoint as a regular SB3 zip")
+    export_parser.add_argument("root")
+    export_parser.add_argument("name", help='checkpoint name, "latest" or "best"')
+    export_parser.add_argument("path")
+    args = parser.parse_args()
+
+    store = CheckpointStore(args.root)
+    if args.command == "list":
+        for m in store.checkpoints():
+            reward = "" if m["reward"] is None else f"  reward {m['reward']:.1f}"
+            print(f"{m['name']:>10s}  {m['timesteps']:>9d} timesteps{reward}")
+        print(f"{store.disk_usage() / 1e6:.1f} MB in {store.root}")
+    else:
+        print(store.export(args.name, args.path))
+
+
+if __name__ == "__main__":
+    main()
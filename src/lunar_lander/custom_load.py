@@ -1,24 +1,44 @@
+import argparse
 import os
-from stable_baselines3 import PPO
-from Lunar_Lander_custom_env import LunarLanderEnv
+from .Lunar_Lander_custom_env import LunarLanderEnv
+from .numpy_policy import NumpyPolicy
+from .physics import TIME_STEP
+from .playback import PlaybackRunner
+from .recorder import EpisodeRecorder
 
 # best model folder maybe I will change the name later
-models_dir = "../../custom_lunar"
+models_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "custom_lunar")
 model_path = os.path.join(models_dir, "best_model1.zip")
+# default --record directory, look at the episodes again with recorder.py stats/replay
+recordings_dir = os.path.join(models_dir, "recordings")
 
-env = LunarLanderEnv(render_mode="human")
 
-model = PPO.load(model_path, env=env)
+def main():
+    parser = argparse.ArgumentParser(description="Watch the trained model land")
+    parser.add_argument("--episodes", type=int, default=5)
+    parser.add_argument("--speed", type=float, default=1.0, help="playback speed, 1 is real time")
+    parser.add_argument("--no-render", action="store_true", help="play without a window, as fast as possible")
+    parser.add_argument("--record", nargs="?", const=recordings_dir, metavar="DIR",
+                        help="append the episodes to a recording in DIR (default custom_lunar/recordings)")
+    args = parser.parse_args()
 
-episodes = 5
+    env = LunarLanderEnv(render_mode="none" if args.no_render else "human")
+    if args.record:
+        env = EpisodeRecorder(env, args.record)
 
-for episode in range(episodes):
-    obs, info = env.reset()
-    done = False
-    while not done:
-        action, _states = model.predict(obs)
-        obs, reward, terminated, truncated, info = env.step(action)
-        done = terminated or truncated
-        env.render()
+    # plain NumPy forward pass, no torch import; the .npz is (re)exported from the zip when needed
+    model = NumpyPolicy.from_model(model_path)
 
-env.close()
+    # steps physics at a fixed rate and draws at most render_fps interpolated frames
+    runner = PlaybackRunner(env, model, speed=args.speed, render=not args.no_render)
+    for episode in range(args.episodes):
+        reward, steps = runner.play_episode()
+        if runner.closed:
+            break
+        print(f"episode {episode}: reward {reward:.1f} in {steps * TIME_STEP:.1f} s", flush=True)
+
+    env.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+import argparse
+import os
+import sys
+import traceback
+from .Lunar_Lander_custom_env import LunarLanderEnv
+from .physics import FIDELITY_PROFILES
+from .custom_run import PROJECT_DIR, cleanup_pygame
+
+
+OFF_POLICY_KWARGS = {
+    "sac": dict(
+        learning_rate=3e-4,
+        buffer_size=1_000_000,
+        learning_starts=10_000,
+        batch_size=256,
+        tau=0.005,
+        gamma=0.99,
+        train_freq=1,
+        gradient_steps=1,
+        policy_kwargs=dict(net_arch=[256, 256]),
+    ),
+    "td3": dict(
+        learning_rate=1e-3,
+        buffer_size=1_000_000,
+        learning_starts=10_000,
+        batch_size=256,
+        tau=0.005,
+        gamma=0.99,
+        train_freq=1,
+        gradient_steps=1,
+        policy_kwargs=dict(net_arch=[400, 300]),
+    ),
+}
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Train SAC or TD3 on the custom Lunar Lander env")
+    parser.add_argument("--algo", choices=sorted(OFF_POLICY_KWARGS), default="sac")
+    parser.add_argument("--timesteps", type=int, default=500000)
+    parser.add_argument("--buffer-size", type=int, default=None,
+                        help="replay buffer transitions (default: 1,000,000)")
+    parser.add_argument("--buffer-dir", default=None,
+                        help="keep the replay buffer in memory-mapped files in this directory")
+    parser.add_argument("--stock-buffer", action="store_true",
+                        help="use SB3's float32 ReplayBuffer instead of CompactReplayBuffer")
+    parser.add_argument("--fidelity", choices=sorted(FIDELITY_PROFILES), default="default",
+                        help="physics profile of the training envs (see physics.FIDELITY_PROFILES)")
+    parser.add_argument("--eval-fidelity", choices=sorted(FIDELITY_PROFILES), default="default",
+                        help="physics profile of the evaluation env")
+    parser.add_argument("--action-repeat", type=int, default=1,
+                        help="physics frames per env step, for training and evaluation (frame skip)")
+    parser.add_argument("--tensorboard-log", default=None,
+                        help="tensorboard log dir (e.g. logs)")
+    parser.add_argument("--sync-eval", action="store_true",
+                        help="evaluate in the training process (EvalCallback), pausing training meanwhile")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    # imported here like in custom_run.py, so the evaluator process only loads what it needs
+    import numpy as np
+    from stable_baselines3 import SAC, TD3
+    from stable_baselines3.common.callbacks import EvalCallback
+    from stable_baselines3.common.noise import NormalActionNoise
+    from .async_eval import AsyncEvalCallback
+    from .replay_buffer import CompactReplayBuffer
+
+    env = None
+    eval_env = None
+
+    try:
+        save_path = os.path.join(PROJECT_DIR, "custom_lunar", args.algo)
+        os.makedirs(save_path, exist_ok=True)
+
+        env = LunarLanderEnv(render_mode="none", fidelity=args.fidelity, action_repeat=args.action_repeat)
+
+        if args.sync_eval:
+            eval_env = LunarLanderEnv(render_mode="none", fidelity=args.eval_fidelity,
+                                      action_repeat=args.action_repeat)
+            eval_callback = EvalCallback(eval_env,
+                                         best_model_save_path=save_path,
+                                         log_path=save_path,
+                                         eval_freq=10000,
+                                         deterministic=True,
+                                         render=False)
+        else:
+            eval_callback = AsyncEvalCallback(best_model_save_path=save_path,
+                                              log_path=save_path,
+                                              eval_freq=10000,
+                                              deterministic=True,
+                                              env_kwargs=dict(fidelity=args.eval_fidelity,
+                                                              action_repeat=args.action_repeat))
+
+        kwargs = dict(OFF_POLICY_KWARGS[args.algo])
+        if args.buffer_size is not None:
+            kwargs["buffer_size"] = args.buffer_size
+        if not args.stock_buffer:
+            kwargs["replay_buffer_class"] = CompactReplayBuffer
+            kwargs["replay_buffer_kwargs"] = dict(path=args.buffer_dir)
+        if args.algo == "td3":
+            n_actions = env.action_space.shape[0]
+            kwargs["action_noise"] = NormalActionNoise(np.zeros(n_actions), 0.1 * np.ones(n_actions))
+
+        algo = {"sac": SAC, "td3": TD3}[args.algo]
+        model = algo("MlpPolicy", env, verbose=1, tensorboard_log=args.tensorboard_log, **kwargs)
+        model.learn(total_timesteps=args.timesteps, callback=eval_callback)
+
+    except KeyboardInterrupt:
+        print("\nTraining interrupted by user")
+    except Exception as e:
+        print(f"\nTraining failed with error: {str(e)}")
+        traceback.print_exc()
+    finally:
+        if env is not None:
+            try:
+                env.close()
+            except Exception:
+                pass
+        if eval_env is not None:
+            try:
+                eval_env.close()
+            except Exception:
+                pass
+
+        cleanup_pygame()
+
+
+if __name__ == "__main__":
+    main()
+    sys.exit(0)
@@ -1,13 +1,33 @@
+import argparse
 import os
 import sys
-import pygame
 import traceback
-from stable_baselines3 import PPO
-from stable_baselines3.common.callbacks import EvalCallback
-from Lunar_Lander_custom_env import LunarLanderEnv
+from .Lunar_Lander_custom_env import LunarLanderEnv
+from .physics import FIDELITY_PROFILES
+
+
+# repository root, where custom_lunar/ lives
+PROJECT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..")
+
+# pretty standard parameters
+PPO_KWARGS = dict(
+    learning_rate=3e-4,
+    n_steps=1024,
+    batch_size=128,
+    n_epochs=5,
+    gamma=0.999,
+    gae_lambda=0.98,
+    clip_range=0.2,
+    policy_kwargs=dict(
+        net_arch=[dict(pi=[128, 128], vf=[128, 128])]
+    ),
+)
 
 
 def cleanup_pygame():
+    pygame = sys.modules.get("pygame")  # only loaded if something rendered
+    if pygame is None:
+        return
     try:
         if hasattr(pygame, 'display') and pygame.display.get_init():
             pygame.display.quit()
@@ -17,39 +37,79 @@ def cleanup_pygame():
         pass
 
 
+def parse_args():
+    parser = argparse.ArgumentParser(description="Train PPO on the custom Lunar Lander env")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="rollout worker processes (1 keeps the single in-process env)")
+    parser.add_argument("--envs-per-worker", type=int, default=1,
+                        help="envs stepped by each worker")
+    parser.add_argument("--perf-stats", action="store_true",
+                        help="time the env step phases and log them under perf/")
+    parser.add_argument("--fidelity", choices=sorted(FIDELITY_PROFILES), default="default",
+                        help="physics profile of the training envs (see physics.FIDELITY_PROFILES)")
+    parser.add_argument("--eval-fidelity", choices=sorted(FIDELITY_PROFILES), default="default",
+                        help="physics profile of the evaluation env")
+    parser.add_argument("--action-repeat", type=int, default=1,
+                        help="physics frames per env step, for training and evaluation (frame skip)")
+    parser.add_argument("--tensorboard-log", default=None,
+                        help="tensorboard log dir (e.g. logs)")
+    parser.add_argument("--sync-eval", action="store_true",
+                        help="evaluate in the training process (EvalCallback), pausing training meanwhile")
+    return parser.parse_args()
+
+
 def main():
+    args = parse_args()
+    # SB3 and torch are imported here rather than at the top: spawned rollout
+    # workers re-import this module and only need the env
+    from stable_baselines3 import PPO
+    from stable_baselines3.common.callbacks import EvalCallback
+    from stable_baselines3.common.vec_env import VecMonitor
+    from .async_eval import AsyncEvalCallback
+    from .callbacks import PerfStatsCallback
+    from .shared_vec_env import SharedMemoryVecEnv
+
     env = None
     eval_env = None
 
     try:
-        save_path = "../../custom_lunar"
+        save_path = os.path.join(PROJECT_DIR, "custom_lunar")
         os.makedirs(save_path, exist_ok=True)
 
-        env = LunarLanderEnv(render_mode="none")
-        eval_env = LunarLanderEnv(render_mode="none")
+        n_envs = args.workers * args.envs_per_worker
+        env_kwargs = dict(perf_stats=args.perf_stats, fidelity=args.fidelity, action_repeat=args.action_repeat)
+        if n_envs > 1:
+            # note that n_steps below is per env, so each rollout is n_steps * n_envs
+            env = VecMonitor(SharedMemoryVecEnv(args.workers, args.envs_per_worker, env_kwargs=env_kwargs))
+        else:
+            env = LunarLanderEnv(render_mode="none", **env_kwargs)
 
         # eval callback rewrite the saved best model every 10000 iterations
-        eval_callback = EvalCallback(eval_env,
-                                     best_model_save_path=save_path,
-                                     log_path=save_path,
-                                     eval_freq=10000,
-                                     deterministic=True,
-                                     render=False)
-
-        model = PPO("MlpPolicy",  # pretty standard parameters
-                    env,
-                    verbose=1,
-                    learning_rate=3e-4,
-                    n_steps=1024,
-                    batch_size=128,
-                    n_epochs=5,
-                    gamma=0.999,
-                    gae_lambda=0.98,
-                    clip_range=0.2,
-                    policy_kwargs=dict(
-                        net_arch=[dict(pi=[128, 128], vf=[128, 128])]
-                    ))
-        model.learn(total_timesteps=500000, callback=eval_callback)
+        # (eval_freq counts vec env steps, so divide to keep it in timesteps)
+        if args.sync_eval:
+            eval_env = LunarLanderEnv(render_mode="none", fidelity=args.eval_fidelity,
+                                      action_repeat=args.action_repeat)
+            eval_callback = EvalCallback(eval_env,
+                                         best_model_save_path=save_path,
+                                         log_path=save_path,
+                                         eval_freq=max(10000 // n_envs, 1),
+                                         deterministic=True,
+                                         render=False)
+        else:
+            # evaluates in a background process while training goes on
+            eval_callback = AsyncEvalCallback(best_model_save_path=save_path,
+                                              log_path=save_path,
+                                              eval_freq=max(10000 // n_envs, 1),
+                                              deterministic=True,
+                                              env_kwargs=dict(fidelity=args.eval_fidelity,
+                                                              action_repeat=args.action_repeat))
+
+        callbacks = [eval_callback]
+        if args.perf_stats:
+            callbacks.append(PerfStatsCallback())
+
+        model = PPO("MlpPolicy", env, verbose=1, tensorboard_log=args.tensorboard_log, **PPO_KWARGS)
+        model.learn(total_timesteps=500000, callback=callbacks)
 
     except KeyboardInterrupt:
         print("\nTraining interrupted by user")
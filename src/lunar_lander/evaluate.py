@@ -0,0 +1,218 @@
+"""
+Batched evaluation of a saved PPO model
+
+Loads the model once and runs a fixed set of seeded episodes (seeds
+seed..seed+episodes-1) on many envs at a time, calling predict on the whole
+observation batch each step. Episode j always gets terrain seed + j, whatever the
+backend or env count, so two models (or two runs) are scored on the same
+episodes.
+
+Backends:
+    shared  SharedMemoryVecEnv, Box2D LunarLanderEnv copies in worker processes (default)
+    vector  VectorLunarLanderEnv, the batched NumPy physics in this process. Fastest,
+            with Box2D's contact solver ported, so success rates agree with
+            shared; single episodes can still end differently near a landing
+            limit (float64 against Box2D's float32). Not for promotion
+            decisions; it warns at startup
+
+    python -m lunar_lander.evaluate custom_lunar/best_model1.zip --episodes 5000 --workers 8 --envs-per-worker 16
+
+Results go to <out>.json (summary) and <out>.npz (one row per episode, like
+evaluations.npz).
+"""
+
+import argparse
+import json
+import math
+import os
+import time
+import warnings
+
+import numpy as np
+
+from .physics import FIDELITY_PROFILES
+from .recorder import CRASHED, LANDED, OUTCOMES, TIMEOUT
+
+
+def make_vec_env(backend, workers=1, envs_per_worker=16, num_envs=256, terrain_bank=None, fidelity="default",
+                 action_repeat=1):
+    # both import SB3; not at module level, since spawned workers re-import this module
+    if backend == "shared":
+        from .shared_vec_env import SharedMemoryVecEnv
+
+        env_kwargs = {"fidelity": fidelity, "action_repeat": action_repeat}
+        if terrain_bank:
+            env_kwargs["terrain_bank"] = terrain_bank
+        return SharedMemoryVecEnv(workers, envs_per_worker, env_kwargs=env_kwargs)
+    if backend == "vector":
+        from .vector_env import VectorLunarLanderEnv
+
+        if fidelity != "default" or action_repeat != 1:
+            raise ValueError("the vector backend has its own integrator, without fidelity profiles or action repeat")
+
+        return VectorLunarLanderEnv(num_envs, terrain_bank=terrain_bank)
+    raise ValueError(f"unknown backend {backend}")
+
+
+def run_episodes(model, vec_env, episodes, seed=0, deterministic=True):
+    """
+    Play episodes seed..seed+episodes-1 to the end and return per-episode
+    arrays: seeds, rewards, lengths, outcomes (recorder.LANDED/CRASHED/TIMEOUT)
+    and landing_distance (|dx| from the pad center at the end of the episode).
+
+    Every env works through its own queue of seeds: the seed of its next
+    episode is set as soon as the current one starts, so its auto-reset picks
+    it up. Episodes past the requested range are run but discarded, so short
+    episodes are not over-represented.
+    """
+    num_envs = vec_env.num_envs
+    end_seed = seed + episodes
+    rewards = np.zeros(episodes)
+    lengths = np.zeros(episodes, dtype=np.int32)
+    outcomes = np.zeros(episodes, dtype=np.int8)
+    landing_distance = np.zeros(episodes, dtype=np.float32)
+
+    vec_env.seed(seed)
+    obs = vec_env.reset()
+    current = np.arange(seed, seed + num_envs)  # seed of the episode each env is playing
+    queued = current + num_envs  # seed its auto-reset will start next
+    vec_env._seeds = queued.tolist()
+    next_seed = seed + 2 * num_envs
+    episode_reward = np.zeros(num_envs)
+    episode_length = np.zeros(num_envs, dtype=np.int32)
+
+    remaining = episodes
+    while remaining:
+        actions, _ = model.predict(obs, deterministic=deterministic)
+        obs, step_rewards, dones, infos = vec_env.step(actions)
+        episode_reward += step_rewards
+        episode_length += 1
+        for i in np.flatnonzero(dones):
+            j = current[i] - seed
+            if current[i] < end_seed:
+                info = infos[i]
+                rewards[j] = episode_reward[i]
+                lengths[j] = episode_length[i]
+                # a crash on the last step also has timeout set, so game over decides first
+                if info["landed_successfully"]:
+                    outcomes[j] = LANDED
+                elif info["game_over"]:
+                    outcomes[j] = CRASHED
+                else:
+                    outcomes[j] = TIMEOUT
+                landing_distance[j] = abs(info["terminal_observation"][0])
+                remaining -= 1
+            current[i] = queued[i]
+            queued[i] = vec_env._seeds[i] = next_seed
+            next_seed += 1
+            episode_reward[i] = 0.0
+            episode_length[i] = 0
+
+    return {
+        "seeds": np.arange(seed, end_seed),
+        "rewards": rewards,
+        "lengths": lengths,
+        "outcomes": outcomes,
+        "landing_distance": landing_distance,
+    }
+
+
+def _percentiles(values):
+    return {f"p{q}": float(np.percentile(values, q)) for q in (5, 25, 50, 75, 95)}
+
+
+def summarize(results):
+    outcomes = results["outcomes"]
+    episodes = len(outcomes)
+    landed = outcomes == LANDED
+    successes = int(landed.sum())
+    # Wilson score interval, so small evaluations show how noisy the rate is
+    z = 1.96
+    p = successes / episodes
+    center = (p + z * z / (2 * episodes)) / (1 + z * z / episodes)
+    half = z * math.sqrt(p * (1 - p) / episodes + z * z / (4 * episodes ** 2)) / (1 + z * z / episodes)
+
+    summary = {
+        "episodes": episodes,
+        "success_rate": p,
+        "success_rate_95ci": [center - half, center + half],
+        "outcomes": {OUTCOMES[code]: int((outcomes == code).sum()) for code in (LANDED, CRASHED, TIMEOUT)},
+        "reward": {"mean": float(results["rewards"].mean()), "std": float(results["rewards"].std()),
+                   **_percentiles(results["rewards"])},
+        "length": {"mean": float(results["lengths"].mean()), **_percentiles(results["lengths"])},
+        "landing_distance": {"mean": float(results["landing_distance"].mean()),
+                             **_percentiles(results["landing_distance"])},
+    }
+    if successes:
+        summary["landing_distance_landed"] = {"mean": float(results["landing_distance"][landed].mean()),
+                                              **_percentiles(results["landing_distance"][landed])}
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Evaluate a saved PPO model on many seeded episodes")
+    parser.add_argument("model", help="path to a saved PPO .zip")
+    parser.add_argument("--episodes", type=int, default=1000)
+    parser.add_argument("--seed", type=int, default=0, help="first episode seed")
+    parser.add_argument("--backend", choices=["shared", "vector"], default="shared")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="shared backend")
+    parser.add_argument("--envs-per-worker", type=int, default=16, help="shared backend")
+    parser.add_argument("--num-envs", type=int, default=256, help="vector backend")
+    parser.add_argument("--terrain-bank", default=None, help="optional terrain bank file")
+    parser.add_argument("--fidelity", choices=sorted(FIDELITY_PROFILES), default="default",
+                        help="physics profile, shared backend only (see physics.FIDELITY_PROFILES)")
+    parser.add_argument("--action-repeat", type=int, default=1,
+                        help="physics frames per env step the model was trained with, shared backend only")
+    parser.add_argument("--stochastic", action="store_true", help="sample actions instead of the mean")
+    parser.add_argument("--out", default=None, help="output prefix (default: next to the model)")
+    args = parser.parse_args()
+
+    # imported here so --help works without torch
+    from stable_baselines3 import PPO
+
+    model = PPO.load(args.model, device="cpu")
+    if args.backend == "vector" and (args.fidelity != "default" or args.action_repeat != 1):
+        parser.error("--fidelity and --action-repeat need the shared backend")
+    if args.backend == "vector":
+        warnings.warn("the vector backend matches Box2D's success rate but not every episode; "
+                      "use --backend shared for promotion decisions", stacklevel=1)
+    vec_env = make_vec_env(args.backend, args.workers, args.envs_per_worker, args.num_envs, args.terrain_bank,
+                           args.fidelity, args.action_repeat)
+    try:
+        start = time.perf_counter()
+        results = run_episodes(model, vec_env, args.episodes, args.seed, deterministic=not args.stochastic)
+        elapsed = time.perf_counter() - start
+    finally:
+        vec_env.close()
+
+    summary = summarize(results)
+    summary.update({
+        "model": os.path.abspath(args.model),
+        "backend": args.backend,
+        "fidelity": args.fidelity,
+        "action_repeat": args.action_repeat,
+        "num_envs": vec_env.num_envs,
+        "seed": args.seed,
+        "deterministic": not args.stochastic,
+        "seconds": elapsed,
+        "episodes_per_sec": args.episodes / elapsed,
+        "steps_per_sec": float(results["lengths"].sum()) / elapsed,
+    })
+
+    out = args.out or os.path.splitext(args.model)[0] + "_eval"
+    with open(out + ".json", "w") as f:
+        json.dump(summary, f, indent=2)
+    np.savez(out + ".npz", **results)
+
+    outcomes = summary["outcomes"]
+    low, high = summary["success_rate_95ci"]
+    print(f"{args.episodes} episodes in {elapsed:.1f}s ({summary['episodes_per_sec']:.1f} episodes/sec)")
+    print(f"success rate {summary['success_rate']:.3f} (95% CI {low:.3f}-{high:.3f})  "
+          f"landed {outcomes['landed']}  crashed {outcomes['crashed']}  timeout {outcomes['timeout']}")
+    print(f"reward mean {summary['reward']['mean']:.1f}  median {summary['reward']['p50']:.1f}  "
+          f"landing distance median {summary['landing_distance']['p50']:.2f} m")
+    print(f"wrote {out}.json and {out}.npz")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,324 @@
+"""
+Micro-batching policy inference server
+
+Loads a trained policy once (the NumpyPolicy exported from a PPO zip) and
+serves it over a local Unix socket to any number of env processes. Requests
+that arrive close together are answered with one batched forward pass: a
+batch runs as soon as it holds max_batch observations, or max_wait seconds
+after its first request arrived, whichever comes first. With max_wait 0 it
+still batches whatever arrived in the same event loop iteration.
+
+    python -m lunar_lander.inference_server serve custom_lunar/best_model1.zip --socket /tmp/lander.sock
+    python -m lunar_lander.inference_server load --socket /tmp/lander.sock --clients 16 --seconds 10
+
+In an env loop InferenceClient stands in for the model:
+
+    policy = InferenceClient("/tmp/lander.sock")
+    action, _ = policy.predict(obs)
+
+Wire format: on connect the server sends obs_dim, action_dim and a discrete
+flag (three uint32). A request is a uint32 count followed by count float32
+observations, the reply count float32 actions.
+"""
+
+import argparse
+import asyncio
+import multiprocessing as mp
+import os
+import signal
+import socket
+import struct
+import time
+from time import perf_counter_ns
+
+import numpy as np
+
+from .perf import PerfStats, merge_stats
+
+HEADER = struct.Struct("<III")
+COUNT = struct.Struct("<I")
+
+
+class _Connection(asyncio.Protocol):
+    def __init__(self, server):
+        self.server = server
+        self.buffer = bytearray()
+        self.transport = None
+
+    def connection_made(self, transport):
+        self.transport = transport
+        transport.write(HEADER.pack(self.server.obs_dim, self.server.action_dim, self.server.discrete))
+
+    def data_received(self, data):
+        self.buffer += data
+        frame = self.server.obs_dim * 4
+        offset = 0
+        while len(self.buffer) - offset >= COUNT.size:
+            (count,) = COUNT.unpack_from(self.buffer, offset)
+            end = offset + COUNT.size + count * frame
+            if len(self.buffer) < end:
+                break
+            # the slice is a copy, so the buffer can be trimmed while the request waits for its batch
+            obs = np.frombuffer(self.buffer[offset + COUNT.size:end], np.float32)
+            self.server.submit(self.transport, obs.reshape(count, self.server.obs_dim))
+            offset = end
+        if offset:
+            del self.buffer[:offset]
+
+
+class InferenceServer:
+    def __init__(self, policy, socket_path, max_batch=64, max_wait=0.001):
+        self.policy = policy
+        self.socket_path = socket_path
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        self.obs_dim = int(np.prod(policy.obs_shape))
+        self.discrete = int(policy.action_kind == "argmax")
+        self.action_dim = 1 if self.discrete else len(policy.low)
+        self.stats = PerfStats()
+        self.batch_sizes = {}
+        self.observations = 0
+        self._pending = []
+        self._pending_count = 0
+        self._timer = None
+        self._loop = None
+
+    @classmethod
+    def from_model(cls, model_path, socket_path, **kwargs):
+        from .numpy_policy import NumpyPolicy
+
+        return cls(NumpyPolicy.from_model(model_path), socket_path, **kwargs)
+
+    def submit(self, transport, obs):
+        self._pending.append((transport, obs, perf_counter_ns()))
+        self._pending_count += len(obs)
+        if self._pending_count >= self.max_batch:
+            self._flush()
+        elif self._timer is None:
+            self._timer = (self._loop.call_later(self.max_wait, self._flush) if self.max_wait > 0
+                           else self._loop.call_soon(self._flush))
+
+    def _flush(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        while self._pending:
+            # whole requests up to max_batch observations (one oversized request runs alone)
+            taken = count = 0
+            while taken < len(self._pending) and (not taken or count + len(self._pending[taken][1]) <= self.max_batch):
+                count += len(self._pending[taken][1])
+                taken += 1
+            batch, self._pending = self._pending[:taken], self._pending[taken:]
+            self._pending_count -= count
+            self._run(batch, count)
+
+    def _run(self, batch, count):
+        start = perf_counter_ns()
+        obs = batch[0][1] if len(batch) == 1 else np.concatenate([request[1] for request in batch])
+        actions, _ = self.policy.predict(obs)
+        actions = np.ascontiguousarray(actions, dtype=np.float32).reshape(count, self.action_dim)
+        self.stats.record("forward", start)
+        offset = 0
+        for transport, request, arrived in batch:
+            end = offset + len(request)
+            if not transport.is_closing():
+                transport.write(actions[offset:end].tobytes())
+            self.stats.record("latency", arrived)
+            offset = end
+        self.batch_sizes[count] = self.batch_sizes.get(count, 0) + 1
+        self.observations += count
+
+    def report(self, seconds):
+        """Throughput, server-side latency (arrival to reply) and batch sizes since the last report."""
+        summary = self.stats.summary()
+        latency = summary.get("latency", {"count": 0, "p50_us": 0.0, "p99_us": 0.0})
+        batches = sum(self.batch_sizes.values())
+        result = {
+            "obs_per_sec": self.observations / seconds if seconds else 0.0,
+            "requests": latency["count"],
+            "p50_us": latency["p50_us"],
+            "p99_us": latency["p99_us"],
+            "forward_mean_us": summary["forward"]["mean_us"] if "forward" in summary else 0.0,
+            "mean_batch": self.observations / batches if batches else 0.0,
+        }
+        self.stats.clear()
+        self.batch_sizes = {}
+        self.observations = 0
+        return result
+
+    async def serve(self, report_every=None, ready=None):
+        """Serve until cancelled, printing report() every report_every seconds if given."""
+        self._loop = asyncio.get_running_loop()
+        if os.path.exists(self.socket_path):
+            os.unlink(self.socket_path)
+        server = await self._loop.create_unix_server(lambda: _Connection(self), self.socket_path)
+        if ready is not None:
+            ready()
+        last = time.perf_counter()
+        try:
+            async with server:
+                while True:
+                    await asyncio.sleep(report_every or 3600)
+                    if report_every:
+                        now = time.perf_counter()
+                        print(format_report(self.report(now - last)), flush=True)
+                        last = now
+        finally:
+            if os.path.exists(self.socket_path):
+                os.unlink(self.socket_path)
+
+
+class InferenceClient:
+    """Blocking client with the PPO.predict call shape, for one env loop."""
+
+    def __init__(self, socket_path, connect_timeout=10.0):
+        deadline = time.monotonic() + connect_timeout
+        while True:
+            self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            try:
+                self.sock.connect(socket_path)
+                break
+            except (FileNotFoundError, ConnectionRefusedError):
+                self.sock.close()
+                if time.monotonic() > deadline:
+                    raise
+                time.sleep(0.05)
+        self.obs_dim, self.action_dim, self.discrete = HEADER.unpack(self._receive(HEADER.size))
+
+    def _receive(self, size):
+        data = bytearray(size)
+        view = memoryview(data)
+        while view:
+            received = self.sock.recv_into(view)
+            if not received:
+                raise ConnectionError("inference server closed the connection")
+            view = view[received:]
+        return data
+
+    def predict(self, obs, state=None, episode_start=None, deterministic=True):
+        batch = np.asarray(obs, dtype=np.float32)
+        single = batch.ndim == 1
+        batch = batch.reshape(-1, self.obs_dim)
+        self.sock.sendall(COUNT.pack(len(batch)) + batch.tobytes())
+        actions = np.frombuffer(self._receive(len(batch) * self.action_dim * 4), np.float32)
+        if self.discrete:
+            actions = actions.astype(np.int64)
+        else:
+            actions = actions.reshape(len(batch), self.action_dim)
+        return (actions[0] if single else actions), None
+
+    def close(self):
+        self.sock.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def format_report(report):
+    return (f"{report['obs_per_sec']:9.0f} obs/s  p50 {report['p50_us']:7.1f} us  p99 {report['p99_us']:7.1f} us  "
+            f"mean batch {report['mean_batch']:5.1f}  forward {report['forward_mean_us']:6.1f} us")
+
+
+def _serve_process(model_path, socket_path, max_batch, max_wait, report_every, ready):
+    server = InferenceServer.from_model(model_path, socket_path, max_batch=max_batch, max_wait=max_wait)
+    signal.signal(signal.SIGTERM, signal.default_int_handler)
+    try:
+        asyncio.run(server.serve(report_every, ready.set))
+    except KeyboardInterrupt:
+        pass
+
+
+def start_server(model_path, socket_path, max_batch=64, max_wait=0.001, report_every=None):
+    """Run an InferenceServer in a child process; returns it once the socket accepts connections."""
+    ctx = mp.get_context("spawn")
+    ready = ctx.Event()
+    process = ctx.Process(target=_serve_process, args=(model_path, socket_path, max_batch, max_wait,
+                                                       report_every, ready), daemon=True)
+    process.start()
+    if not ready.wait(60):
+        process.terminate()
+        raise RuntimeError("inference server did not start")
+    return process
+
+
+def _load_client(socket_path, model_path, seconds, seed, results):
+    from .Lunar_Lander_custom_env import LunarLanderEnv
+
+    if socket_path is None:
+        from .numpy_policy import NumpyPolicy
+
+        policy = NumpyPolicy.from_model(model_path)
+    else:
+        policy = InferenceClient(socket_path)
+    env = LunarLanderEnv(render_mode="none")
+    stats = PerfStats()
+    obs, _ = env.reset(seed=seed)
+    steps = 0
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        start = perf_counter_ns()
+        action, _ = policy.predict(obs)
+        stats.record("predict", start)
+        obs, _, terminated, truncated, _ = env.step(action)
+        steps += 1
+        if terminated or truncated:
+            obs, _ = env.reset()
+    env.close()
+    results.put((steps, stats.summary()))
+
+
+def run_load(socket_path, clients=8, seconds=10.0, model_path=None):
+    """
+    Run env loops in `clients` processes for `seconds`, each asking the server
+    at socket_path for every action (or, with socket_path None, its own
+    NumpyPolicy loaded from model_path). Returns env steps/sec and the
+    client-side predict latency.
+    """
+    ctx = mp.get_context("spawn")
+    results = ctx.Queue()
+    processes = [ctx.Process(target=_load_client, args=(socket_path, model_path, seconds, seed, results))
+                 for seed in range(clients)]
+    for process in processes:
+        process.start()
+    collected = [results.get() for _ in processes]
+    for process in processes:
+        process.join()
+    predict = merge_stats([stats for _, stats in collected])["predict"]
+    steps = sum(steps for steps, _ in collected)
+    return {"steps_per_sec": steps / seconds, "p50_us": predict["p50_us"], "p99_us": predict["p99_us"]}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Batched policy inference over a Unix socket")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    serve_parser = subparsers.add_parser("serve", help="serve a saved PPO zip")
+    serve_parser.add_argument("model", help="path to a saved PPO .zip")
+    serve_parser.add_argument("--socket", default="/tmp/lunar_lander.sock")
+    serve_parser.add_argument("--max-batch", type=int, default=64)
+    serve_parser.add_argument("--max-wait-ms", type=float, default=1.0)
+    serve_parser.add_argument("--report-every", type=float, default=5.0, help="seconds between reports")
+    load_parser = subparsers.add_parser("load", help="drive a running server from many env processes")
+    load_parser.add_argument("--socket", default="/tmp/lunar_lander.sock")
+    load_parser.add_argument("--clients", type=int, default=8)
+    load_parser.add_argument("--seconds", type=float, default=10.0)
+    args = parser.parse_args()
+
+    if args.command == "serve":
+        server = InferenceServer.from_model(args.model, args.socket, max_batch=args.max_batch,
+                                            max_wait=args.max_wait_ms / 1e3)
+        print(f"serving {args.model} on {args.socket}", flush=True)
+        try:
+            asyncio.run(server.serve(args.report_every))
+        except KeyboardInterrupt:
+            pass
+    elif args.command == "load":
+        result = run_load(args.socket, args.clients, args.seconds)
+        print(f"{args.clients} clients: {result['steps_per_sec']:.0f} env steps/s, "
+              f"predict p50 {result['p50_us']:.1f} us, p99 {result['p99_us']:.1f} us")
+
+
+if __name__ == "__main__":
+    main()
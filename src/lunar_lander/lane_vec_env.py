@@ -0,0 +1,44 @@
+"""
+VecEnv plumbing for in-process batched envs
+
+VectorLunarLanderEnv and MultiLanderVecEnv keep all their envs in one object
+rather than a list of gym envs, so SB3's get_attr/set_attr/env_method have no
+env to forward to. LaneVecEnv routes them to a per-env lane object instead
+(subclasses return it from _lane), and answers the attributes every env
+shares with the VecEnv itself (render_mode and the spaces) without one, since
+VecEnv.__init__ asks for render_mode before a subclass has built its lanes.
+Anything a lane does not have raises AttributeError, as it would on a
+DummyVecEnv.
+"""
+
+from stable_baselines3.common.vec_env import VecEnv
+
+
+class LaneVecEnv(VecEnv):
+    """VecEnv base whose per-env attribute and method calls go to self._lane(i)."""
+
+    SHARED_ATTRS = ("render_mode", "observation_space", "action_space")
+
+    def _lane(self, index):
+        """The object that stands for env index in get_attr/set_attr/env_method."""
+        raise NotImplementedError
+
+    def get_attr(self, attr_name, indices=None):
+        indices = self._get_indices(indices)
+        if attr_name in self.SHARED_ATTRS:
+            return [getattr(self, attr_name) for _ in indices]
+        return [getattr(self._lane(i), attr_name) for i in indices]
+
+    def set_attr(self, attr_name, value, indices=None):
+        if attr_name in self.SHARED_ATTRS:
+            raise AttributeError(f"{attr_name!r} is shared by all envs of {type(self).__name__}, "
+                                 f"set it on the VecEnv itself")
+        for i in self._get_indices(indices):
+            setattr(self._lane(i), attr_name, value)
+
+    def env_method(self, method_name, *method_args, indices=None, **method_kwargs):
+        return [getattr(self._lane(i), method_name)(*method_args, **method_kwargs)
+                for i in self._get_indices(indices)]
+
+    def env_is_wrapped(self, wrapper_class, indices=None):
+        return [False for _ in self._get_indices(indices)]
@@ -0,0 +1,188 @@
+"""
+Many landers in one Box2D world
+
+MultiLanderWorld hosts N landers, each with its own terrain, in a single
+b2World, so one world.Step advances all of them. Every lander and its ground
+edges carry their own collision group (see physics.group_filter) and collide
+with nothing else, so the landers overlap in space without touching: each lane
+is a PhysicsWorld built into the shared world and simulates exactly what a
+PhysicsWorld of its own would. Groups rather than spreading the lanes out
+along x, because lanes thousands of metres from the origin would lose float32
+precision in Box2D's positions and no longer match a single-lander env.
+
+MultiLanderVecEnv puts a stable-baselines3 VecEnv on top; it behaves like a
+DummyVecEnv of LunarLanderEnvs with the same seeds, minus the per-env Python
+stepping overhead of Box2D.
+
+    env = MultiLanderVecEnv(64, seed=0)
+    model = PPO("MlpPolicy", env)
+
+Snapshots (get_state/set_state) are not available on shared lanes.
+"""
+
+import numpy as np
+from Box2D import b2World
+from gymnasium import spaces
+
+from .lane_vec_env import LaneVecEnv
+from .physics import FIDELITY_PROFILES, GRAVITY, PhysicsWorld
+from .terrain_bank import TerrainBank
+
+
+class MultiLanderWorld:
+    """num_landers PhysicsWorld lanes sharing one b2World."""
+
+    def __init__(self, num_landers, terrain_bank=None, fidelity="default"):
+        if fidelity not in FIDELITY_PROFILES:
+            raise ValueError(f"Unknown fidelity {fidelity!r}. Choose from {sorted(FIDELITY_PROFILES)}")
+        self.world = b2World(gravity=(0, GRAVITY))
+        self.lanes = [PhysicsWorld(terrain_bank=terrain_bank, fidelity=fidelity, world=self.world, group=i + 1)
+                      for i in range(num_landers)]
+        lane = self.lanes[0]
+        self.substeps = lane.substeps
+        self.time_step = lane.time_step
+        self.vel_iters = lane.vel_iters
+        self.pos_iters = lane.pos_iters
+        self.landing_check_every = lane.landing_check_every
+
+        # the warm-start step every standalone PhysicsWorld takes, once for all
+        for lane in self.lanes:
+            lane.lander.awake = False
+        self.world.Step(self.time_step, self.vel_iters, self.pos_iters)
+        for lane in self.lanes:
+            lane.lander.awake = True
+
+    def __len__(self):
+        return len(self.lanes)
+
+    def step(self, check_landing=None):
+        """
+        Advance every lander by TIME_STEP, then run check_landing on the lanes
+        whose check_landing entry is true (all by default) and still in play.
+        Controls are applied per lane beforehand (apply_thrust/apply_torque).
+        """
+        for _ in range(self.substeps):
+            self.world.Step(self.time_step, self.vel_iters, self.pos_iters)
+        self.world.ClearForces()
+        if check_landing is None:
+            check_landing = [True] * len(self.lanes)
+        for lane, check in zip(self.lanes, check_landing):
+            if check and not lane.game_over:
+                lane.check_landing()
+
+
+class MultiLanderVecEnv(LaneVecEnv):
+    """
+    num_envs LunarLanderEnv copies on one MultiLanderWorld.
+
+    Episodes auto-reset like DummyVecEnv: the final observation of a finished
+    episode is in info["terminal_observation"] and obs holds the new episode.
+    Observations, rewards and dones match a DummyVecEnv of LunarLanderEnvs
+    seeded the same way, step for step.
+
+    get_attr/set_attr/env_method reach env i's PhysicsWorld
+    (self.physics.lanes[i]) directly, bypassing the VecEnv's own step count
+    and landing zone bookkeeping for that env.
+    """
+
+    MAX_STEPS = 1000
+
+    def __init__(self, num_envs, seed=None, terrain_bank=None, fidelity="default"):
+        self.render_mode = None
+        if isinstance(terrain_bank, str):
+            terrain_bank = TerrainBank(terrain_bank)
+        self.terrain_bank = terrain_bank
+        self.fidelity = fidelity
+        observation_space = spaces.Box(low=-np.inf, high=np.inf, shape=(6,), dtype=np.float32)
+        action_space = spaces.Box(low=np.array([0.0, -20.0], dtype=np.float32),
+                                  high=np.array([50.0, 20.0], dtype=np.float32),
+                                  dtype=np.float32)
+        super().__init__(num_envs, observation_space, action_space)
+
+        self.physics = MultiLanderWorld(num_envs, terrain_bank=terrain_bank, fidelity=fidelity)
+        self.steps = np.zeros(num_envs, dtype=np.int64)
+        self._actions = np.zeros((num_envs, 2))
+        self._obs = np.zeros((num_envs, 6), dtype=np.float32)
+        self._state = np.zeros((num_envs, 6))
+        self._centers = np.zeros((num_envs, 2))
+        if seed is not None:
+            self.seed(seed)
+
+    def _reset_envs(self, indices):
+        for i in indices:
+            lane = self.physics.lanes[i]
+            lane.reset(seed=self._seeds[i])
+            self._seeds[i] = None
+            zone = lane.get_landing_zone()
+            self._centers[i] = (zone['left'] + zone['right']) / 2.0, zone['y']
+        self.steps[indices] = 0
+
+    def _get_obs(self):
+        # offsets in float64 before rounding, like LunarLanderEnv._get_obs
+        state = self._state
+        for i, lane in enumerate(self.physics.lanes):
+            lander = lane.lander
+            position = lander.position
+            velocity = lander.linearVelocity
+            state[i] = (position.x, position.y, velocity.x, velocity.y, lander.angle, lander.angularVelocity)
+        state[:, :2] -= self._centers
+        self._obs[:] = state
+        return self._obs.copy()
+
+    def reset(self):
+        self._reset_envs(range(self.num_envs))
+        self._reset_options()
+        self.reset_infos = [{} for _ in range(self.num_envs)]
+        return self._get_obs()
+
+    def step_async(self, actions):
+        self._actions[:] = np.asarray(actions).reshape(self.num_envs, 2)
+
+    def step_wait(self):
+        physics = self.physics
+        lanes = physics.lanes
+        self.steps += 1
+
+        for lane, (thrust, torque) in zip(lanes, self._actions.tolist()):
+            lane.apply_thrust(thrust)
+            lane.apply_torque(torque)
+        physics.step((self.steps % physics.landing_check_every == 0).tolist())
+        obs = self._get_obs()
+
+        game_over = np.array([lane.game_over for lane in lanes])
+        landed = np.array([lane.landed_successfully for lane in lanes])
+        timeout = self.steps >= self.MAX_STEPS
+
+        # same shaping as LunarLanderEnv.step, including its use of the relative
+        # obs. Per lane on float32 scalars like there: a scalar's ** 2 goes
+        # through powf, which can round differently from an array's square.
+        distance = np.empty(self.num_envs, dtype=np.float32)
+        rewards = np.empty(self.num_envs, dtype=np.float32)
+        for i, (x, y, vy, (center_x, center_y)) in enumerate(zip(obs[:, 0], obs[:, 1], obs[:, 3],
+                                                                  self._centers.tolist())):
+            d = np.sqrt((x - center_x) ** 2 + (y - center_y) ** 2)
+            distance[i] = d
+            rewards[i] = 5.0 - 0.31 * d - 0.3 * abs(vy)
+
+        dones = game_over | timeout
+        rewards += np.where(dones, np.where(landed, 400.0, -100.0), 0.0).astype(np.float32)
+
+        infos = [
+            {"landed_successfully": bool(ok), "game_over": bool(over), "timeout": bool(t), "distance": float(d)}
+            for ok, over, t, d in zip(landed, game_over, timeout, distance)
+        ]
+
+        done_indices = np.flatnonzero(dones)
+        if len(done_indices):
+            for i in done_indices:
+                infos[i]["terminal_observation"] = obs[i].copy()
+            self._reset_envs(done_indices)
+            obs[done_indices] = self._get_obs()[done_indices]
+
+        return obs, rewards, dones, infos
+
+    def close(self):
+        pass
+
+    def _lane(self, index):
+        return self.physics.lanes[index]
@@ -0,0 +1,155 @@
+"""
+Torch-free inference for trained PPO policies
+
+export_policy() pulls the actor out of a saved PPO zip (the policy MLP, the
+action head and how actions are mapped to the action space) into a small
+.npz. NumpyPolicy runs it with NumPy alone, so playback and serving start
+without importing torch or stable-baselines3:
+
+    python -m lunar_lander.numpy_policy custom_lunar/best_model1.zip     # writes best_model1.npz
+
+    policy = NumpyPolicy.load("custom_lunar/best_model1.npz")
+    action, _ = policy.predict(obs)           # one observation, like PPO.predict
+    actions, _ = policy.predict(obs_batch)    # or a batch
+
+predict is always deterministic (the distribution mean, or the argmax for
+discrete actions), which is what PPO.predict(deterministic=True) returns up
+to float32 rounding. Only the default MlpPolicy layout is supported: a
+flattened Box observation, an MLP and a linear action head.
+"""
+
+import argparse
+import os
+
+import numpy as np
+
+FORMAT_VERSION = 1
+
+# torch activation class name -> numpy function (in place on a float32 array)
+ACTIVATIONS = {
+    "Tanh": lambda x: np.tanh(x, out=x),
+    "ReLU": lambda x: np.maximum(x, 0.0, out=x),
+    "Identity": lambda x: x,
+}
+
+
+def export_policy(model_path, out_path=None):
+    """Write the actor of a saved PPO zip to out_path (default: the zip path with .npz) and return that path."""
+    from gymnasium import spaces
+    from stable_baselines3 import PPO
+    from stable_baselines3.common.torch_layers import FlattenExtractor
+    from torch import nn
+
+    model = PPO.load(model_path, device="cpu")
+    policy = model.policy
+    if not isinstance(policy.pi_features_extractor, FlattenExtractor) or policy.use_sde:
+        raise ValueError("only MlpPolicy without gSDE can be exported")
+
+    arrays = {}
+    activations = []
+    layers = [module for module in policy.mlp_extractor.policy_net] + [policy.action_net]
+    index = 0
+    for module in layers:
+        if isinstance(module, nn.Linear):
+            # stored transposed, so a batch of rows is multiplied as obs @ weight
+            arrays[f"weight{index}"] = module.weight.detach().numpy().T.astype(np.float32)
+            arrays[f"bias{index}"] = module.bias.detach().numpy().astype(np.float32)
+            activations.append("Identity")
+            index += 1
+        elif type(module).__name__ in ACTIVATIONS and index:
+            activations[-1] = type(module).__name__
+        else:
+            raise ValueError(f"cannot export layer {module}")
+
+    action_space = model.action_space
+    if isinstance(action_space, spaces.Box):
+        arrays["low"] = action_space.low.astype(np.float32)
+        arrays["high"] = action_space.high.astype(np.float32)
+        action_kind = "squash" if policy.squash_output else "clip"
+    elif isinstance(action_space, spaces.Discrete):
+        action_kind = "argmax"
+    else:
+        raise ValueError(f"unsupported action space {action_space}")
+
+    out_path = out_path or os.path.splitext(model_path)[0] + ".npz"
+    np.savez(out_path, version=FORMAT_VERSION, activations=np.array(activations), action_kind=action_kind,
+             obs_shape=np.array(model.observation_space.shape), **arrays)
+    return out_path
+
+
+class NumpyPolicy:
+    def __init__(self, weights, biases, activations, action_kind, obs_shape, low=None, high=None):
+        self.weights = [np.ascontiguousarray(w, dtype=np.float32) for w in weights]
+        self.biases = [np.asarray(b, dtype=np.float32) for b in biases]
+        self.activations = [ACTIVATIONS[name] for name in activations]
+        self.action_kind = action_kind
+        self.obs_shape = tuple(obs_shape)
+        self.low = low
+        self.high = high
+        # single observations reuse these instead of allocating per layer
+        self._buffers = [np.empty(len(b), dtype=np.float32) for b in self.biases]
+        self._layers = list(zip(self.weights, self.biases, self.activations, self._buffers))
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as f:
+            if int(f["version"]) != FORMAT_VERSION:
+                raise ValueError(f"{path} has format version {int(f['version'])}, expected {FORMAT_VERSION}")
+            count = len(f["activations"])
+            return cls([f[f"weight{i}"] for i in range(count)], [f[f"bias{i}"] for i in range(count)],
+                       [str(name) for name in f["activations"]], str(f["action_kind"]), f["obs_shape"],
+                       f["low"] if "low" in f else None, f["high"] if "high" in f else None)
+
+    @classmethod
+    def from_model(cls, model_path):
+        """
+        Load the .npz next to a PPO zip, exporting it first if it is missing or
+        older than the zip. Without the zip the .npz is used as it is.
+        """
+        path = os.path.splitext(model_path)[0] + ".npz"
+        if os.path.exists(model_path) and (not os.path.exists(path)
+                                           or os.path.getmtime(path) < os.path.getmtime(model_path)):
+            export_policy(model_path, path)
+        return cls.load(path)
+
+    def forward(self, obs):
+        """Action head output (means or logits) for a batch of observations."""
+        x = np.asarray(obs, dtype=np.float32).reshape(-1, self.weights[0].shape[0])
+        for weight, bias, activation in zip(self.weights, self.biases, self.activations):
+            x = x @ weight
+            x += bias
+            x = activation(x)
+        return x
+
+    def _forward_one(self, obs):
+        x = np.asarray(obs, dtype=np.float32).reshape(-1)
+        for weight, bias, activation, out in self._layers:
+            np.dot(x, weight, out=out)
+            out += bias
+            x = activation(out)
+        return x
+
+    def predict(self, obs, state=None, episode_start=None, deterministic=True):
+        """Same call and return shape as PPO.predict: (actions, None)."""
+        single = np.ndim(obs) == len(self.obs_shape)
+        out = self._forward_one(obs) if single else self.forward(obs)
+        if self.action_kind == "argmax":
+            actions = out.argmax(axis=-1)
+        elif self.action_kind == "squash":
+            actions = self.low + 0.5 * (np.tanh(out) + 1.0) * (self.high - self.low)
+        else:
+            # np.clip costs more than the network on a single observation
+            actions = np.minimum(np.maximum(out, self.low), self.high)
+        return actions, None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export the actor of a saved PPO zip for NumpyPolicy")
+    parser.add_argument("model", help="path to a saved PPO .zip")
+    parser.add_argument("--out", default=None, help="output .npz (default: next to the model)")
+    args = parser.parse_args()
+    print(export_policy(args.model, args.out))
+
+
+if __name__ == "__main__":
+    main()
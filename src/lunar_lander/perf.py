@@ -0,0 +1,81 @@
+"""
+Opt-in phase timings for LunarLanderEnv and PhysicsWorld.
+
+Each phase keeps a call count, the total time and a histogram of call
+durations in power-of-two nanosecond buckets (bucket k holds [2^(k-1), 2^k) ns).
+Code being timed does
+
+    start = perf_counter_ns()
+    ...
+    start = perf.record("phase", start)
+
+and skips both lines when perf is None, so disabled timing is a couple of
+`is None` checks per step.
+"""
+
+from time import perf_counter_ns
+
+HISTOGRAM_BUCKETS = 40
+
+
+class PerfStats:
+    def __init__(self):
+        self.phases = {}
+
+    def record(self, phase, start):
+        """Add the time since start to phase and return the current time."""
+        now = perf_counter_ns()
+        elapsed = now - start
+        entry = self.phases.get(phase)
+        if entry is None:
+            entry = self.phases[phase] = [0, 0, [0] * HISTOGRAM_BUCKETS]
+        entry[0] += 1
+        entry[1] += elapsed
+        entry[2][min(elapsed.bit_length(), HISTOGRAM_BUCKETS - 1)] += 1
+        return now
+
+    def clear(self):
+        self.phases = {}
+
+    def summary(self):
+        """
+        phase -> {count, total_ns, mean_us, p50_us, p99_us, histogram}.
+        Percentiles are interpolated linearly inside their histogram bucket.
+        """
+        return {phase: summarize(count, total, histogram)
+                for phase, (count, total, histogram) in self.phases.items()}
+
+
+def summarize(count, total_ns, histogram):
+    return {
+        "count": count,
+        "total_ns": total_ns,
+        "mean_us": total_ns / count / 1e3 if count else 0.0,
+        "p50_us": _percentile(histogram, count, 0.50),
+        "p99_us": _percentile(histogram, count, 0.99),
+        "histogram": list(histogram),
+    }
+
+
+def merge_stats(stats_list):
+    """Combine get_perf_stats() results from several envs into one summary."""
+    merged = {}
+    for stats in stats_list:
+        for phase, entry in stats.items():
+            count, total, histogram = merged.get(phase, (0, 0, [0] * HISTOGRAM_BUCKETS))
+            merged[phase] = (count + entry["count"], total + entry["total_ns"],
+                             [a + b for a, b in zip(histogram, entry["histogram"])])
+    return {phase: summarize(*entry) for phase, entry in merged.items()}
+
+
+def _percentile(histogram, count, q):
+    if not count:
+        return 0.0
+    target = q * count
+    seen = 0
+    for bucket, n in enumerate(histogram):
+        if n and seen + n >= target:
+            low = (1 << bucket) >> 1
+            return (low + (target - seen) / n * (low or 1)) / 1e3
+        seen += n
+    return (1 << (len(histogram) - 1)) / 1e3
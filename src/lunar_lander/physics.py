@@ -1,24 +1,222 @@
-from Box2D import b2World, b2PolygonShape, b2_dynamicBody, b2Vec2, b2FixtureDef
+from Box2D import (b2World, b2PolygonShape, b2EdgeShape, b2Filter, b2_dynamicBody, b2Vec2, b2FixtureDef, b2AABB,
+                   b2_aabbExtension)
+from array import array
+import itertools
 import math
 import random
+from time import perf_counter_ns
+import numpy as np
+from .terrain import Heightfield, generate_height_profile, segment_vertices, surface_points
+
+
+GRAVITY = -3.0
+TIME_STEP = 1.0 / 60.0
+GROUND_Y = -15
+LANDING_ZONE_HALF_WIDTH = 3
+
+LANDER_START = (0, 8)
+LANDER_HALF_WIDTH = 1.0
+LANDER_HALF_HEIGHT = 0.75
+LANDER_DENSITY = 0.5
+LINEAR_DAMPING = 0.2
+ANGULAR_DAMPING = 2.0
+
+THRUST_SCALE = 12.0
+TORQUE_SCALE = 0.3
+
+# Solver fidelity, name -> settings. Every profile advances TIME_STEP per env
+# step: substeps splits it into equal Box2D steps (each one collides and
+# solves, with the forces held across them) and continuous turns Box2D's
+# time-of-impact collision on or off. check_landing runs after the last
+# substep of every landing_check_every-th env step; in between, a touchdown
+# or an exit from the play area is noticed up to that many steps late.
+# "default" is the original setup: one 1/60 s step, 6/2 solver iterations.
+FIDELITY_PROFILES = {
+    "fast": dict(substeps=1, vel_iters=4, pos_iters=1, continuous=False, landing_check_every=2),
+    "default": dict(substeps=1, vel_iters=6, pos_iters=2, continuous=True, landing_check_every=1),
+    "precise": dict(substeps=4, vel_iters=10, pos_iters=4, continuous=True, landing_check_every=1),
+}
+
+# get_state()/set_state() layout: one float64 array per snapshot. Besides the
+# lander, it holds the lander's broadphase (fat) AABB, which decides when
+# contacts get created, and up to STATE_CONTACTS of its ground contacts in
+# creation order (edge index, -1 if unused) with their manifold point ids and
+# impulses: Box2D warm-starts its solver from those, and the order decides the
+# order contacts are solved in, so all of it is needed to continue bit-for-bit.
+STATE_CONTACTS = 8
+CONTACT_FIELDS = ('edge', 'points', 'id0', 'normal_impulse0', 'tangent_impulse0',
+                  'id1', 'normal_impulse1', 'tangent_impulse1')
+STATE_FIELDS = ('x', 'y', 'angle', 'vx', 'vy', 'angular_velocity', 'game_over', 'has_landed',
+                'landed_successfully', 'is_thrusting', 'terrain', 'steps',
+                'aabb_lower_x', 'aabb_lower_y', 'aabb_upper_x', 'aabb_upper_y') + tuple(
+    f'contact{i}_{name}' for i in range(STATE_CONTACTS) for name in CONTACT_FIELDS)
+STATE_SIZE = len(STATE_FIELDS)
+STATE_TERRAIN = STATE_FIELDS.index('terrain')
+STATE_STEPS = STATE_FIELDS.index('steps')
+STATE_AABB = STATE_FIELDS.index('aabb_lower_x')
+STATE_CONTACT = STATE_FIELDS.index('contact0_edge')
+
+# terrain key -> (landing_center, xs, ys) for the terrains snapshots refer to,
+# so a state can be restored into any env in this process
+TERRAIN_CACHE = {}
+TERRAIN_CACHE_SIZE = 4096
+_terrain_keys = itertools.count(1)
+
+# the lander's fixture is the first in the world, so it has broadphase proxy 0
+LANDER_PROXY = 0
+FAR_AABB = b2AABB(lowerBound=(1e6, 1e6), upperBound=(1e6 + 1, 1e6 + 1))
+NO_CONTACTS = np.tile(np.array([-1.0] + [0.0] * (len(CONTACT_FIELDS) - 1)), STATE_CONTACTS)
+# what Box2D adds to (lower x, lower y, upper x, upper y) of a proxy's AABB, in float32
+AABB_MARGINS = np.array([-1, -1, 1, 1], dtype=np.float32) * np.float32(b2_aabbExtension)
+
+SOLID_FILTER = b2Filter()
+NO_COLLIDE_FILTER = b2Filter(categoryBits=0, maskBits=0)
+
+LANDER_LOCAL_VERTICES = [
+    b2Vec2(-LANDER_HALF_WIDTH, -LANDER_HALF_HEIGHT),  # bottom left
+    b2Vec2(LANDER_HALF_WIDTH, -LANDER_HALF_HEIGHT),  # bottom right
+    b2Vec2(LANDER_HALF_WIDTH, LANDER_HALF_HEIGHT),  # top right
+    b2Vec2(-LANDER_HALF_WIDTH, LANDER_HALF_HEIGHT)  # top left
+]
+# no vertex is further than this from the lander's centre (with slack for float32 rounding)
+LANDER_RADIUS = math.hypot(LANDER_HALF_WIDTH, LANDER_HALF_HEIGHT) + 1e-3
+
+
+def cached_terrain(key):
+    """(landing_center, xs, ys) of a snapshot's terrain key."""
+    try:
+        return TERRAIN_CACHE[key]
+    except KeyError:
+        raise ValueError(f"terrain {key} of this snapshot is no longer cached") from None
+
+
+def proxy_move(fat_bounds):
+    """
+    (bounds, displacement) for MoveProxy so that Box2D, adding its margin in
+    float32, ends up with exactly fat_bounds. Where the margin alone can't get
+    there (the inner bound has coarser float32 spacing), the displacement,
+    which Box2D adds to the lower bound if negative and the upper one if not,
+    makes up the rest.
+    """
+    fat = np.asarray(fat_bounds, dtype=np.float32)
+    inner = fat - AABB_MARGINS
+    widened = inner + AABB_MARGINS
+    short = np.concatenate([widened[:2] < fat[:2], widened[2:] > fat[2:]])
+    inner = np.where(short, np.nextafter(inner, -AABB_MARGINS * np.inf), inner)
+    residual = fat - (inner + AABB_MARGINS)
+    return inner.tolist(), ((residual[:2] + residual[2:]) / 2).tolist()
+
+
+def group_filter(group):
+    """Collides only with fixtures of the same (positive) group, see MultiLanderWorld."""
+    return b2Filter(groupIndex=group, categoryBits=1, maskBits=0)
 
 
 class PhysicsWorld:
-    def __init__(self):
-        self.world = b2World(gravity=(0, -3.0))
-        self.time_step = 1.0 / 60.0
-        self.vel_iters = 6
-        self.pos_iters = 2
-        
+    def __init__(self, terrain_bank=None, seed=None, perf=None, fidelity="default", world=None, group=0):
+        """
+        world and group put this lander and its terrain into an existing
+        b2World shared with others (MultiLanderWorld), colliding only with
+        fixtures of the same collision group. The owner of the world steps it
+        and sets the warm-start time step; step(), get_state() and set_state()
+        need a world of their own and raise RuntimeError on a shared one.
+        """
+        if fidelity not in FIDELITY_PROFILES:
+            raise ValueError(f"Unknown fidelity {fidelity!r}. Choose from {sorted(FIDELITY_PROFILES)}")
+        profile = FIDELITY_PROFILES[fidelity]
+        self.fidelity = fidelity
+        self.shared = world is not None
+        self.world = b2World(gravity=(0, GRAVITY)) if world is None else world
+        self._solid_filter = group_filter(group) if group else SOLID_FILTER
+        self.substeps = profile["substeps"]
+        self.time_step = TIME_STEP / self.substeps
+        self.vel_iters = profile["vel_iters"]
+        self.pos_iters = profile["pos_iters"]
+        self.world.continuousPhysics = profile["continuous"]
+        self.landing_check_every = profile["landing_check_every"]
+        # step() clears forces itself, after the last substep
+        self.world.autoClearForces = False
+
+        self.terrain_bank = terrain_bank
+        self.perf = perf  # optional perf.PerfStats
+        self.rng = random
+        self.terrain_profile = None
+        self.terrain_base_y = GROUND_Y
+
+        # the whole terrain surface is one static body with an edge fixture per
+        # straight run of the profile, see _build_terrain
+        self.ground = self.world.CreateStaticBody()
+        self._ground_edges = []
+        self._ground_edge_count = 0
+
+        self.lander = self.world.CreateDynamicBody(
+            position=LANDER_START,
+            angle=0.0,
+            angularDamping=ANGULAR_DAMPING,
+            linearDamping=LINEAR_DAMPING,
+            # apply_torque wakes it every step anyway; a sleep timer would be
+            # hidden state that get_state() can't capture
+            allowSleep=False
+        )
+
+        fixture_def = b2FixtureDef(
+            shape=b2PolygonShape(box=(LANDER_HALF_WIDTH, LANDER_HALF_HEIGHT)),
+            density=LANDER_DENSITY,
+            friction=0.3,
+            restitution=0.0,
+            filter=self._solid_filter
+        )
+
+        self.lander.CreateFixture(fixture_def)
+
+        # Box2D scales warm-starting impulses by the ratio to the previous time
+        # step, which a new world doesn't have; one step with the lander frozen
+        # sets it, so a snapshot restored into a fresh world steps the same
+        if not self.shared:
+            self.lander.awake = False
+            self.world.Step(self.time_step, self.vel_iters, self.pos_iters)
+
+        self._contact_manager = self.world.contactManager
+        self._broadphase = self._contact_manager.broadPhase
+        self._proxy_aabb = b2AABB()
+
+        self.reset(seed)
+
+    def reset(self, seed=None, terrain=None):
+        """
+        Start a new episode in the same b2World: new terrain, lander moved back
+        to the start and zeroed. The ground is reshaped, not rebuilt.
+
+        A seed reseeds the terrain stream, so that episode and every unseeded
+        reset after it are reproducible. With a terrain bank the terrain is
+        looked up (entry seed % len) instead of generated. terrain, a
+        (landing_center, xs, ys) tuple like TerrainBank.get returns, is used
+        as-is (e.g. to replay a recorded episode).
+        """
+        if seed is not None:
+            self.rng = random.Random(seed)
+
         self.is_thrusting = False
         self.game_over = False
         self.has_landed = False
         self.landed_successfully = False
-        self.ground_segments = []
 
-        landing_zone_center = random.uniform(-5, 5)
-        landing_zone_half_width = 3
-        ground_y = -15  #
+        profile = None
+        if terrain is not None:
+            landing_zone_center, xs, ys = terrain
+            profile = (xs, ys)
+        elif self.terrain_bank is not None:
+            if seed is not None:
+                index = self.terrain_bank.index_for_seed(seed)
+            else:
+                index = self.rng.randrange(len(self.terrain_bank))
+            landing_zone_center, xs, ys = self.terrain_bank.get(index)
+            profile = (xs, ys)
+        else:
+            landing_zone_center = self.rng.uniform(-5, 5)
+        landing_zone_half_width = LANDING_ZONE_HALF_WIDTH
+        ground_y = GROUND_Y
+        self.landing_center = landing_zone_center
 
         self.landing_zone = {
             'left': landing_zone_center - landing_zone_half_width,
@@ -26,70 +224,202 @@ class PhysicsWorld:
             'y': ground_y + 1  # Top of ground at -14
         }
 
-        self.create_mountainous_terrain(ground_y, landing_zone_center, landing_zone_half_width)
+        self.create_mountainous_terrain(ground_y, landing_zone_center, landing_zone_half_width, profile)
 
-        self.lander = self.world.CreateDynamicBody(
-            position=(0, 8),
-            angle=0.0,
-            angularDamping=2.0,
-            linearDamping=0.2
-        )
+        self.lander.transform = (LANDER_START, 0.0)
+        self.lander.linearVelocity = (0, 0)
+        self.lander.angularVelocity = 0.0
+        self.lander.awake = True
+        self.world.ClearForces()
 
-        fixture_def = b2FixtureDef(
-            shape=b2PolygonShape(box=(1.0, 0.75)),
-            density=0.5,
-            friction=0.3,
-            restitution=0.0
-        )
+    def create_mountainous_terrain(self, base_y, landing_center, landing_half_width, profile=None):
+        perf = self.perf
+        if perf is not None:
+            start = perf_counter_ns()
+        self._build_terrain(base_y, landing_center, landing_half_width, profile)
+        if perf is not None:
+            perf.record('terrain', start)
 
-        self.lander.CreateFixture(fixture_def)
+    def _build_terrain(self, base_y, landing_center, landing_half_width, profile):
+        if profile is None:
+            profile = generate_height_profile(base_y, landing_center, landing_half_width, self.rng)
+        if profile == self.terrain_profile:
+            # same layout as the last episode, keep the existing edges
+            return
+        self.terrain_profile = profile
+        self.terrain_base_y = base_y
+        self.terrain_key = next(_terrain_keys)
 
-    def create_mountainous_terrain(self, base_y, landing_center, landing_half_width):
-        segment_width = 2.0
-        num_segments = 50
-        start_x = -25
-        max_height_variation = 3.0
+        # The surface is a chain of edges with ghost vertices, the same contacts a
+        # b2ChainShape gives. A chain can't be reshaped and creating/destroying
+        # fixtures leaks in pybox2d, so the edges are pooled and reshaped in place;
+        # edges left over from a longer terrain stop colliding.
+        points = surface_points(*profile)
+        count = len(points) - 1
+        edges = self._ground_edges
+        for edge in edges[self._ground_edge_count:count]:
+            edge.filterData = self._solid_filter
+        for edge in edges[count:self._ground_edge_count]:
+            edge.filterData = NO_COLLIDE_FILTER
+        self._ground_edge_count = count
+        for i in range(count):
+            if i < len(edges):
+                edge = edges[i]
+                edge.shape.vertices = points[i:i + 2]
+            else:
+                edge = self.ground.CreateFixture(shape=b2EdgeShape(vertices=points[i:i + 2]), userData=i,
+                                                 filter=self._solid_filter)
+                edges.append(edge)
+            shape = edge.shape
+            shape.hasVertex0 = i > 0
+            if i > 0:
+                shape.vertex0 = points[i - 1]
+            shape.hasVertex3 = i + 2 < len(points)
+            if i + 2 < len(points):
+                shape.vertex3 = points[i + 2]
+        self.ground.transform = ((0, 0), 0.0)  # refresh the broadphase AABBs
 
-        current_x = start_x
-        prev_height = 0
+        # Box2D keeps vertices as float32, so index the same rounded values
+        xs, ys = self.terrain_profile
+        self.heightfield = Heightfield(array('f', xs), array('f', ys))
+        self._ground_segments = None
 
-        while current_x < 25:
-            is_landing_zone = (landing_center - landing_half_width - 0.5 <= current_x <=
-                             landing_center + landing_half_width + 0.5)
+    def get_state(self, out=None):
+        """
+        Snapshot of the lander, its ground contacts and the episode flags as a
+        STATE_SIZE float64 array (layout in STATE_FIELDS; written into out if
+        given). The terrain is stored as a key into TERRAIN_CACHE; 'steps' is
+        left for the env to fill.
+        """
+        if self.shared:
+            raise RuntimeError("snapshots need a PhysicsWorld with a b2World of its own")
+        state = np.empty(STATE_SIZE) if out is None else out
+        key = self.terrain_key
+        if key not in TERRAIN_CACHE:
+            if len(TERRAIN_CACHE) >= TERRAIN_CACHE_SIZE:
+                del TERRAIN_CACHE[next(iter(TERRAIN_CACHE))]
+            TERRAIN_CACHE[key] = (self.landing_center, *self.terrain_profile)
+        lander = self.lander
+        position = lander.position
+        velocity = lander.linearVelocity
+        aabb = self._broadphase.GetFatAABB(LANDER_PROXY)
+        lower, upper = aabb.lowerBound, aabb.upperBound
+        state[:STATE_CONTACT] = (position.x, position.y, lander.angle, velocity.x, velocity.y,
+                                 lander.angularVelocity, self.game_over, self.has_landed,
+                                 self.landed_successfully, self.is_thrusting, key, 0,
+                                 lower.x, lower.y, upper.x, upper.y)
+        # pybox2d lists contacts oldest first
+        contacts = []
+        for edge in lander.contacts[:STATE_CONTACTS]:
+            contact = edge.contact
+            manifold = contact.manifold
+            count = manifold.pointCount
+            values = [self._edge_index(contact), count, 0, 0, 0, 0, 0, 0]
+            for k, point in enumerate(manifold.points[:count]):
+                values[2 + 3 * k:5 + 3 * k] = point.id.key, point.normalImpulse, point.tangentImpulse
+            contacts += values
+        end = STATE_CONTACT + len(contacts)
+        state[STATE_CONTACT:end] = contacts
+        state[end:] = NO_CONTACTS[len(contacts):]
+        return state
 
-            if is_landing_zone:
-                segment_width = 0.5
-                height = base_y + 1
-            else:
+    def set_state(self, state):
+        """
+        Restore a get_state() snapshot in place. The b2World is kept; the
+        terrain is only rebuilt if the snapshot was taken on a different one.
+        """
+        if self.shared:
+            raise RuntimeError("snapshots need a PhysicsWorld with a b2World of its own")
+        values = state.tolist()
+        key = int(values[STATE_TERRAIN])
+        if key != self.terrain_key:
+            self.reset(terrain=cached_terrain(key))
+            self.terrain_key = key
+        x, y, angle, vx, vy, angular_velocity, game_over, has_landed, landed, thrusting = values[:10]
+        lander = self.lander
+        manager = self._contact_manager
+        for edge in lander.contacts:
+            manager.Destroy(edge.contact)
+        lander.transform = ((x, y), angle)
+        lander.linearVelocity = (vx, vy)
+        lander.angularVelocity = angular_velocity
+        lander.awake = True
+        self.world.ClearForces()
+        self.game_over = bool(game_over)
+        self.has_landed = bool(has_landed)
+        self.landed_successfully = bool(landed)
+        self.is_thrusting = bool(thrusting)
+
+        # Put the proxy back with the snapshot's fat AABB. Box2D only creates
+        # contacts at the end of a step, so create them now.
+        fat = values[STATE_AABB:STATE_AABB + 4]
+        margin = b2_aabbExtension
+        self._move_proxy((fat[0] + margin, fat[1] + margin, fat[2] - margin, fat[3] - margin), (0, 0))
+        aabb = self._broadphase.GetFatAABB(LANDER_PROXY)
+        if [aabb.lowerBound.x, aabb.lowerBound.y, aabb.upperBound.x, aabb.upperBound.y] != fat:
+            self._move_proxy(*proxy_move(fat))  # off by a float32 rounding
+        manager.FindNewContacts()
+
+        width = len(CONTACT_FIELDS)
+        listed = [values[i:i + width] for i in range(STATE_CONTACT, STATE_SIZE, width) if values[i] >= 0]
+        if not listed:
+            return
+        contacts = self._edge_contacts()
+        # a listed edge that no longer overlaps the lander (a stale contact
+        # right after reset()) would be dropped by the next step anyway
+        listed = [slot for slot in listed if slot[0] in contacts]
+        # Contacts come out in broadphase order. Keep the longest prefix of the
+        # snapshot's order that is already in place, and destroy and recreate
+        # the rest one by one: each recreated contact becomes the newest.
+        kept = 0
+        for index in contacts:
+            if kept < len(listed) and index == listed[kept][0]:
+                kept += 1
+        if kept < len(listed):
+            for slot in listed[kept:]:
+                manager.Destroy(contacts[slot[0]])
+                self._broadphase.TouchProxy(LANDER_PROXY)
+                manager.FindNewContacts()
+            contacts = self._edge_contacts()
+        for index, count, *points in listed:
+            if count == 0:
+                continue
+            manifold = contacts[index].manifold
+            manifold.pointCount = int(count)
+            for k, point in enumerate(manifold.points[:int(count)]):
+                point.id.key = int(points[3 * k])
+                point.normalImpulse = points[3 * k + 1]
+                point.tangentImpulse = points[3 * k + 2]
+
+    def _move_proxy(self, bounds, displacement):
+        # MoveProxy keeps the current fat AABB if it already covers the new box,
+        # hence the detour
+        aabb = self._proxy_aabb
+        aabb.lowerBound = bounds[0], bounds[1]
+        aabb.upperBound = bounds[2], bounds[3]
+        self._broadphase.MoveProxy(LANDER_PROXY, FAR_AABB, (0, 0))
+        self._broadphase.MoveProxy(LANDER_PROXY, aabb, displacement)
+
+    def _edge_contacts(self):
+        """Ground edge index -> the lander's contact with it, oldest first."""
+        return {self._edge_index(edge.contact): edge.contact for edge in self.lander.contacts}
+
+    @staticmethod
+    def _edge_index(contact):
+        # ground edges carry their index as userData, the lander fixture None
+        index = contact.fixtureA.userData
+        return contact.fixtureB.userData if index is None else index
 
-                base_variation = math.sin(current_x * 0.5) * 1.5
-                random_variation = random.uniform(-1, 1) * max_height_variation
-                height = base_y + 1 + base_variation + random_variation
-                height = max(base_y + 1, min(height, base_y + 5))
-
-            vertices = [
-                (current_x, base_y),
-                (current_x + segment_width, base_y),
-                (current_x + segment_width, height),
-                (current_x, prev_height if current_x > start_x else height)
-            ]
-            
-            segment = self.world.CreateStaticBody(
-                shapes=b2PolygonShape(vertices=vertices)
-            )
-            self.ground_segments.append(segment)
-
-            prev_height = height
-            current_x += segment_width
+    @property
+    def ground_segments(self):
+        """Vertices of the per-segment ground polygons the renderer draws, built once per terrain."""
+        if self._ground_segments is None:
+            xs, ys = self.heightfield.xs, self.heightfield.ys
+            self._ground_segments = list(segment_vertices(xs, ys, self.terrain_base_y))
+        return self._ground_segments
 
     def check_landing(self):
         lander_pos = self.lander.position
-        lander_vel = self.lander.linearVelocity
-        lander_angle = self.lander.angle
-        while lander_angle > math.pi:
-            lander_angle -= 2 * math.pi
-        while lander_angle < -math.pi:
-            lander_angle += 2 * math.pi
 
         if (abs(lander_pos.x) > 21 or
             lander_pos.y < -20 or
@@ -99,37 +429,29 @@ class PhysicsWorld:
             self.landed_successfully = False
             return
 
-        local_vertices = [
-            b2Vec2(-1.0, -0.75),  # bottom left
-            b2Vec2(1.0, -0.75),  # bottom right
-            b2Vec2(1.0, 0.75),  # top right
-            b2Vec2(-1.0, 0.75)  # top left
-        ]
+        # Contact listener events only fire on actual overlap, while landing uses a
+        # 0.1 m margin, so the heightfield stays the source of truth for decisions.
+        heightfield = self.heightfield
+        if lander_pos.y - LANDER_RADIUS > heightfield.max_height + 0.1:
+            # clear of the highest terrain point, no need to place the vertices
+            self.has_landed = False
+            self.landed_successfully = False
+            return
 
-        world_vertices = [self.lander.GetWorldPoint(v) for v in local_vertices]
+        lander_vel = self.lander.linearVelocity
+        lander_angle = self.lander.angle
+        while lander_angle > math.pi:
+            lander_angle -= 2 * math.pi
+        while lander_angle < -math.pi:
+            lander_angle += 2 * math.pi
 
+        world_vertices = [self.lander.GetWorldPoint(v) for v in LANDER_LOCAL_VERTICES]
         has_collision = False
-        for segment in self.ground_segments:
-            segment_vertices = segment.fixtures[0].shape.vertices
+        if min(v.y for v in world_vertices) <= heightfield.max_height + 0.1:
             for v in world_vertices:
-                ground_height = -float('inf')
-                for i in range(len(segment_vertices)):
-                    x1, y1 = segment_vertices[i]
-                    x2, y2 = segment_vertices[i+1] if i < len(segment_vertices)-1 else segment_vertices[0]
-                    
-                    if (min(x1, x2) <= v.x <= max(x1, x2)):
-                        if abs(x2 - x1) < 0.001:
-                            ground_height = max(y1, y2)
-                        else:
-                            t = (v.x - x1) / (x2 - x1)
-                            ground_height = y1 + t * (y2 - y1)
-                        break
-                
-                if v.y <= ground_height + 0.1:
+                if v.y <= heightfield.height_at(v.x) + 0.1:
                     has_collision = True
                     break
-            if has_collision:
-                break
 
         if has_collision:
             self.has_landed = True
@@ -144,24 +466,35 @@ class PhysicsWorld:
             self.has_landed = False
             self.landed_successfully = False
 
-    def step(self):
-        self.world.Step(self.time_step, self.vel_iters, self.pos_iters)
+    def step(self, check_landing=True):
+        if self.shared:
+            raise RuntimeError("a shared lane is stepped through its MultiLanderWorld, which steps every lander")
+        perf = self.perf
+        if perf is not None:
+            start = perf_counter_ns()
+
+        for _ in range(self.substeps):
+            self.world.Step(self.time_step, self.vel_iters, self.pos_iters)
         self.world.ClearForces()
-        
-        if not self.game_over:
+        if perf is not None:
+            start = perf.record('physics_step', start)
+
+        if check_landing and not self.game_over:
             self.check_landing()
+            if perf is not None:
+                perf.record('check_landing', start)
 
     def apply_thrust(self, thrust_magnitude: float):
         self.is_thrusting = thrust_magnitude > 0
         if self.is_thrusting and not self.game_over:
             angle = self.lander.angle
             force_dir = b2Vec2(-math.sin(angle), math.cos(angle))
-            force = float(thrust_magnitude) * 12.0 * force_dir
+            force = float(thrust_magnitude) * THRUST_SCALE * force_dir
             self.lander.ApplyForceToCenter(force, True)
 
     def apply_torque(self, torque: float):
         if not self.game_over:
-            scaled_torque = float(torque) * 0.3
+            scaled_torque = float(torque) * TORQUE_SCALE
             self.lander.ApplyTorque(scaled_torque, True)
 
     def get_lander_state(self):
@@ -0,0 +1,121 @@
+"""
+Fixed-timestep playback for human mode
+
+PlaybackRunner plays a policy in a LunarLanderEnv window at the same speed on
+any machine. Env steps are paid for out of an accumulator of elapsed wall
+time, one fixed step (1/60 s times the env's action_repeat) at a time, and
+frames are drawn at most render_fps times a second with the lander pose
+interpolated between the last two physics states. The renderer's
+pygame.time.Clock sleeps between frames, so playback no longer keeps a core
+busy. The default cap is the env's metadata["render_fps"] (30), so at 1x two
+physics steps go into each frame.
+
+    runner = PlaybackRunner(LunarLanderEnv(render_mode="human"), policy)
+    runner.run(episodes=5)
+
+speed=4 plays four times faster than real time, still drawing at most
+render_fps frames (most steps are never drawn). render=False skips drawing and
+pacing altogether and runs as fast as the machine allows.
+"""
+
+import time
+
+from Box2D import b2Vec2
+
+from .physics import TIME_STEP
+
+# longest wall-clock gap fed to the accumulator per frame: after a stall (window
+# dragged, machine busy) playback resumes instead of replaying it in a burst
+MAX_FRAME_TIME = 0.25
+
+
+class PlaybackRunner:
+    def __init__(self, env, policy, render_fps=None, speed=1.0, render=True, end_pause=1.0):
+        """
+        env: LunarLanderEnv, or a wrapper around one (EpisodeRecorder); needs
+        render_mode="human" unless render is False.
+        policy: anything with predict(obs) -> (action, state), e.g. NumpyPolicy.
+        render_fps: frame rate cap (default: the env's metadata["render_fps"]).
+        end_pause: seconds the last frame of an episode stays up.
+        """
+        self.env = env
+        self.core = env.unwrapped
+        self.policy = policy
+        self.speed = speed
+        self.render = render
+        self.end_pause = end_pause
+        self.dt = TIME_STEP * self.core.action_repeat
+        self.closed = False
+        if render:
+            if self.core.render_mode != "human":
+                raise ValueError("PlaybackRunner draws in a window, create the env with render_mode=\"human\"")
+            self.core.render_on_step = False
+            self.core.renderer.fps = render_fps or self.core.metadata["render_fps"]
+
+    def run(self, episodes=1):
+        """
+        Play episodes (until the window is closed); returns [(total reward,
+        physics steps)] per finished episode.
+        """
+        results = []
+        for _ in range(episodes):
+            result = self.play_episode()
+            if self.closed:
+                break
+            results.append(result)
+        return results
+
+    def play_episode(self):
+        obs, _ = self.env.reset()
+        total = 0.0
+        done = False
+        if not self.render:
+            while not done:
+                action, _ = self.policy.predict(obs)
+                obs, reward, terminated, truncated, _ = self.env.step(action)
+                total += reward
+                done = terminated or truncated
+            return total, self.core.steps
+
+        previous = current = self._pose()
+        accumulator = 0.0
+        last = time.perf_counter()
+        while not done:
+            now = time.perf_counter()
+            accumulator += min(now - last, MAX_FRAME_TIME) * self.speed
+            last = now
+            while accumulator >= self.dt and not done:
+                action, _ = self.policy.predict(obs)
+                obs, reward, terminated, truncated, _ = self.env.step(action)
+                total += reward
+                done = terminated or truncated
+                previous, current = current, self._pose()
+                accumulator -= self.dt
+            if self._quit_requested():
+                return total, self.core.steps
+            self._draw(previous, current, 1.0 if done else accumulator / self.dt)
+
+        # the renderer's clock paces these too, so the pause costs no CPU
+        end = time.perf_counter() + self.end_pause
+        while time.perf_counter() < end and not self._quit_requested():
+            self._draw(previous, current, 1.0)
+        return total, self.core.steps
+
+    def _pose(self):
+        lander = self.core.physics.lander
+        position = lander.position
+        return position.x, position.y, lander.angle
+
+    def _draw(self, previous, current, alpha):
+        x = previous[0] + (current[0] - previous[0]) * alpha
+        y = previous[1] + (current[1] - previous[1]) * alpha
+        angle = previous[2] + (current[2] - previous[2]) * alpha
+        self.core.render(pose=(b2Vec2(x, y), angle))
+
+    def _quit_requested(self):
+        import pygame
+
+        # drains the queue, which nothing else reads in this window
+        if any(event.type == pygame.QUIT for event in pygame.event.get()):
+            self.closed = True
+        return self.closed
@@ -0,0 +1,390 @@
+"""
+Episode recorder and replayer
+
+EpisodeRecorder wraps a LunarLanderEnv and appends every episode to a
+recording directory of flat, fixed-dtype column files:
+
+    actions.bin       float32 (steps, 2)   action passed to step()
+    observations.bin  float32 (steps, 6)   observation step() returned
+    rewards.bin       float32 (steps,)
+    episodes.bin      EPISODE_DTYPE        one row per episode: first step, length, seed, outcome, ...
+    terrains.bin      bank_dtype(TERRAIN_CAPACITY), one row per episode (same layout as a terrain bank)
+    meta.json
+
+Steps are buffered and written in chunks of chunk_steps. Step rows always reach disk before
+the episode row that points at them, so a reader (or a recording cut short)
+only ever sees complete episodes. meta.json also records the env's
+action_repeat and physics fidelity, which change what one recorded action
+means; replays are built with the same settings, and a recording only takes
+more episodes from an env configured like the one that started it.
+
+EpisodeReplayer memory-maps a recording, so outcome statistics over thousands
+of episodes only touch episodes.bin. Episodes can be drawn again from the
+stored observations, or re-simulated from their terrain and actions. Neither
+needs torch or the policy.
+
+    python -m lunar_lander.recorder stats custom_lunar/recordings
+    python -m lunar_lander.recorder replay custom_lunar/recordings 12 [--resimulate]
+    python -m lunar_lander.recorder verify custom_lunar/recordings
+"""
+
+import argparse
+import json
+import os
+
+import gymnasium as gym
+import numpy as np
+
+from .Lunar_Lander_custom_env import LunarLanderEnv
+from .terrain_bank import bank_dtype
+
+FORMAT_VERSION = 1
+# the profile has at most one breakpoint per 0.5 m over the 50 m of terrain
+TERRAIN_CAPACITY = 104
+# env settings stored in meta.json, with the values recordings made before they were stored used
+ENV_SETTINGS = {"action_repeat": 1, "fidelity": "default"}
+
+UNFINISHED, LANDED, CRASHED, TIMEOUT = 0, 1, 2, 3
+OUTCOMES = {UNFINISHED: "unfinished", LANDED: "landed", CRASHED: "crashed", TIMEOUT: "timeout"}
+
+EPISODE_DTYPE = np.dtype([
+    ('start', np.int64),
+    ('length', np.int32),
+    ('seed', np.int64),  # -1 means reset without a seed
+    ('outcome', np.int8),
+    ('total_reward', np.float64),
+    ('final_distance', np.float32),
+])
+
+# name -> (dtype, shape of one row)
+STEP_COLUMNS = {
+    "actions": (np.float32, (2,)),
+    "observations": (np.float32, (6,)),
+    "rewards": (np.float32, ()),
+}
+
+
+def _column_path(path, name):
+    return os.path.join(path, name + ".bin")
+
+
+def _row_bytes(dtype, shape=()):
+    return np.dtype(dtype).itemsize * int(np.prod(shape))
+
+
+def _env_settings(meta):
+    """The LunarLanderEnv keyword arguments a recording was made with."""
+    return {name: meta.get(name, default) for name, default in ENV_SETTINGS.items()}
+
+
+def _truncate_to_complete_rows(path):
+    """
+    Cut a recording left behind by an interrupted write back to its complete
+    rows: every step column to the shortest one, and episodes.bin and
+    terrains.bin to the episodes whose row, terrain and steps all made it to
+    disk. Returns the number of steps kept.
+    """
+    sizes = {}
+    for name in list(STEP_COLUMNS) + ["episodes", "terrains"]:
+        file_path = _column_path(path, name)
+        sizes[name] = os.path.getsize(file_path) if os.path.exists(file_path) else 0
+    steps = min(sizes[name] // _row_bytes(*STEP_COLUMNS[name]) for name in STEP_COLUMNS)
+    episodes = min(sizes["episodes"] // EPISODE_DTYPE.itemsize,
+                   sizes["terrains"] // bank_dtype(TERRAIN_CAPACITY).itemsize)
+    if episodes:
+        rows = np.fromfile(_column_path(path, "episodes"), dtype=EPISODE_DTYPE, count=episodes)
+        ends = rows['start'] + rows['length']
+        # episodes are appended in step order, so the complete ones are a prefix
+        episodes = int(np.searchsorted(ends, steps, side='right'))
+
+    keep = {name: steps * _row_bytes(*STEP_COLUMNS[name]) for name in STEP_COLUMNS}
+    keep["episodes"] = episodes * EPISODE_DTYPE.itemsize
+    keep["terrains"] = episodes * bank_dtype(TERRAIN_CAPACITY).itemsize
+    for name, size in keep.items():
+        if sizes[name] > size:
+            os.truncate(_column_path(path, name), size)
+    return steps
+
+
+class EpisodeRecorder(gym.Wrapper):
+    """
+    Records every episode of env into the directory path, appending to a
+    recording that is already there (which must have been made with the same
+    action_repeat and fidelity). Call close() to write out the last chunk.
+    """
+
+    def __init__(self, env, path, chunk_steps=4096):
+        super().__init__(env)
+        self.path = path
+        os.makedirs(path, exist_ok=True)
+        meta_path = os.path.join(path, "meta.json")
+        settings = {"action_repeat": env.unwrapped.action_repeat, "fidelity": env.unwrapped.physics.fidelity}
+        meta = {"version": FORMAT_VERSION, "terrain_capacity": TERRAIN_CAPACITY, **settings}
+        if os.path.exists(meta_path):
+            with open(meta_path) as f:
+                existing = json.load(f)
+            if (existing["version"], existing["terrain_capacity"]) != (FORMAT_VERSION, TERRAIN_CAPACITY):
+                raise ValueError(f"{path} holds a recording in a different format")
+            if _env_settings(existing) != settings:
+                raise ValueError(f"{path} was recorded with {_env_settings(existing)}, "
+                                 f"but this env uses {settings}")
+        with open(meta_path, "w") as f:
+            json.dump(meta, f)
+
+        # continue numbering after whatever complete steps the recording already holds
+        self._step_offset = _truncate_to_complete_rows(path)
+        self._files = {name: open(_column_path(path, name), "ab")
+                       for name in list(STEP_COLUMNS) + ["episodes", "terrains"]}
+
+        # Rows are collected as raw bytes (rewards as scalars) and joined at flush
+        # time, which costs less per step than assigning into NumPy buffers.
+        self._chunk_steps = chunk_steps
+        self._actions = []
+        self._observations = []
+        self._rewards = []
+        self._pending_episodes = []
+        self._pending_terrains = []
+
+        self._episode_start = None
+        self._episode_seed = -1
+        self._episode_reward = 0.0
+        self._episode_terrain = None
+
+    def reset(self, *, seed=None, options=None):
+        if self._episode_start is not None:
+            self._end_episode(UNFINISHED, np.nan)
+        obs, info = self.env.reset(seed=seed, options=options)
+
+        physics = self.env.unwrapped.physics
+        xs, ys = physics.terrain_profile
+        self._episode_terrain = (physics.landing_center, xs, ys)
+        self._episode_start = self._step_offset + len(self._rewards)
+        self._episode_seed = -1 if seed is None else seed
+        self._episode_reward = 0.0
+        return obs, info
+
+    def step(self, action):
+        obs, reward, terminated, truncated, info = self.env.step(action)
+        if self._episode_start is None:
+            return obs, reward, terminated, truncated, info
+
+        if type(action) is not np.ndarray or action.dtype != np.float32:
+            action = np.asarray(action, dtype=np.float32)
+        self._actions.append(action.tobytes())
+        self._observations.append(obs.tobytes())
+        self._rewards.append(reward)
+        self._episode_reward += float(reward)
+
+        if terminated or truncated:
+            if info.get("landed_successfully"):
+                outcome = LANDED
+            elif self.env.unwrapped.physics.game_over:
+                outcome = CRASHED
+            else:
+                outcome = TIMEOUT
+            self._end_episode(outcome, info.get("distance", np.nan))
+        if len(self._rewards) >= self._chunk_steps:
+            self._flush()
+        return obs, reward, terminated, truncated, info
+
+    def _end_episode(self, outcome, final_distance):
+        start = self._episode_start
+        length = self._step_offset + len(self._rewards) - start
+        self._episode_start = None
+        if length == 0:
+            return
+        self._pending_episodes.append((start, length, self._episode_seed, outcome,
+                                       self._episode_reward, final_distance))
+        self._pending_terrains.append(self._episode_terrain)
+
+    def _flush(self):
+        self._files["actions"].write(b"".join(self._actions))
+        self._files["observations"].write(b"".join(self._observations))
+        self._files["rewards"].write(np.array(self._rewards, dtype=np.float32).tobytes())
+        self._step_offset += len(self._rewards)
+        self._actions = []
+        self._observations = []
+        self._rewards = []
+
+        if self._pending_episodes:
+            episodes = np.array(self._pending_episodes, dtype=EPISODE_DTYPE)
+            terrains = np.zeros(len(self._pending_terrains), dtype=bank_dtype(TERRAIN_CAPACITY))
+            for entry, (landing_center, xs, ys) in zip(terrains, self._pending_terrains):
+                entry['landing_center'] = landing_center
+                entry['num_points'] = len(xs)
+                entry['xs'][:len(xs)] = xs
+                entry['ys'][:len(ys)] = ys
+            # steps first, so every episode row on disk points at written steps
+            for name in STEP_COLUMNS:
+                self._files[name].flush()
+            self._files["terrains"].write(terrains.tobytes())
+            self._files["episodes"].write(episodes.tobytes())
+            self._pending_episodes = []
+            self._pending_terrains = []
+        for f in self._files.values():
+            f.flush()
+
+    def close(self):
+        if self._files is not None:
+            if self._episode_start is not None:
+                self._end_episode(UNFINISHED, np.nan)
+            self._flush()
+            for f in self._files.values():
+                f.close()
+            self._files = None
+        super().close()
+
+
+def _map_column(path, name, dtype, shape=()):
+    dtype = np.dtype(dtype)
+    rows = os.path.getsize(_column_path(path, name)) // _row_bytes(dtype, shape)
+    if rows == 0:
+        return np.zeros((0,) + shape, dtype=dtype)
+    return np.memmap(_column_path(path, name), dtype=dtype, mode='r', shape=(rows,) + shape)
+
+
+class EpisodeReplayer:
+    """
+    Read-only, memory-mapped view of a recording directory. env_settings holds
+    the action_repeat and fidelity it was recorded with; make_env() builds a
+    LunarLanderEnv with them.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        with open(os.path.join(path, "meta.json")) as f:
+            meta = json.load(f)
+        if meta["version"] != FORMAT_VERSION:
+            raise ValueError(f"unsupported recording version {meta['version']}")
+        self.env_settings = _env_settings(meta)
+
+        self.episodes = _map_column(path, "episodes", EPISODE_DTYPE)
+        self.terrains = _map_column(path, "terrains", bank_dtype(meta["terrain_capacity"]))
+        self.actions, self.observations, self.rewards = (
+            _map_column(path, name, dtype, shape) for name, (dtype, shape) in STEP_COLUMNS.items())
+
+    def __len__(self):
+        return len(self.episodes)
+
+    def make_env(self, render_mode="none"):
+        """A LunarLanderEnv with the settings the recording was made with."""
+        return LunarLanderEnv(render_mode=render_mode, **self.env_settings)
+
+    def _check_env(self, env):
+        settings = {"action_repeat": env.unwrapped.action_repeat, "fidelity": env.unwrapped.physics.fidelity}
+        if settings != self.env_settings:
+            raise ValueError(f"{self.path} was recorded with {self.env_settings}, but env uses {settings}")
+
+    def terrain(self, index):
+        """(landing_center, xs, ys) of an episode, ready for reset(options={"terrain": ...})."""
+        entry = self.terrains[index]
+        n = int(entry['num_points'])
+        return float(entry['landing_center']), entry['xs'][:n].tolist(), entry['ys'][:n].tolist()
+
+    def episode(self, index):
+        """Views of an episode's actions, observations and rewards."""
+        record = self.episodes[index]
+        steps = slice(int(record['start']), int(record['start']) + int(record['length']))
+        return self.actions[steps], self.observations[steps], self.rewards[steps]
+
+    def stats(self):
+        """Outcome counts and reward/length summaries, read from the episode index only."""
+        episodes = self.episodes
+        counts = np.bincount(episodes['outcome'], minlength=len(OUTCOMES))
+        finished = episodes['outcome'] != UNFINISHED
+        stats = {name: int(counts[code]) for code, name in OUTCOMES.items()}
+        stats["episodes"] = len(episodes)
+        stats["success_rate"] = float(counts[LANDED] / max(finished.sum(), 1))
+        if len(episodes):
+            stats["mean_reward"] = float(episodes['total_reward'].mean())
+            stats["mean_length"] = float(episodes['length'].mean())
+        return stats
+
+    def resimulate(self, index, env=None):
+        """
+        Step an env through the episode's recorded actions on its recorded
+        terrain. Returns the observations and rewards it produces; with a human
+        env this also plays the episode back on screen. env defaults to
+        make_env() and must otherwise have the recording's settings.
+        """
+        if env is None:
+            env = self.make_env()
+        else:
+            self._check_env(env)
+        actions, _, _ = self.episode(index)
+        env.reset(options={"terrain": self.terrain(index)})
+        observations = np.zeros((len(actions), 6), dtype=np.float32)
+        rewards = np.zeros(len(actions), dtype=np.float32)
+        for t, action in enumerate(actions):
+            observations[t], rewards[t], done, _, _ = env.step(action)
+            if done:
+                return observations[:t + 1], rewards[:t + 1]
+        return observations, rewards
+
+    def render(self, index, env):
+        """
+        Draw the episode from its stored observations, without stepping the
+        physics. Yields whatever env.render() returns for each step (frames in
+        rgb_array mode).
+        """
+        self._check_env(env)
+        actions, observations, _ = self.episode(index)
+        outcome = self.episodes[index]['outcome']
+        action_repeat = self.env_settings["action_repeat"]
+        env.reset(options={"terrain": self.terrain(index)})
+        physics = env.unwrapped.physics
+        landing_zone = physics.get_landing_zone()
+        landing_center_x = (landing_zone['left'] + landing_zone['right']) / 2.0
+        for t, (action, obs) in enumerate(zip(actions, observations)):
+            physics.lander.transform = ((float(obs[0]) + landing_center_x, float(obs[1]) + landing_zone['y']),
+                                        float(obs[4]))
+            physics.is_thrusting = action[0] > 0
+            if t == len(actions) - 1 and outcome in (LANDED, CRASHED):
+                physics.game_over = True
+                physics.landed_successfully = outcome == LANDED
+            env.unwrapped.steps = (t + 1) * action_repeat
+            yield env.render()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Inspect recorded Lunar Lander episodes")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    stats_parser = subparsers.add_parser("stats", help="outcome statistics")
+    stats_parser.add_argument("path")
+    replay_parser = subparsers.add_parser("replay", help="play an episode back in a window")
+    replay_parser.add_argument("path")
+    replay_parser.add_argument("episode", type=int)
+    replay_parser.add_argument("--resimulate", action="store_true",
+                               help="re-run the physics from the recorded actions instead of drawing stored states")
+    verify_parser = subparsers.add_parser("verify", help="re-simulate episodes and compare with the recording")
+    verify_parser.add_argument("path")
+    verify_parser.add_argument("--episodes", type=int, nargs="+", help="default: all")
+    args = parser.parse_args()
+
+    replayer = EpisodeReplayer(args.path)
+    if args.command == "stats":
+        for key, value in replayer.stats().items():
+            print(f"{key:14s} {value}")
+    elif args.command == "replay":
+        env = replayer.make_env(render_mode="human")
+        if args.resimulate:
+            replayer.resimulate(args.episode, env)
+        else:
+            for _ in replayer.render(args.episode, env):
+                pass
+        env.close()
+    elif args.command == "verify":
+        env = replayer.make_env()
+        mismatches = 0
+        for index in args.episodes or range(len(replayer)):
+            _, recorded_obs, recorded_rewards = replayer.episode(index)
+            observations, rewards = replayer.resimulate(index, env)
+            if not (np.array_equal(observations, recorded_obs) and np.array_equal(rewards, recorded_rewards)):
+                mismatches += 1
+                print(f"episode {index} differs from its recording")
+        print(f"{mismatches} mismatches")
+        raise SystemExit(1 if mismatches else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,19 +1,86 @@
 import pygame
 import math
+import numpy as np
 from Box2D import b2Vec2
 
 class Renderer:
-    def __init__(self, width=800, height=600):
+    def __init__(self, width=800, height=600, headless=False, fps=None):
+        """
+        headless: draw offscreen instead of opening a window. The surface
+        shares its pixels with self.frame, a (height, width, 3) uint8 array, so
+        a rendered frame can be read without copying.
+
+        fps: cap the window's frame rate in update() (sleeps, does not spin).
+        """
         self.width = width
         self.height = height
-        self.screen = pygame.display.set_mode((width, height))
-        pygame.display.set_caption("Lunar Lander")
-        
-        self.scale = 20.0  # pixels per meter
+        self.headless = headless
+        if headless:
+            # frombuffer rather than surfarray.pixels3d: a surfarray view locks the
+            # surface while it is alive, which would break blits on the next frame
+            self.frame = np.zeros((height, width, 3), dtype=np.uint8)
+            self.screen = pygame.image.frombuffer(self.frame, (width, height), "RGB")
+        else:
+            self.frame = None
+            self.screen = pygame.display.set_mode((width, height))
+            pygame.display.set_caption("Lunar Lander")
+
+        # sizes below are in pixels at 800x600, shrink them for smaller frames
+        self.pixel_scale = min(width / 800, height / 600)
+        self.line_width = max(1, round(2 * self.pixel_scale))
+        self.scale = 20.0 * self.pixel_scale  # pixels per meter
         self.screen_center = b2Vec2(width/2, height * 0.75)
+
+        self.fps = fps
+        self.clock = pygame.time.Clock()
+
+        # terrain and flags are static for an episode, they are drawn once here
+        self._background = None
+        self._background_profile = None
+        self._background_zone = None
+
+        self._fonts = {}
+        self._text_cache = {}
         
     def clear(self):
         self.screen.fill((0, 0, 0))
+
+    def draw_background(self, ground_segments, landing_zone, terrain_profile):
+        """
+        Blit the ground and landing zone. They are re-drawn onto the cached
+        background only when terrain_profile (PhysicsWorld.terrain_profile, a
+        new object whenever the terrain changes) or the landing zone changes.
+        """
+        if (self._background is None or terrain_profile is not self._background_profile
+                or landing_zone != self._background_zone):
+            if self._background is None:
+                self._background = pygame.Surface((self.width, self.height))
+            screen, self.screen = self.screen, self._background
+            try:
+                self.clear()
+                for segment in ground_segments:
+                    self.draw_ground(segment)
+                self.draw_landing_zone(landing_zone)
+            finally:
+                self.screen = screen
+            self._background_profile = terrain_profile
+            self._background_zone = dict(landing_zone)
+        self.screen.blit(self._background, (0, 0))
+
+    def font(self, size):
+        font = self._fonts.get(size)
+        if font is None:
+            font = self._fonts[size] = pygame.font.Font(None, max(8, int(size * self.pixel_scale)))
+        return font
+
+    def render_text(self, text, size, color):
+        key = (text, size, color)
+        surface = self._text_cache.get(key)
+        if surface is None:
+            if len(self._text_cache) > 512:
+                self._text_cache.clear()
+            surface = self._text_cache[key] = self.font(size).render(text, True, color)
+        return surface
         
     def to_screen(self, point):
         """This is to convert Box2D coordinates to screen coordinates"""
@@ -25,19 +92,21 @@ class Renderer:
     def draw_flag(self, x, y, facing_right=True):
         base_pos = self.to_screen(b2Vec2(x, y))
         pole_top = self.to_screen(b2Vec2(x, y + 2))  # 2 meters tall pole
-        pygame.draw.line(self.screen, (255, 255, 255), base_pos, pole_top, 2)
+        pygame.draw.line(self.screen, (255, 255, 255), base_pos, pole_top, self.line_width)
+        flag_width = int(20 * self.pixel_scale)
+        flag_height = int(10 * self.pixel_scale)
         flag_points = []
         if facing_right:
             flag_points = [
                 pole_top,
-                (pole_top[0] + 20, pole_top[1] - 10),
-                (pole_top[0], pole_top[1] - 20)
+                (pole_top[0] + flag_width, pole_top[1] - flag_height),
+                (pole_top[0], pole_top[1] - 2 * flag_height)
             ]
         else:
             flag_points = [
                 pole_top,
-                (pole_top[0] + 20, pole_top[1] - 10),
-                (pole_top[0], pole_top[1] - 20)
+                (pole_top[0] + flag_width, pole_top[1] - flag_height),
+                (pole_top[0], pole_top[1] - 2 * flag_height)
             ]
         
         pygame.draw.polygon(self.screen, (255, 0, 0), flag_points)
@@ -47,7 +116,7 @@ class Renderer:
         self.draw_flag(landing_zone['right'], landing_zone['y'], True)  # Right flag faces left
         left_point = self.to_screen(b2Vec2(landing_zone['left'], landing_zone['y']))
         right_point = self.to_screen(b2Vec2(landing_zone['right'], landing_zone['y']))
-        pygame.draw.line(self.screen, (255, 255, 0), left_point, right_point, 2)  # Yellow line
+        pygame.draw.line(self.screen, (255, 255, 0), left_point, right_point, self.line_width)  # Yellow line
         
     def draw_lander(self, position, angle):
         screen_pos = self.to_screen(position)
@@ -61,6 +130,8 @@ class Renderer:
         
         rotated_points = []
         for x, y in points:
+            x *= self.pixel_scale
+            y *= self.pixel_scale
             # rotate
             rx = x * math.cos(angle) - y * math.sin(angle)
             ry = x * math.sin(angle) + y * math.cos(angle)
@@ -69,35 +140,27 @@ class Renderer:
             ry += screen_pos[1]
             rotated_points.append((int(rx), int(ry)))
             
-        pygame.draw.polygon(self.screen, (255, 255, 255), rotated_points, 2)
+        pygame.draw.polygon(self.screen, (255, 255, 255), rotated_points, self.line_width)
 
-    def draw_ground(self, segment):
-        if hasattr(segment, "fixtures"):
-            fixture = segment.fixtures[0]
-            body = segment
-        else:
-            fixture = segment
-            body = fixture.body
-        vertices = [body.GetWorldPoint(v) for v in fixture.shape.vertices]
-        screen_points = [self.to_screen(v) for v in vertices]
+    def draw_ground(self, vertices):
+        """Outline one ground segment, given its polygon vertices in world coordinates."""
+        screen_points = [self.to_screen(b2Vec2(v)) for v in vertices]
 
-        pygame.draw.polygon(self.screen, (255, 255, 255), screen_points, 2)
+        pygame.draw.polygon(self.screen, (255, 255, 255), screen_points, self.line_width)
 
     def draw_game_state(self, state):
         """game state info"""
-        font = pygame.font.Font(None, 36)
-        
         if 'time_remaining' in state:
             time_text = f"Time: {state['time_remaining']:.1f}s"
-            text_surface = font.render(time_text, True, (255, 255, 255))
-            self.screen.blit(text_surface, (10, 10))
+            text_surface = self.render_text(time_text, 36, (255, 255, 255))
+            margin = int(10 * self.pixel_scale)
+            self.screen.blit(text_surface, (margin, margin))
         
         if state.get('game_over', False):
-            font_large = pygame.font.Font(None, 74)
             if state.get('landed_successfully', False):
-                text = font_large.render('LANDED!', True, (0, 255, 0))
+                text = self.render_text('LANDED!', 74, (0, 255, 0))
             else:
-                text = font_large.render('CRASHED!', True, (255, 0, 0))
+                text = self.render_text('CRASHED!', 74, (255, 0, 0))
             text_rect = text.get_rect(center=(self.width/2, self.height/4))
             self.screen.blit(text, text_rect)
 
@@ -111,6 +174,8 @@ class Renderer:
         screen_pos = self.to_screen(position)
         rotated_points = []
         for x, y in thrust_local:
+            x *= self.pixel_scale
+            y *= self.pixel_scale
             rx = x * math.cos(angle) - y * math.sin(angle)
             ry = x * math.sin(angle) + y * math.cos(angle)
             rx += screen_pos[0]
@@ -119,4 +184,8 @@ class Renderer:
         pygame.draw.polygon(self.screen, (255, 0, 0), rotated_points)
 
     def update(self):
-        pygame.display.flip()
\ No newline at end of file
+        if not self.headless:
+            pygame.event.pump()  # keep the window responsive
+            pygame.display.flip()
+            if self.fps:
+                self.clock.tick(self.fps)
\ No newline at end of file
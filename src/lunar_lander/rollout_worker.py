@@ -0,0 +1,132 @@
+"""
+Worker side of the shared-memory rollout pool (see shared_vec_env.py)
+
+Kept apart from SharedMemoryVecEnv so that spawned workers only import the
+headless env, not stable-baselines3 and torch.
+
+A step is answered with an empty message and any other command with its
+pickled result. If either raises, the worker answers ERROR followed by the
+pickled exception and its traceback instead, and keeps serving.
+"""
+
+import pickle
+import traceback
+
+import numpy as np
+
+from .Lunar_Lander_custom_env import LunarLanderEnv
+
+STEP = b"s"
+# never the first byte of a pickle
+ERROR = b"e"
+
+# name -> (dtype, shape after num_envs)
+BUFFERS = {
+    "actions": (np.float32, (2,)),
+    "obs": (np.float32, (6,)),
+    "terminal_obs": (np.float32, (6,)),
+    "rewards": (np.float32, ()),
+    "dones": (np.bool_, ()),
+    "landed_successfully": (np.bool_, ()),
+    "game_over": (np.bool_, ()),
+    "timeout": (np.bool_, ()),
+    "distance": (np.float32, ()),
+    "seeds": (np.int64, ()),  # -1 means no seed
+}
+
+
+class RemoteTraceback(Exception):
+    """Cause attached to an exception re-raised from a worker, holding the worker's traceback."""
+
+    def __str__(self):
+        return self.args[0]
+
+
+def error_reply(exc):
+    """ERROR + (exc, formatted traceback), with exc replaced by a RuntimeError if it does not pickle."""
+    tb = traceback.format_exc()
+    try:
+        data = pickle.dumps((exc, tb))
+        pickle.loads(data)
+    except Exception:
+        data = pickle.dumps((RuntimeError(repr(exc)), tb))
+    return ERROR + data
+
+
+def raise_error_reply(reply, worker):
+    """Re-raise the exception in an ERROR reply, with the worker's traceback as its cause."""
+    exc, tb = pickle.loads(reply[len(ERROR):])
+    raise exc from RemoteTraceback(f"\n\nin rollout worker {worker}:\n{tb}")
+
+
+def buffer_views(raw_buffers, num_envs):
+    return {
+        name: np.frombuffer(raw_buffers[name], dtype=dtype).reshape((num_envs,) + shape)
+        for name, (dtype, shape) in BUFFERS.items()
+    }
+
+
+def run_worker(conn, raw_buffers, num_envs, start, count, env_kwargs):
+    buffers = buffer_views(raw_buffers, num_envs)
+    actions = buffers["actions"]
+    obs_buf = buffers["obs"]
+    terminal_obs = buffers["terminal_obs"]
+    rewards = buffers["rewards"]
+    dones = buffers["dones"]
+    landed = buffers["landed_successfully"]
+    game_overs = buffers["game_over"]
+    timeouts = buffers["timeout"]
+    distances = buffers["distance"]
+    seeds = buffers["seeds"]
+
+    envs = [LunarLanderEnv(**env_kwargs) for _ in range(count)]
+    try:
+        while True:
+            message = conn.recv_bytes()
+            try:
+                if message == STEP:
+                    for i, env in enumerate(envs, start):
+                        obs, reward, terminated, truncated, info = env.step(actions[i])
+                        done = terminated or truncated
+                        rewards[i] = reward
+                        dones[i] = done
+                        # fast_step envs only fill info on the last step of an episode
+                        landed[i] = info.get("landed_successfully", False)
+                        game_overs[i] = info.get("game_over", False)
+                        timeouts[i] = info.get("timeout", False)
+                        distances[i] = info.get("distance", np.nan)
+                        if done:
+                            terminal_obs[i] = obs
+                            seed = int(seeds[i])
+                            if seed >= 0:
+                                seeds[i] = -1
+                            obs, _ = env.reset(seed=seed if seed >= 0 else None)
+                        obs_buf[i] = obs
+                    reply = b""
+                else:
+                    command, args = pickle.loads(message)
+                    result = None
+                    if command == "reset":
+                        for i, env in enumerate(envs, start):
+                            seed = int(seeds[i]) if seeds[i] >= 0 else None
+                            obs_buf[i], _ = env.reset(seed=seed)
+                    elif command == "get_attr":
+                        result = [getattr(envs[i - start], args[0]) for i in args[1]]
+                    elif command == "set_attr":
+                        for i in args[2]:
+                            setattr(envs[i - start], args[0], args[1])
+                    elif command == "env_method":
+                        name, method_args, method_kwargs, indices = args
+                        result = [getattr(envs[i - start], name)(*method_args, **method_kwargs) for i in indices]
+                    elif command == "close":
+                        break
+                    reply = pickle.dumps(result)
+            except Exception as exc:
+                reply = error_reply(exc)
+            conn.send_bytes(reply)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        for env in envs:
+            env.close()
+        conn.close()
@@ -0,0 +1,168 @@
+"""
+Shared-memory rollout pool
+
+A stable-baselines3 VecEnv that runs LunarLanderEnv copies in worker processes.
+Actions, observations, rewards, dones and the info fields live in shared
+NumPy buffers, so a step is one tiny message per worker instead of pickled
+arrays going back and forth like in SubprocVecEnv.
+
+An exception inside a worker (in env.step or a forwarded call) is re-raised
+by the VecEnv call that was waiting for it, with the worker's traceback as
+its cause, and a worker that dies outright raises a RuntimeError with its
+exit code.
+"""
+
+import multiprocessing as mp
+import pickle
+
+import numpy as np
+from stable_baselines3.common.vec_env import VecEnv
+
+from .rollout_worker import BUFFERS, ERROR, STEP, buffer_views, raise_error_reply, run_worker
+
+
+class SharedMemoryVecEnv(VecEnv):
+    """
+    num_workers processes, each stepping envs_per_worker LunarLanderEnv copies.
+
+    env_kwargs go to every LunarLanderEnv (pass a terrain bank by path so the
+    workers map the file instead of copying it). Finished episodes auto-reset
+    like DummyVecEnv, with the last observation in info["terminal_observation"].
+    A seed set for env i after reset() (in self._seeds) is used by that env's
+    next auto-reset, so callers can choose the seed of every episode.
+    """
+
+    def __init__(self, num_workers, envs_per_worker=1, env_kwargs=None, start_method=None):
+        env_kwargs = dict(render_mode="none", **(env_kwargs or {}))
+        num_envs = num_workers * envs_per_worker
+        self.envs_per_worker = envs_per_worker
+        self.closed = False
+
+        ctx = mp.get_context(start_method)
+        self._raw_buffers = {
+            name: ctx.RawArray("b", num_envs * np.dtype(dtype).itemsize * int(np.prod(shape)))
+            for name, (dtype, shape) in BUFFERS.items()
+        }
+        self._buffers = buffer_views(self._raw_buffers, num_envs)
+        self._buffers["seeds"][:] = -1
+
+        self._conns = []
+        self._processes = []
+        for w in range(num_workers):
+            parent_conn, child_conn = ctx.Pipe()
+            process = ctx.Process(
+                target=run_worker,
+                args=(child_conn, self._raw_buffers, num_envs, w * envs_per_worker, envs_per_worker, env_kwargs),
+                daemon=True,
+            )
+            process.start()
+            child_conn.close()
+            self._conns.append(parent_conn)
+            self._processes.append(process)
+
+        observation_space = self._call([0], "get_attr", "observation_space", [0])[0][0]
+        action_space = self._call([0], "get_attr", "action_space", [0])[0][0]
+        super().__init__(num_envs, observation_space, action_space)
+
+    def _call(self, worker_ids, command, *args):
+        for w in worker_ids:
+            self._conns[w].send_bytes(pickle.dumps((command, args)))
+        return [pickle.loads(reply) for reply in self._gather(worker_ids)]
+
+    def _gather(self, worker_ids):
+        """
+        Wait for a reply from every worker in worker_ids, then re-raise the
+        first worker error if there was one. All replies are read before
+        raising so the pipes stay in step for the next command.
+        """
+        replies = []
+        error = None
+        for w in worker_ids:
+            try:
+                reply = self._conns[w].recv_bytes()
+            except (EOFError, ConnectionResetError):
+                self._processes[w].join(timeout=1.0)
+                error = error or RuntimeError(f"rollout worker {w} exited with code {self._processes[w].exitcode}")
+                continue
+            if reply[:len(ERROR)] == ERROR:
+                try:
+                    raise_error_reply(reply, w)
+                except Exception as exc:
+                    error = error or exc
+                continue
+            replies.append(reply)
+        if error is not None:
+            raise error
+        return replies
+
+    def _by_worker(self, indices):
+        groups = {}
+        for i in self._get_indices(indices):
+            groups.setdefault(i // self.envs_per_worker, []).append(i)
+        return groups
+
+    def reset(self):
+        seeds = self._buffers["seeds"]
+        seeds[:] = [-1 if seed is None else seed for seed in self._seeds]
+        self._call(range(len(self._conns)), "reset")
+        seeds[:] = -1
+        self._reset_seeds()
+        self._reset_options()
+        return self._buffers["obs"].copy()
+
+    def step_async(self, actions):
+        self._buffers["actions"][:] = np.asarray(actions).reshape(self.num_envs, 2)
+        seeds = self._buffers["seeds"]
+        for i, seed in enumerate(self._seeds):
+            if seed is not None:
+                seeds[i] = seed
+        for conn in self._conns:
+            conn.send_bytes(STEP)
+
+    def step_wait(self):
+        self._gather(range(len(self._conns)))
+
+        buffers = self._buffers
+        dones = buffers["dones"].copy()
+        for i in np.flatnonzero(dones):
+            self._seeds[i] = None  # consumed by the auto-reset
+        infos = [
+            {"landed_successfully": bool(landed), "game_over": bool(game_over), "timeout": bool(timeout),
+             "distance": float(distance)}
+            for landed, game_over, timeout, distance in zip(buffers["landed_successfully"], buffers["game_over"],
+                                                            buffers["timeout"], buffers["distance"])
+        ]
+        for i in np.flatnonzero(dones):
+            infos[i]["terminal_observation"] = buffers["terminal_obs"][i].copy()
+        return buffers["obs"].copy(), buffers["rewards"].copy(), dones, infos
+
+    def close(self):
+        if self.closed:
+            return
+        for conn in self._conns:
+            try:
+                conn.send_bytes(pickle.dumps(("close", ())))
+            except (BrokenPipeError, EOFError):
+                pass
+        for process in self._processes:
+            process.join()
+        self.closed = True
+
+    def get_attr(self, attr_name, indices=None):
+        results = []
+        for w, ids in self._by_worker(indices).items():
+            results.extend(self._call([w], "get_attr", attr_name, ids)[0])
+        return results
+
+    def set_attr(self, attr_name, value, indices=None):
+        for w, ids in self._by_worker(indices).items():
+            self._call([w], "set_attr", attr_name, value, ids)
+
+    def env_method(self, method_name, *method_args, indices=None, **method_kwargs):
+        results = []
+        for w, ids in self._by_worker(indices).items():
+            results.extend(self._call([w], "env_method", method_name, method_args, method_kwargs, ids)[0])
+        return results
+
+    def env_is_wrapped(self, wrapper_class, indices=None):
+        return [False for _ in self._get_indices(indices)]
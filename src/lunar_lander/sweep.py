@@ -0,0 +1,273 @@
+"""
+PPO hyperparameter sweep with asynchronous successive halving (ASHA)
+
+Samples configurations from a search-space file and trains them in a pool of
+worker processes, one trial segment per core. A trial trains up to a rung
+(a timestep budget), is saved and evaluated on the same seeded episodes as
+every other trial, and is only continued to the next rung if its mean reward
+is in the top 1/eta of the results at its rung so far. Weak trials therefore
+stop at the first rung, and free workers start new trials instead.
+
+The search space is JSON. Every key is a PPO argument, or net_arch (the
+hidden layer sizes, used for both the policy and the value network). Keys
+not in the file keep their custom_run.PPO_KWARGS value:
+
+    {
+        "learning_rate": {"loguniform": [1e-5, 1e-3]},
+        "n_steps": {"choice": [512, 1024, 2048]},
+        "gamma": {"uniform": [0.99, 0.9999]},
+        "net_arch": {"choice": [[64, 64], [128, 128]]},
+        "n_epochs": 5
+    }
+
+    python -m lunar_lander.sweep sweeps/ppo.json --trials 27 --max-timesteps 500000 --workers 8
+
+Results go to --out (default: next to the space file, named after it):
+results.jsonl (one line per evaluation), summary.csv, trials/<id>/model.zip
+and best_model.zip (plus its NumpyPolicy .npz) for the best trial at the highest
+rung any trial reached.
+"""
+
+import argparse
+import concurrent.futures
+import csv
+import json
+import math
+import multiprocessing as mp
+import os
+import random
+import shutil
+import time
+
+import numpy as np
+
+from .Lunar_Lander_custom_env import LunarLanderEnv
+from .custom_run import PPO_KWARGS
+
+
+def sample_config(space, rng):
+    config = {}
+    for name, spec in space.items():
+        if not isinstance(spec, dict):
+            config[name] = spec
+        elif "choice" in spec:
+            config[name] = rng.choice(spec["choice"])
+        elif "uniform" in spec:
+            config[name] = rng.uniform(*spec["uniform"])
+        elif "loguniform" in spec:
+            low, high = spec["loguniform"]
+            config[name] = math.exp(rng.uniform(math.log(low), math.log(high)))
+        else:
+            raise ValueError(f"unknown distribution for {name}: {spec}")
+    return config
+
+
+def ppo_kwargs(config):
+    kwargs = dict(PPO_KWARGS)
+    for name, value in config.items():
+        if name == "net_arch":
+            kwargs["policy_kwargs"] = dict(net_arch=dict(pi=list(value), vf=list(value)))
+        else:
+            kwargs[name] = value
+    return kwargs
+
+
+def rung_budgets(min_timesteps, max_timesteps, eta):
+    """Timestep budgets max/eta^k down to no less than min_timesteps, smallest first."""
+    count = int(math.floor(math.log(max_timesteps / min_timesteps, eta) + 1e-9)) + 1
+    return [int(round(max_timesteps / eta ** k)) for k in reversed(range(count))]
+
+
+class ASHA:
+    """
+    Promotion bookkeeping. A trial that finished rung k can go on to rung k+1
+    once it ranks in the top len(results at k) // eta there; promotions are
+    handed out highest rung first, ahead of new trials.
+    """
+
+    def __init__(self, rungs, eta):
+        self.rungs = rungs
+        self.eta = eta
+        self.results = [{} for _ in rungs]  # rung -> {trial: score}
+        self.promoted = [set() for _ in rungs]
+
+    def record(self, trial, rung, score):
+        self.results[rung][trial] = score
+
+    def next_promotion(self):
+        for rung in reversed(range(len(self.rungs) - 1)):
+            results = self.results[rung]
+            top = sorted(results, key=results.get, reverse=True)[:len(results) // self.eta]
+            for trial in top:
+                if trial not in self.promoted[rung]:
+                    self.promoted[rung].add(trial)
+                    return trial, rung + 1
+        return None
+
+
+def evaluate_seeded(model_path, episodes, seed):
+    """Mean reward and success rate of a saved model over episodes seed..seed+episodes-1."""
+    from .numpy_policy import NumpyPolicy
+
+    policy = NumpyPolicy.from_model(model_path)
+    env = LunarLanderEnv(render_mode="none")
+    rewards = []
+    successes = 0
+    for episode_seed in range(seed, seed + episodes):
+        obs, _ = env.reset(seed=episode_seed)
+        total = 0.0
+        done = False
+        while not done:
+            action, _ = policy.predict(obs)
+            obs, reward, terminated, truncated, info = env.step(action)
+            total += reward
+            done = terminated or truncated
+        rewards.append(total)
+        successes += bool(info["landed_successfully"])
+    env.close()
+    return float(np.mean(rewards)), successes / episodes
+
+
+def _run_segment(config, seed, budget, trial_dir, eval_episodes, eval_seed):
+    # runs in a pool worker: SB3 is imported here, and torch gets one thread per trial
+    import torch
+    from stable_baselines3 import PPO
+
+    torch.set_num_threads(1)
+    start = time.perf_counter()
+    path = os.path.join(trial_dir, "model.zip")
+    env = LunarLanderEnv(render_mode="none")
+    if os.path.exists(path):
+        model = PPO.load(path, env=env, device="cpu")
+    else:
+        os.makedirs(trial_dir, exist_ok=True)
+        model = PPO("MlpPolicy", env, seed=seed, device="cpu", **ppo_kwargs(config))
+    model.learn(total_timesteps=max(budget - model.num_timesteps, 1), reset_num_timesteps=False)
+    model.save(path)
+    env.close()
+    reward, success_rate = evaluate_seeded(path, eval_episodes, eval_seed)
+    return model.num_timesteps, reward, success_rate, time.perf_counter() - start
+
+
+def run_sweep(space, out, trials=27, min_timesteps=50_000, max_timesteps=500_000, eta=3, workers=None,
+              eval_episodes=20, eval_seed=100_000, seed=0):
+    """Run the sweep and return the summary rows, best first."""
+    workers = workers or os.cpu_count() or 1
+    rungs = rung_budgets(min_timesteps, max_timesteps, eta)
+    asha = ASHA(rungs, eta)
+    rng = random.Random(seed)
+    configs = [sample_config(space, rng) for _ in range(trials)]
+    state = {trial: {"rung": None, "status": "pending"} for trial in range(trials)}
+    if os.path.exists(os.path.join(out, "trials")):
+        # trial directories are resumed from, so an old sweep's models would be picked up
+        raise FileExistsError(f"{out} already holds a sweep; choose another output directory")
+    os.makedirs(out, exist_ok=True)
+    with open(os.path.join(out, "sweep.json"), "w") as f:
+        json.dump({"space": space, "rungs": rungs, "eta": eta, "trials": trials, "eval_episodes": eval_episodes,
+                   "eval_seed": eval_seed, "seed": seed, "configs": configs}, f, indent=2)
+    print(f"{trials} trials, rungs at {', '.join(f'{r:,}' for r in rungs)} timesteps, {workers} workers")
+
+    next_trial = 0
+    running = {}
+    ctx = mp.get_context("spawn")
+    with open(os.path.join(out, "results.jsonl"), "w") as log, \
+            concurrent.futures.ProcessPoolExecutor(workers, mp_context=ctx) as pool:
+        def submit(trial, rung):
+            state[trial]["status"] = "running"
+            future = pool.submit(_run_segment, configs[trial], seed + trial, rungs[rung],
+                                 os.path.join(out, "trials", str(trial)), eval_episodes, eval_seed)
+            running[future] = (trial, rung)
+
+        while True:
+            while len(running) < workers:
+                job = asha.next_promotion()
+                if job is None and next_trial < trials:
+                    job = (next_trial, 0)
+                    next_trial += 1
+                if job is None:
+                    break
+                submit(*job)
+            if not running:
+                break
+
+            finished, _ = concurrent.futures.wait(running, return_when=concurrent.futures.FIRST_COMPLETED)
+            for future in finished:
+                trial, rung = running.pop(future)
+                try:
+                    timesteps, reward, success_rate, seconds = future.result()
+                except Exception as e:
+                    print(f"trial {trial} failed at rung {rung}: {e}")
+                    state[trial]["status"] = "failed"
+                    continue
+                asha.record(trial, rung, reward)
+                state[trial].update(rung=rung, timesteps=timesteps, reward=reward, success_rate=success_rate,
+                                    seconds=state[trial].get("seconds", 0.0) + seconds,
+                                    status="complete" if rung == len(rungs) - 1 else "stopped")
+                log.write(json.dumps({"trial": trial, "rung": rung, "timesteps": timesteps, "reward": reward,
+                                      "success_rate": success_rate, "seconds": seconds}) + "\n")
+                log.flush()
+                print(f"trial {trial:3d} rung {rung} ({timesteps:,} steps, {seconds:.0f}s): "
+                      f"reward {reward:9.1f}  success {success_rate:.0%}")
+
+    rows = []
+    for trial, info in state.items():
+        row = {"trial": trial, "status": info["status"], "rung": info["rung"], "timesteps": info.get("timesteps"),
+               "reward": info.get("reward"), "success_rate": info.get("success_rate"),
+               "seconds": info.get("seconds")}
+        row.update(configs[trial])
+        rows.append(row)
+    scored = [row for row in rows if row["reward"] is not None]
+    rows.sort(key=lambda row: (row["rung"] if row["rung"] is not None else -1,
+                               row["reward"] if row["reward"] is not None else -math.inf), reverse=True)
+    with open(os.path.join(out, "summary.csv"), "w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=list(rows[0]))
+        writer.writeheader()
+        writer.writerows(rows)
+
+    if scored:
+        best = os.path.join(out, "trials", str(rows[0]["trial"]), "model")
+        shutil.copyfile(best + ".zip", os.path.join(out, "best_model.zip"))
+        shutil.copyfile(best + ".npz", os.path.join(out, "best_model.npz"))
+    return rows
+
+
+def print_summary(rows, limit=20):
+    keys = [key for key in rows[0] if key not in ("trial", "status", "rung", "timesteps", "reward", "success_rate",
+                                                   "seconds")]
+    print(f"\n{'trial':>5} {'status':>8} {'timesteps':>10} {'reward':>9} {'success':>7}  " + "  ".join(keys))
+    for row in rows[:limit]:
+        if row["reward"] is None:
+            print(f"{row['trial']:5d} {row['status']:>8}")
+            continue
+        values = "  ".join(f"{row[key]:.3g}" if isinstance(row[key], float) else str(row[key]) for key in keys)
+        print(f"{row['trial']:5d} {row['status']:>8} {row['timesteps']:10,} {row['reward']:9.1f} "
+              f"{row['success_rate']:7.0%}  {values}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="PPO hyperparameter sweep with successive halving (ASHA)")
+    parser.add_argument("space", help="search-space JSON file")
+    parser.add_argument("--trials", type=int, default=27)
+    parser.add_argument("--min-timesteps", type=int, default=50_000, help="budget of the first rung")
+    parser.add_argument("--max-timesteps", type=int, default=500_000, help="budget of the last rung")
+    parser.add_argument("--eta", type=int, default=3, help="keep the top 1/eta at each rung")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--eval-episodes", type=int, default=20)
+    parser.add_argument("--eval-seed", type=int, default=100_000, help="first evaluation episode seed")
+    parser.add_argument("--seed", type=int, default=0, help="seeds config sampling and the trials")
+    parser.add_argument("--out", default=None, help="output directory (default: next to the space file)")
+    args = parser.parse_args()
+
+    with open(args.space) as f:
+        space = json.load(f)
+    out = args.out or os.path.splitext(args.space)[0]
+    start = time.perf_counter()
+    rows = run_sweep(space, out, args.trials, args.min_timesteps, args.max_timesteps, args.eta, args.workers,
+                     args.eval_episodes, args.eval_seed, args.seed)
+    print_summary(rows)
+    print(f"\nsweep took {(time.perf_counter() - start) / 60:.1f} min; wrote {out}/summary.csv and "
+          f"{out}/best_model.zip")
+
+
+if __name__ == "__main__":
+    main()
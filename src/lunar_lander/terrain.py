@@ -0,0 +1,100 @@
+import math
+import random
+from bisect import bisect_right
+
+
+TERRAIN_START_X = -25
+TERRAIN_END_X = 25
+MAX_HEIGHT_VARIATION = 3.0
+
+
+def generate_height_profile(base_y, landing_center, landing_half_width, rng=random):
+    """
+    Build the mountain height profile as a list of breakpoints.
+
+    Returns (xs, ys) where segment i spans xs[i]..xs[i+1] and its top edge runs
+    from ys[i] to ys[i+1]. rng only needs a uniform(a, b) method, so the random
+    module, random.Random and np.random.Generator all work.
+    """
+    segment_width = 2.0
+    current_x = TERRAIN_START_X
+    xs = []
+    ys = []
+
+    while current_x < TERRAIN_END_X:
+        is_landing_zone = (landing_center - landing_half_width - 0.5 <= current_x <=
+                           landing_center + landing_half_width + 0.5)
+
+        if is_landing_zone:
+            segment_width = 0.5
+            height = base_y + 1
+        else:
+            base_variation = math.sin(current_x * 0.5) * 1.5
+            random_variation = rng.uniform(-1, 1) * MAX_HEIGHT_VARIATION
+            height = base_y + 1 + base_variation + random_variation
+            height = max(base_y + 1, min(height, base_y + 5))
+
+        if not xs:
+            # the first segment has a flat top
+            xs.append(current_x)
+            ys.append(height)
+
+        current_x += segment_width
+        xs.append(current_x)
+        ys.append(height)
+
+    return xs, ys
+
+
+def segment_vertices(xs, ys, base_y):
+    """Yield the four polygon vertices of every ground segment in a profile."""
+    for i in range(len(xs) - 1):
+        yield [
+            (xs[i], base_y),
+            (xs[i + 1], base_y),
+            (xs[i + 1], ys[i + 1]),
+            (xs[i], ys[i])
+        ]
+
+
+def surface_points(xs, ys):
+    """
+    The top edge of a profile as a polyline, with collinear breakpoints (the
+    flat landing zone and clamped stretches) dropped.
+    """
+    points = [(xs[0], ys[0])]
+    for i in range(1, len(xs) - 1):
+        x0, y0 = points[-1]
+        x1, y1 = xs[i], ys[i]
+        x2, y2 = xs[i + 1], ys[i + 1]
+        if (x1 - x0) * (y2 - y0) != (y1 - y0) * (x2 - x0):
+            points.append((x1, y1))
+    points.append((xs[-1], ys[-1]))
+    return points
+
+
+class Heightfield:
+    """
+    Sorted breakpoint/height index over a terrain profile. Ground height under a
+    point is a binary search plus one interpolation, so lookups cost the same
+    however many segments the terrain has.
+    """
+
+    def __init__(self, xs, ys):
+        self.xs = list(xs)
+        self.ys = list(ys)
+        self.left = self.xs[0]
+        self.right = self.xs[-1]
+        self.max_height = max(self.ys)
+
+    def height_at(self, x):
+        """Height of the top edge at x, or -inf outside the terrain."""
+        if x < self.left or x > self.right:
+            return -math.inf
+        i = bisect_right(self.xs, x)
+        if i == len(self.xs):
+            return self.ys[-1]
+        # interpolate from the right end like the old per-polygon edge walk did
+        x1, y1 = self.xs[i], self.ys[i]
+        x2, y2 = self.xs[i - 1], self.ys[i - 1]
+        return y1 + (x - x1) / (x2 - x1) * (y2 - y1)
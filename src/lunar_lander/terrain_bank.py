@@ -0,0 +1,90 @@
+"""
+Terrain Bank
+
+Pre-generated, seeded terrains stored in one .npy file. Entry i holds the
+terrain PhysicsWorld would generate for seed i, so a bank is a lookup table for
+seeded resets. The file is opened memory-mapped and read-only, so any number of
+subprocess envs share one copy through the page cache.
+
+    python -m lunar_lander.terrain_bank --out custom_lunar/terrain_bank.npy --size 100000
+"""
+
+import argparse
+import random
+
+import numpy as np
+
+from .physics import GROUND_Y, LANDING_ZONE_HALF_WIDTH
+from .terrain import generate_height_profile
+
+
+def bank_dtype(capacity):
+    # Box2D keeps vertices as float32 anyway, so the profile is stored at that precision
+    return np.dtype([
+        ('landing_center', np.float64),
+        ('num_points', np.int32),
+        ('xs', np.float32, (capacity,)),
+        ('ys', np.float32, (capacity,)),
+    ])
+
+
+def generate_terrain(seed):
+    """Landing zone center and height profile for one seed, drawn like PhysicsWorld.reset."""
+    rng = random.Random(seed)
+    landing_center = rng.uniform(-5, 5)
+    xs, ys = generate_height_profile(GROUND_Y, landing_center, LANDING_ZONE_HALF_WIDTH, rng)
+    return landing_center, xs, ys
+
+
+def build_terrain_bank(path, size):
+    """Generate entries for seeds 0..size-1 and save them to path."""
+    terrains = [generate_terrain(seed) for seed in range(size)]
+    capacity = max(len(xs) for _, xs, _ in terrains)
+
+    bank = np.zeros(size, dtype=bank_dtype(capacity))
+    for entry, (landing_center, xs, ys) in zip(bank, terrains):
+        entry['landing_center'] = landing_center
+        entry['num_points'] = len(xs)
+        entry['xs'][:len(xs)] = xs
+        entry['ys'][:len(ys)] = ys
+
+    np.save(path, bank)
+    return path
+
+
+class TerrainBank:
+    """Read-only, memory-mapped view of a terrain bank file."""
+
+    def __init__(self, path):
+        self.path = path
+        self.entries = np.load(path, mmap_mode='r')
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __reduce__(self):
+        # pickle by path so subprocess envs map the file instead of copying it
+        return TerrainBank, (self.path,)
+
+    def index_for_seed(self, seed):
+        return seed % len(self.entries)
+
+    def get(self, index):
+        """Return (landing_center, xs, ys) for an entry."""
+        entry = self.entries[index]
+        n = int(entry['num_points'])
+        return float(entry['landing_center']), entry['xs'][:n].tolist(), entry['ys'][:n].tolist()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Pre-generate a seeded terrain bank")
+    parser.add_argument("--out", required=True, help="output .npy path")
+    parser.add_argument("--size", type=int, default=100000, help="number of terrains (seeds 0..size-1)")
+    args = parser.parse_args()
+
+    build_terrain_bank(args.out, args.size)
+    print(f"Wrote {args.size} terrains to {args.out}")
+
+
+if __name__ == "__main__":
+    main()
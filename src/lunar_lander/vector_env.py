@@ -0,0 +1,1208 @@
+"""
+Vectorized Lunar Lander
+
+Batched NumPy version of the lander physics that steps N landers in lockstep,
+plus a stable-baselines3 VecEnv on top of it. The dynamics mirror what Box2D
+does for the single lander in PhysicsWorld (semi-implicit Euler with damping),
+and ground contact uses the same heightfield rule as PhysicsWorld.check_landing.
+
+Ground contact goes through the steps of b2World::Step for one dynamic body
+against static edges: each lander keeps its broadphase box and its contacts
+in creation order with their manifold ids and impulses (the same state
+PhysicsWorld.get_state() records), collides them with b2CollideEdgeAndPolygon,
+runs the warm-started contact solver over them, and resolves touchdowns
+inside the step with Box2D's time-of-impact sub-steps. Box2D computes in
+float32, so trajectories agree with LunarLanderEnv closely but not bit for
+bit, and an episode that ends within float noise of a landing limit can
+score differently.
+"""
+
+import math
+import random
+
+import numpy as np
+from gymnasium import spaces
+
+from .lane_vec_env import LaneVecEnv
+from .physics import (FIDELITY_PROFILES, GRAVITY, TIME_STEP, GROUND_Y, LANDING_ZONE_HALF_WIDTH, LANDER_START,
+                     LANDER_HALF_WIDTH, LANDER_HALF_HEIGHT, LANDER_DENSITY, LINEAR_DAMPING,
+                     ANGULAR_DAMPING, THRUST_SCALE, TORQUE_SCALE, STATE_TERRAIN, STATE_STEPS, STATE_AABB,
+                     STATE_CONTACT, STATE_CONTACTS, CONTACT_FIELDS, cached_terrain)
+from .terrain import generate_height_profile, surface_points
+from .terrain_bank import TerrainBank
+
+# Box2D per-step motion limits (b2_maxTranslation, b2_maxRotation)
+MAX_TRANSLATION = 2.0
+MAX_ROTATION = 0.5 * math.pi
+
+LANDER_MASS = LANDER_DENSITY * 4.0 * LANDER_HALF_WIDTH * LANDER_HALF_HEIGHT
+LANDER_INERTIA = LANDER_MASS * (LANDER_HALF_WIDTH ** 2 + LANDER_HALF_HEIGHT ** 2) / 3.0
+
+# bottom left, bottom right, top right, top left
+LANDER_CORNERS = np.array([
+    [-LANDER_HALF_WIDTH, -LANDER_HALF_HEIGHT],
+    [LANDER_HALF_WIDTH, -LANDER_HALF_HEIGHT],
+    [LANDER_HALF_WIDTH, LANDER_HALF_HEIGHT],
+    [-LANDER_HALF_WIDTH, LANDER_HALF_HEIGHT],
+])
+# outward normals of the faces from each corner to the next, as b2PolygonShape orders them
+LANDER_NORMALS = np.array([[0.0, -1.0], [1.0, 0.0], [0.0, 1.0], [-1.0, 0.0]])
+
+# Box2D settings (b2Settings.h). Lander and ground edges each have a
+# b2_polygonRadius skin, so shapes touch at CONTACT_RADIUS between their cores.
+LINEAR_SLOP = 0.005
+ANGULAR_SLOP = 2.0 / 180.0 * math.pi
+POLYGON_RADIUS = 2.0 * LINEAR_SLOP
+CONTACT_RADIUS = 2.0 * POLYGON_RADIUS
+AABB_EXTENSION = 0.1
+AABB_MULTIPLIER = 2.0
+BAUMGARTE = 0.2
+TOI_BAUMGARTE = 0.75
+MAX_LINEAR_CORRECTION = 0.2
+MAX_SUB_STEPS = 8
+POSITION_ITERATIONS = FIDELITY_PROFILES["default"]["pos_iters"]
+VELOCITY_ITERATIONS = FIDELITY_PROFILES["default"]["vel_iters"]
+TOI_POSITION_ITERATIONS = 20
+# b2TimeOfImpact advances a sweep until the cores are TOI_TARGET apart, give or take TOI_TOLERANCE
+TOI_TARGET = max(LINEAR_SLOP, CONTACT_RADIUS - 3.0 * LINEAR_SLOP)
+TOI_TOLERANCE = 0.25 * LINEAR_SLOP
+TOI_BISECTIONS = 20
+FLOAT32_EPSILON = float(np.finfo(np.float32).eps)
+# b2MixFriction of the lander's fixture (0.3) and the ground edges (default 0.2)
+CONTACT_FRICTION = math.sqrt(0.3 * 0.2)
+# two-point manifolds worse conditioned than this are solved on their first point
+MAX_CONDITION_NUMBER = 1000.0
+
+# b2EPCollider's normal limits for each neighbourhood of an edge (see _edge_case):
+# front lower, front upper, back lower, back upper, as signed 1-based indices
+# into (normal0, normal1, normal2) of the previous, own and next edge
+EDGE_LIMITS = np.array([
+    [1, 3, -2, -2],  # both neighbours, convex at both ends
+    [1, 2, -3, -2],  # both neighbours, convex at v1 only
+    [2, 3, -2, -1],  # both neighbours, convex at v2 only
+    [2, 2, -3, -1],  # both neighbours, concave at both ends
+    [1, -2, 2, -2],  # previous edge only, convex
+    [2, -2, 2, -1],  # previous edge only, concave
+    [-2, 3, -2, 2],  # next edge only, convex
+    [-2, 2, -3, 2],  # next edge only, concave
+    [-2, -2, 2, 2],  # no neighbours
+])
+
+# b2ContactID keys are four bytes: indexA, indexB, typeA, typeB (0 vertex, 1 face)
+FACE_A = 1 << 16
+FACE_B = 1 << 24
+
+# ground contacts one lander can hold: edges its broadphase box overlaps
+CONTACT_CAPACITY = 16
+
+# each env's breakpoints are shifted by this much so all terrains fit in one sorted array
+TERRAIN_ROW_STRIDE = 1000.0
+
+
+def _unit(dx, dy):
+    length = np.sqrt(dx * dx + dy * dy)
+    return dx / length, dy / length
+
+
+def _pick(values, index):
+    """values[..., index] for an index array shaped like values without its last axis."""
+    return np.take_along_axis(values, index[..., None], axis=-1)[..., 0]
+
+
+def _swap_features(key):
+    """A b2ContactID key with the A and B features swapped, as for e_faceB manifolds."""
+    return ((key >> 8) & 0xFF) | ((key & 0xFF) << 8) | ((key >> 24) << 16) | (((key >> 16) & 0xFF) << 24)
+
+
+def _clip(first, second, normal_x, normal_y, offset, vertex_index):
+    """
+    b2ClipSegmentToLine on (x, y, id) arrays: the two points of the segment
+    first-second left on the inner side of the line, and where it kept two.
+    """
+    first_x, first_y, first_id = first
+    second_x, second_y, second_id = second
+    distance0 = normal_x * first_x + normal_y * first_y - offset
+    distance1 = normal_x * second_x + normal_y * second_y - offset
+    inside0 = distance0 <= 0.0
+    inside1 = distance1 <= 0.0
+    crossing = distance0 * distance1 < 0.0
+    t = distance0 / np.where(crossing, distance0 - distance1, 1.0)
+    # the crossing point is a vertex of the reference side on the incident face
+    cut = (first_x + t * (second_x - first_x), first_y + t * (second_y - first_y),
+           vertex_index | (first_id & 0xFF00) | FACE_B)
+    both = inside0 & inside1
+    out0 = tuple(np.where(inside0, a, np.where(inside1, b, c)) for a, b, c in zip(first, second, cut))
+    out1 = tuple(np.where(both, b, c) for b, c in zip(second, cut))
+    return out0, out1, both | ((inside0 | inside1) & crossing)
+
+
+def _lander_aabb(position, angle):
+    """b2PolygonShape::ComputeAABB of the landers at these poses, (n, 4) lower x, lower y, upper x, upper y."""
+    cos = np.abs(np.cos(angle))
+    sin = np.abs(np.sin(angle))
+    extent_x = LANDER_HALF_WIDTH * cos + LANDER_HALF_HEIGHT * sin + POLYGON_RADIUS
+    extent_y = LANDER_HALF_WIDTH * sin + LANDER_HALF_HEIGHT * cos + POLYGON_RADIUS
+    x = position[:, 0]
+    y = position[:, 1]
+    return np.stack([x - extent_x, y - extent_y, x + extent_x, y + extent_y], axis=1)
+
+
+class VectorPhysics:
+    """Lander state and terrain for num_envs worlds held in contiguous arrays."""
+
+    def __init__(self, num_envs, terrain_capacity=128):
+        self.num_envs = num_envs
+        self.time_step = TIME_STEP
+
+        self.position = np.zeros((num_envs, 2))
+        self.linear_velocity = np.zeros((num_envs, 2))
+        self.angle = np.zeros(num_envs)
+        self.angular_velocity = np.zeros(num_envs)
+
+        self.is_thrusting = np.zeros(num_envs, dtype=bool)
+        self.game_over = np.zeros(num_envs, dtype=bool)
+        self.has_landed = np.zeros(num_envs, dtype=bool)
+        self.landed_successfully = np.zeros(num_envs, dtype=bool)
+
+        self.landing_left = np.zeros(num_envs)
+        self.landing_right = np.zeros(num_envs)
+        self.landing_y = np.full(num_envs, GROUND_Y + 1.0)
+
+        self._force = np.zeros((num_envs, 2))
+        self._torque = np.zeros(num_envs)
+        self._rows = np.arange(num_envs)
+        self._start_position = np.zeros((num_envs, 2))
+        self._start_angle = np.zeros(num_envs)
+
+        # Box2D's contact state per lander: the broadphase (fat) AABB, which
+        # decides when contacts get created, and the ground contacts oldest
+        # first (edge index, -1 if unused) with their manifold points' ids
+        # and impulses, which warm-start the solver
+        self._fat_aabb = _lander_aabb(np.tile(LANDER_START, (num_envs, 1)).astype(float), np.zeros(num_envs))
+        self._fat_aabb += np.array([-AABB_EXTENSION, -AABB_EXTENSION, AABB_EXTENSION, AABB_EXTENSION])
+        self._contact_edge = np.full((num_envs, CONTACT_CAPACITY), -1)
+        self._contact_points = np.zeros((num_envs, CONTACT_CAPACITY), dtype=np.int64)
+        self._contact_id = np.zeros((num_envs, CONTACT_CAPACITY, 2), dtype=np.int64)
+        self._normal_impulse = np.zeros((num_envs, CONTACT_CAPACITY, 2))
+        self._tangent_impulse = np.zeros((num_envs, CONTACT_CAPACITY, 2))
+        self._allocate_terrain(terrain_capacity)
+
+    def _allocate_terrain(self, capacity):
+        self.terrain_capacity = capacity
+        self._terrain_keys = np.zeros((self.num_envs, capacity))
+        self._terrain_heights = np.zeros((self.num_envs, capacity))
+        self._terrain_count = np.zeros(self.num_envs, dtype=np.int64)
+        self._terrain_left = np.zeros(self.num_envs)
+        self._terrain_right = np.zeros(self.num_envs)
+        self._terrain_top = np.zeros(self.num_envs)
+        self._row_offset = self._rows * TERRAIN_ROW_STRIDE
+        self._row_first = self._rows * capacity
+        for i in range(self.num_envs):
+            self._terrain_keys[i] = self._row_offset[i] + np.arange(capacity)
+        # the ground edges Box2D builds (terrain.surface_points) and their fat AABBs
+        self._surface_x = np.zeros((self.num_envs, capacity))
+        self._surface_y = np.zeros((self.num_envs, capacity))
+        self._edge_count = np.zeros(self.num_envs, dtype=np.int64)
+        self._edge_aabb = np.zeros((self.num_envs, capacity, 4))
+
+    def set_terrain(self, index, xs, ys, landing_center):
+        """Load a height profile (see terrain.generate_height_profile) into one env."""
+        n = len(xs)
+        if n > self.terrain_capacity:
+            old = (self._terrain_keys - self._row_offset[:, None], self._terrain_heights, self._terrain_count,
+                   self._terrain_left, self._terrain_right, self._surface_x, self._surface_y,
+                   self._edge_count, self._edge_aabb)
+            self._allocate_terrain(2 * n)
+            for i in range(self.num_envs):
+                if i != index and old[2][i]:
+                    self._copy_row(i, *(values[i] for values in old))
+
+        # Box2D keeps the edges in float32, and PhysicsWorld indexes the same rounded values
+        points = np.array(surface_points(list(xs), list(ys)), dtype=np.float32)
+        count = len(points)
+        lower = np.minimum(points[:-1], points[1:]) - np.float32(POLYGON_RADIUS)
+        upper = np.maximum(points[:-1], points[1:]) + np.float32(POLYGON_RADIUS)
+        edge_aabb = np.zeros((self.terrain_capacity, 4))
+        edge_aabb[:count - 1] = np.concatenate([lower - np.float32(AABB_EXTENSION),
+                                                upper + np.float32(AABB_EXTENSION)], axis=1)
+        surface_x = np.zeros(self.terrain_capacity)
+        surface_y = np.zeros(self.terrain_capacity)
+        surface_x[:count] = points[:, 0]
+        surface_y[:count] = points[:, 1]
+        xs = np.asarray(xs, dtype=np.float32).astype(np.float64)
+        ys = np.asarray(ys, dtype=np.float32).astype(np.float64)
+        self._copy_row(index, xs, ys, n, xs[0], xs[-1], surface_x, surface_y, count - 1, edge_aabb)
+
+        self.landing_left[index] = landing_center - LANDING_ZONE_HALF_WIDTH
+        self.landing_right[index] = landing_center + LANDING_ZONE_HALF_WIDTH
+
+    def _copy_row(self, index, xs, ys, n, left, right, surface_x, surface_y, edge_count, edge_aabb):
+        row_keys = self._terrain_keys[index]
+        row_heights = self._terrain_heights[index]
+        row_keys[:n] = xs[:n]
+        row_heights[:n] = ys[:n]
+        # pad past the end with increasing x so the row stays sorted
+        row_keys[n:] = xs[n - 1] + np.arange(1, self.terrain_capacity - n + 1)
+        row_heights[n:] = ys[n - 1]
+        row_keys += self._row_offset[index]
+        self._terrain_count[index] = n
+        self._terrain_left[index] = left
+        self._terrain_right[index] = right
+        self._terrain_top[index] = row_heights[:n].max()
+
+        self._surface_x[index, :edge_count + 1] = surface_x[:edge_count + 1]
+        self._surface_y[index, :edge_count + 1] = surface_y[:edge_count + 1]
+        self._edge_count[index] = edge_count
+        self._edge_aabb[index, :edge_count] = edge_aabb[:edge_count]
+
+    def reset_landers(self, indices):
+        self.position[indices] = LANDER_START
+        self.linear_velocity[indices] = 0.0
+        self.angle[indices] = 0.0
+        self.angular_velocity[indices] = 0.0
+        self.is_thrusting[indices] = False
+        self.game_over[indices] = False
+        self.has_landed[indices] = False
+        self.landed_successfully[indices] = False
+        # moving the body re-fattens its broadphase box unless that already covers it
+        rows = self._rows[indices]
+        self._move_proxies(rows, _lander_aabb(self.position[rows], self.angle[rows]), np.zeros((len(rows), 2)))
+        self._contact_edge[rows] = -1
+        self._contact_points[rows] = 0
+
+    def set_landers(self, indices, states):
+        """
+        Lander pose, velocities, flags and Box2D contact state from
+        PhysicsWorld.get_state() rows (or one row for all).
+        """
+        self.position[indices] = states[..., 0:2]
+        self.angle[indices] = states[..., 2]
+        self.linear_velocity[indices] = states[..., 3:5]
+        self.angular_velocity[indices] = states[..., 5]
+        self.game_over[indices] = states[..., 6] != 0
+        self.has_landed[indices] = states[..., 7] != 0
+        self.landed_successfully[indices] = states[..., 8] != 0
+        self.is_thrusting[indices] = states[..., 9] != 0
+
+        rows = self._rows[indices]
+        single = states.ndim == 1
+        states = np.broadcast_to(states, (len(rows), states.shape[-1]))
+        self._fat_aabb[rows] = states[:, STATE_AABB:STATE_AABB + 4]
+        self._contact_edge[rows] = -1
+        self._contact_points[rows] = 0
+        # contacts for every edge the fat AABB overlaps, created in edge order;
+        # one snapshot on one terrain gives every lane the same ones
+        near = self._reaching_terrain(rows[:1] if single else rows)
+        if len(near):
+            overlapping = self._overlaps(near)
+            slot = np.cumsum(overlapping, axis=1) - 1
+            overlapping &= slot < CONTACT_CAPACITY
+            row, edge = np.nonzero(overlapping)
+            self._contact_edge[near[row], slot[row, edge]] = edge
+            if single:
+                self._contact_edge[rows] = self._contact_edge[near[0]]
+
+        width = len(CONTACT_FIELDS)
+        listed = states[:, STATE_CONTACT:STATE_CONTACT + STATE_CONTACTS * width].reshape(-1, STATE_CONTACTS, width)
+        loaded = np.flatnonzero((listed[:, :, 0] >= 0).any(axis=1))
+        if single and len(loaded):
+            self._load_contacts(rows[0], listed[0])
+            for values in (self._contact_edge, self._contact_points, self._contact_id,
+                           self._normal_impulse, self._tangent_impulse):
+                values[rows] = values[rows[0]]
+        else:
+            for i in loaded:
+                self._load_contacts(rows[i], listed[i])
+
+    def _load_contacts(self, row, listed):
+        """
+        Put the snapshot's contacts (STATE_CONTACTS rows of CONTACT_FIELDS)
+        into row in the order PhysicsWorld.set_state leaves them: broadphase
+        order, with the ones that don't fit it recreated (so newest) after it.
+        """
+        edges = self._contact_edge[row]
+        overlapping = edges[edges >= 0].tolist()
+        listed = [slot for slot in listed.tolist() if slot[0] in overlapping]
+        kept = 0
+        for edge in overlapping:
+            if kept < len(listed) and edge == listed[kept][0]:
+                kept += 1
+        recreated = [int(slot[0]) for slot in listed[kept:]]
+        order = [edge for edge in overlapping if edge not in recreated] + recreated
+        edges[:len(order)] = order
+        for edge, count, id0, normal0, tangent0, id1, normal1, tangent1 in listed:
+            slot = order.index(edge)
+            self._contact_points[row, slot] = count
+            self._contact_id[row, slot] = id0, id1
+            self._normal_impulse[row, slot] = normal0, normal1
+            self._tangent_impulse[row, slot] = tangent0, tangent1
+
+    def apply_controls(self, thrust, torque):
+        """Batched apply_thrust/apply_torque; forces are cleared after the next step."""
+        active = ~self.game_over
+        self.is_thrusting = thrust > 0
+        magnitude = np.where(self.is_thrusting & active, thrust, 0.0) * THRUST_SCALE
+        self._force[:, 0] = -np.sin(self.angle) * magnitude
+        self._force[:, 1] = np.cos(self.angle) * magnitude
+        self._torque[:] = np.where(active, torque, 0.0) * TORQUE_SCALE
+
+    def ground_height(self, x):
+        """Terrain height under x, shape (num_envs, k); -inf outside the terrain."""
+        keys = x + self._row_offset[:, None]
+        flat_keys = self._terrain_keys.reshape(-1)
+        flat_heights = self._terrain_heights.reshape(-1)
+
+        idx = np.searchsorted(flat_keys, keys, side='right') - 1
+        first = self._row_first[:, None]
+        np.clip(idx, first, first + self.terrain_capacity - 2, out=idx)
+
+        x1 = flat_keys[idx]
+        x2 = flat_keys[idx + 1]
+        y1 = flat_heights[idx]
+        y2 = flat_heights[idx + 1]
+        height = y1 + (keys - x1) / (x2 - x1) * (y2 - y1)
+        inside = (x >= self._terrain_left[:, None]) & (x <= self._terrain_right[:, None])
+        return np.where(inside, height, -np.inf)
+
+    def _overlaps(self, rows):
+        """Which ground edges of the envs in rows overlap their lander's fat AABB, (len(rows), capacity)."""
+        fat = self._fat_aabb[rows, None]
+        edge = self._edge_aabb[rows]
+        return ((edge[..., 0] <= fat[..., 2]) & (fat[..., 0] <= edge[..., 2]) &
+                (edge[..., 1] <= fat[..., 3]) & (fat[..., 1] <= edge[..., 3]) &
+                (np.arange(self.terrain_capacity) < self._edge_count[rows, None]))
+
+    def _reaching_terrain(self, rows):
+        """The envs in rows whose lander's fat AABB reaches down to the ground edges' fat AABBs."""
+        reach = self._terrain_top[rows] + POLYGON_RADIUS + 2.0 * AABB_EXTENSION  # float32 rounding to spare
+        return rows[self._fat_aabb[rows, 1] <= reach]
+
+    def _move_proxies(self, rows, aabb, displacement):
+        """
+        b2DynamicTree::MoveProxy for the landers in rows, whose shapes now
+        cover aabb after moving by displacement: a fat AABB that no longer
+        contains the shape is rebuilt around it, stretched along the motion.
+        Returns the rows that got a new one.
+        """
+        fat = self._fat_aabb[rows]
+        moved = ((aabb[:, 0] < fat[:, 0]) | (aabb[:, 1] < fat[:, 1]) |
+                 (aabb[:, 2] > fat[:, 2]) | (aabb[:, 3] > fat[:, 3]))
+        if not moved.any():
+            return rows[:0]
+        fat = aabb[moved] + np.array([-AABB_EXTENSION, -AABB_EXTENSION, AABB_EXTENSION, AABB_EXTENSION])
+        stretch = AABB_MULTIPLIER * displacement[moved]
+        fat[:, 0:2] += np.minimum(stretch, 0.0)
+        fat[:, 2:4] += np.maximum(stretch, 0.0)
+        rows = rows[moved]
+        self._fat_aabb[rows] = fat
+        return rows
+
+    def _synchronize(self, rows, start_position, start_angle, position, angle):
+        """
+        b2Body::SynchronizeFixtures for landers in rows swept from the start
+        poses to the given ones, then b2ContactManager::FindNewContacts: each
+        edge the fat AABB newly overlaps gets a contact, in edge order.
+        """
+        start = _lander_aabb(start_position, start_angle)
+        end = _lander_aabb(position, angle)
+        aabb = np.concatenate([np.minimum(start[:, :2], end[:, :2]), np.maximum(start[:, 2:], end[:, 2:])], axis=1)
+        rows = self._move_proxies(rows, aabb, position - start_position)
+        rows = self._reaching_terrain(rows)
+        if not len(rows):
+            return
+        new = self._overlaps(rows)
+        edge = self._contact_edge[rows]
+        listed = edge >= 0
+        new[np.nonzero(listed)[0], edge[listed]] = False
+        slot = listed.sum(axis=1)[:, None] + np.cumsum(new, axis=1) - 1
+        new &= slot < CONTACT_CAPACITY
+        row, new_edge = np.nonzero(new)
+        slot = slot[row, new_edge]
+        row = rows[row]
+        self._contact_edge[row, slot] = new_edge
+        self._contact_points[row, slot] = 0
+
+    def _edges(self, rows, edge):
+        """
+        The ground edges (surface indices, (len(rows), C), -1 for none) of the
+        envs in rows as b2EdgeShapes: x and y of v0, v1, v2, v3 (v0 and v3
+        the ghost vertices of the neighbouring edges), has_vertex0,
+        has_vertex3, and valid.
+        """
+        valid = edge >= 0
+        index = np.where(valid, edge, 0)
+        row = rows[:, None]
+        surface_x = self._surface_x
+        surface_y = self._surface_y
+        has_vertex0 = index > 0
+        has_vertex3 = index + 2 <= self._edge_count[row]
+        v1x, v1y = surface_x[row, index], surface_y[row, index]
+        v2x, v2y = surface_x[row, index + 1], surface_y[row, index + 1]
+        before = np.maximum(index - 1, 0)
+        after = np.minimum(index + 2, self.terrain_capacity - 1)
+        # a missing neighbour continues the edge, so its unused normal is still defined
+        v0x = np.where(has_vertex0, surface_x[row, before], 2.0 * v1x - v2x)
+        v0y = np.where(has_vertex0, surface_y[row, before], 2.0 * v1y - v2y)
+        v3x = np.where(has_vertex3, surface_x[row, after], 2.0 * v2x - v1x)
+        v3y = np.where(has_vertex3, surface_y[row, after], 2.0 * v2y - v1y)
+        return v0x, v0y, v1x, v1y, v2x, v2y, v3x, v3y, has_vertex0, has_vertex3, valid
+
+    @staticmethod
+    def _edge_case(edges, center_x, center_y):
+        """
+        b2EPCollider's view of each edge from the lander's centre: whether it
+        is on the front side, the collision normal and its lower and upper limits.
+        """
+        v0x, v0y, v1x, v1y, v2x, v2y, v3x, v3y, has_vertex0, has_vertex3, _ = edges
+        e0x, e0y = _unit(v1x - v0x, v1y - v0y)
+        e1x, e1y = _unit(v2x - v1x, v2y - v1y)
+        e2x, e2y = _unit(v3x - v2x, v3y - v2y)
+        convex1 = e0x * e1y - e0y * e1x >= 0.0
+        convex2 = e1x * e2y - e1y * e2x > 0.0
+        # each edge's normal is (e.y, -e.x), pointing below the terrain
+        front0 = e0y * (center_x - v0x) - e0x * (center_y - v0y) >= 0.0
+        front1 = e1y * (center_x - v1x) - e1x * (center_y - v1y) >= 0.0
+        front2 = e2y * (center_x - v2x) - e2x * (center_y - v2y) >= 0.0
+
+        case = np.where(has_vertex0 & has_vertex3,
+                        np.where(convex1, np.where(convex2, 0, 1), np.where(convex2, 2, 3)),
+                        np.where(has_vertex0, np.where(convex1, 4, 5),
+                                 np.where(has_vertex3, np.where(convex2, 6, 7), 8)))
+        front = np.choose(case, [front0 | front1 | front2, front0 | (front1 & front2),
+                                 front2 | (front0 & front1), front0 & front1 & front2,
+                                 front0 | front1, front0 & front1, front1 | front2, front1 & front2, front1])
+        limits = EDGE_LIMITS[case]
+        lower = np.where(front, limits[..., 0], limits[..., 2])
+        upper = np.where(front, limits[..., 1], limits[..., 3])
+        normals_x = (e0y, e1y, e2y)
+        normals_y = (-e0x, -e1x, -e2x)
+
+        def limit(code):
+            index = np.abs(code) - 1
+            sign = np.sign(code)
+            return sign * np.choose(index, normals_x), sign * np.choose(index, normals_y)
+
+        sign = np.where(front, 1.0, -1.0)
+        return front, sign * e1y, -sign * e1x, limit(lower), limit(upper)
+
+    def _collide(self, edges, position, angle):
+        """
+        b2CollideEdgeAndPolygon between each lander (rows of position, angle)
+        and its edges (see _edges), shaped (n, C). Returns the manifolds:
+        anchor_x, anchor_y (on the lander, in its frame) and world_x, world_y
+        (on the ground) as (n, C, 2) point slots, normal_x, normal_y (from the
+        ground towards the lander; in the lander's frame where body_normal is
+        set, Box2D's e_faceB), body_normal, points (0-2, from slot 0 on) and
+        ids (the points' b2ContactID keys).
+        """
+        n, width = edges[0].shape
+        cos = np.cos(angle)[:, None, None]
+        sin = np.sin(angle)[:, None, None]
+        shape = (n, width, 4)
+        # the lander's vertices and face normals in world space, (n, C, 4)
+        vertex_x = np.broadcast_to(position[:, 0, None, None] + cos * LANDER_CORNERS[:, 0]
+                                   - sin * LANDER_CORNERS[:, 1], shape)
+        vertex_y = np.broadcast_to(position[:, 1, None, None] + sin * LANDER_CORNERS[:, 0]
+                                   + cos * LANDER_CORNERS[:, 1], shape)
+        face_x = np.broadcast_to(cos * LANDER_NORMALS[:, 0] - sin * LANDER_NORMALS[:, 1], shape)
+        face_y = np.broadcast_to(sin * LANDER_NORMALS[:, 0] + cos * LANDER_NORMALS[:, 1], shape)
+        v1x, v1y, v2x, v2y = edges[2][..., None], edges[3][..., None], edges[4][..., None], edges[5][..., None]
+
+        front, normal_x, normal_y, (lower_x, lower_y), (upper_x, upper_y) = self._edge_case(
+            edges, position[:, 0, None], position[:, 1, None])
+        nx = normal_x[..., None]
+        ny = normal_y[..., None]
+        edge_separation = (nx * (vertex_x - v1x) + ny * (vertex_y - v1y)).min(axis=-1)
+
+        # the lander's faces as separating axes, within the normal limits
+        separation = np.minimum(face_x * (v1x - vertex_x) + face_y * (v1y - vertex_y),
+                                face_x * (v2x - vertex_x) + face_y * (v2y - vertex_y))
+        upper_side = face_x * ny - face_y * nx >= 0.0
+        limit_x = np.where(upper_side, upper_x[..., None], lower_x[..., None])
+        limit_y = np.where(upper_side, upper_y[..., None], lower_y[..., None])
+        allowed = (-face_x - limit_x) * nx + (-face_y - limit_y) * ny >= -ANGULAR_SLOP
+        candidates = np.where(allowed, separation, -np.inf)
+        face = candidates.argmax(axis=-1)
+        face_separation = _pick(candidates, face)
+        touching = (edges[10] & (edge_separation <= CONTACT_RADIUS)
+                    & ~(separation > CONTACT_RADIUS).any(axis=-1))
+        # hysteresis towards the edge's own normal
+        face_b = allowed.any(axis=-1) & (face_separation > 0.98 * edge_separation + 0.001)
+
+        # e_faceA: the lander face most against the edge normal is clipped to
+        # the edge; e_faceB: the edge is clipped to the lander's face
+        incident = (nx * face_x + ny * face_y).argmin(axis=-1)
+        after_incident = (incident + 1) % 4
+        after_face = (face + 1) % 4
+        v1x, v1y, v2x, v2y = edges[2:6]
+        face_id = (face << 8) | FACE_B
+        first = (np.where(face_b, v1x, _pick(vertex_x, incident)), np.where(face_b, v1y, _pick(vertex_y, incident)),
+                 np.where(face_b, face_id, (incident << 8) | FACE_A))
+        second = (np.where(face_b, v2x, _pick(vertex_x, after_incident)),
+                  np.where(face_b, v2y, _pick(vertex_y, after_incident)),
+                  np.where(face_b, face_id, (after_incident << 8) | FACE_A))
+        reference1_x = np.where(face_b, _pick(vertex_x, face), np.where(front, v1x, v2x))
+        reference1_y = np.where(face_b, _pick(vertex_y, face), np.where(front, v1y, v2y))
+        reference2_x = np.where(face_b, _pick(vertex_x, after_face), np.where(front, v2x, v1x))
+        reference2_y = np.where(face_b, _pick(vertex_y, after_face), np.where(front, v2y, v1y))
+        reference_x = np.where(face_b, _pick(face_x, face), normal_x)
+        reference_y = np.where(face_b, _pick(face_y, face), normal_y)
+        index1 = np.where(face_b, face, np.where(front, 0, 1))
+        index2 = np.where(face_b, after_face, np.where(front, 1, 0))
+
+        side_x = reference_y
+        side_y = -reference_x
+        first, second, kept1 = _clip(first, second, side_x, side_y,
+                                     side_x * reference1_x + side_y * reference1_y, index1)
+        first, second, kept2 = _clip(first, second, -side_x, -side_y,
+                                     -side_x * reference2_x - side_y * reference2_y, index2)
+        touching &= kept1 & kept2
+        keep0 = touching & (reference_x * (first[0] - reference1_x)
+                            + reference_y * (first[1] - reference1_y) <= CONTACT_RADIUS)
+        keep1 = touching & (reference_x * (second[0] - reference1_x)
+                            + reference_y * (second[1] - reference1_y) <= CONTACT_RADIUS)
+        clip_x = np.stack([np.where(keep0, first[0], second[0]), second[0]], axis=-1)
+        clip_y = np.stack([np.where(keep0, first[1], second[1]), second[1]], axis=-1)
+        ids = np.stack([np.where(keep0, first[2], second[2]), second[2]], axis=-1)
+        points = keep0.astype(np.int64) + keep1
+
+        # e_faceA keeps the clip points on the lander and the edge as the plane;
+        # e_faceB the lander's reference vertex and the clip points on the edge
+        body_normal = face_b[..., None]
+        dx = clip_x - position[:, 0, None, None]
+        dy = clip_y - position[:, 1, None, None]
+        anchor_x = np.where(body_normal, LANDER_CORNERS[face, 0][..., None], cos * dx + sin * dy)
+        anchor_y = np.where(body_normal, LANDER_CORNERS[face, 1][..., None], cos * dy - sin * dx)
+        world_x = np.where(body_normal, clip_x, reference1_x[..., None])
+        world_y = np.where(body_normal, clip_y, reference1_y[..., None])
+        normal_x = np.where(face_b, -LANDER_NORMALS[face, 0], reference_x)
+        normal_y = np.where(face_b, -LANDER_NORMALS[face, 1], reference_y)
+        ids = np.where(body_normal, _swap_features(ids), ids)
+        return anchor_x, anchor_y, world_x, world_y, normal_x, normal_y, face_b, points, ids
+
+    def _edge_distance(self, edges, position, angle):
+        """
+        Distance between the lander's core and each edge, as b2Distance gives
+        b2TimeOfImpact: 0 where they overlap, inf for missing edges.
+        position is (n, 1 or C, 2) and angle (n, 1 or C) for edges shaped (n, C).
+        """
+        v1x, v1y, v2x, v2y = edges[2:6]
+        cos = np.cos(angle)
+        sin = np.sin(angle)
+        x = position[..., 0]
+        y = position[..., 1]
+        corner_x = x[..., None] + cos[..., None] * LANDER_CORNERS[:, 0] - sin[..., None] * LANDER_CORNERS[:, 1]
+        corner_y = y[..., None] + sin[..., None] * LANDER_CORNERS[:, 0] + cos[..., None] * LANDER_CORNERS[:, 1]
+
+        # the corners against the edge
+        edge_x = (v2x - v1x)[..., None]
+        edge_y = (v2y - v1y)[..., None]
+        offset_x = corner_x - v1x[..., None]
+        offset_y = corner_y - v1y[..., None]
+        t = np.clip((offset_x * edge_x + offset_y * edge_y) / (edge_x * edge_x + edge_y * edge_y), 0.0, 1.0)
+        distance = np.sqrt(((offset_x - t * edge_x) ** 2 + (offset_y - t * edge_y) ** 2).min(axis=-1))
+        side = offset_x * edge_y - offset_y * edge_x
+        separated = (side > 0.0).all(axis=-1) | (side < 0.0).all(axis=-1)
+
+        # the edge's ends against the box, in the lander's frame
+        beyond = []
+        for vx, vy in ((v1x, v1y), (v2x, v2y)):
+            local_x = cos * (vx - x) + sin * (vy - y)
+            local_y = cos * (vy - y) - sin * (vx - x)
+            gap_x = np.maximum(np.abs(local_x) - LANDER_HALF_WIDTH, 0.0)
+            gap_y = np.maximum(np.abs(local_y) - LANDER_HALF_HEIGHT, 0.0)
+            distance = np.minimum(distance, np.hypot(gap_x, gap_y))
+            beyond.append((local_x > LANDER_HALF_WIDTH, local_x < -LANDER_HALF_WIDTH,
+                           local_y > LANDER_HALF_HEIGHT, local_y < -LANDER_HALF_HEIGHT))
+        for end1, end2 in zip(*beyond):
+            separated |= end1 & end2
+        return np.where(edges[10], np.where(separated, distance, 0.0), np.inf)
+
+    def _update_contacts(self, rows, position, angle, columns=None):
+        """
+        b2Contact::Update for the contacts of the envs in rows (the given
+        contact columns, (len(rows), m), or all) with the landers at these
+        poses: new manifolds, each point taking the impulses of the old point
+        with the same id. Returns the manifolds (see _collide).
+        """
+        if columns is None:
+            width = max(int((self._contact_edge[rows] >= 0).sum(axis=1).max(initial=0)), 1)
+            columns = np.broadcast_to(np.arange(width), (len(rows), width))
+        row = rows[:, None]
+        manifold = self._collide(self._edges(rows, self._contact_edge[row, columns]), position, angle)
+        points, ids = manifold[7], manifold[8]
+
+        old_ids = self._contact_id[row, columns]
+        old_points = self._contact_points[row, columns]
+        match = ((ids[..., :, None] == old_ids[..., None, :])
+                 & (np.arange(2) < old_points[..., None, None]) & (np.arange(2) < points[..., None])[..., None])
+        found = match.any(axis=-1)
+        source = match.argmax(axis=-1)
+        for impulse in (self._normal_impulse, self._tangent_impulse):
+            impulse[row, columns] = np.where(found, np.take_along_axis(impulse[row, columns], source, axis=-1), 0.0)
+        self._contact_points[row, columns] = points
+        self._contact_id[row, columns] = ids
+        return manifold
+
+    def _drop_stale_contacts(self, rows):
+        """b2ContactManager::Collide's cleanup: contacts whose fat AABBs no longer overlap go."""
+        edge = self._contact_edge[rows]
+        keep = (edge >= 0) & np.take_along_axis(self._overlaps(rows), np.maximum(edge, 0), axis=1)
+        if keep.all(axis=None, where=edge >= 0):
+            return
+        order = np.argsort(~keep, axis=1, kind='stable')
+        row = rows[:, None]
+        for values in (self._contact_edge, self._contact_points, self._contact_id,
+                       self._normal_impulse, self._tangent_impulse):
+            values[rows] = values[row, order]
+        self._contact_edge[rows] = np.where(np.take_along_axis(keep, order, axis=1), self._contact_edge[rows], -1)
+
+    @staticmethod
+    def _contact_frame(position, angle, manifold):
+        """
+        World-space lander points, normals and core separations of the
+        manifold points (see _collide) with the landers at the given poses.
+        """
+        anchor_x, anchor_y, world_x, world_y, normal_x, normal_y, body_normal = manifold
+        shape = (-1,) + (1,) * (anchor_x.ndim - 1)
+        cos = np.cos(angle).reshape(shape)
+        sin = np.sin(angle).reshape(shape)
+        lander_x = position[:, 0].reshape(shape) + cos * anchor_x - sin * anchor_y
+        lander_y = position[:, 1].reshape(shape) + sin * anchor_x + cos * anchor_y
+        normal_x, normal_y = (np.where(body_normal, cos * normal_x - sin * normal_y, normal_x),
+                              np.where(body_normal, sin * normal_x + cos * normal_y, normal_y))
+        distance = (lander_x - world_x) * normal_x + (lander_y - world_y) * normal_y
+        return lander_x, lander_y, normal_x, normal_y, distance
+
+    def _solve_positions(self, position, angle, manifold, baumgarte, iterations, tolerance):
+        """
+        b2ContactSolver::SolvePositionConstraints (or its TOI variant, by the
+        constants given) over the contacts of manifold in order, one point at
+        a time, moving position and angle in place. Each lander stops after
+        the pass that finds all its separations above -tolerance, like a Box2D island.
+        """
+        anchor_x, anchor_y, world_x, world_y, normal_x, normal_y, body_normal, points = manifold[:8]
+        solving = (points > 0).any(axis=1)
+        for _ in range(iterations):
+            if not solving.any():
+                break
+            min_separation = np.zeros(len(position))
+            for j in range(points.shape[1]):
+                for k in range(2):
+                    active = solving & (points[:, j] > k)
+                    if not active.any():
+                        continue
+                    column = (anchor_x[:, j, k], anchor_y[:, j, k], world_x[:, j, k], world_y[:, j, k],
+                              normal_x[:, j], normal_y[:, j], body_normal[:, j])
+                    lander_x, lander_y, nx, ny, distance = self._contact_frame(position, angle, column)
+                    # e_faceB pushes from the point on the edge
+                    point_x = np.where(body_normal[:, j], world_x[:, j, k], lander_x)
+                    point_y = np.where(body_normal[:, j], world_y[:, j, k], lander_y)
+                    separation = np.where(active, distance - CONTACT_RADIUS, 0.0)
+                    min_separation = np.minimum(min_separation, separation)
+                    correction = np.clip(baumgarte * (separation + LINEAR_SLOP), -MAX_LINEAR_CORRECTION, 0.0)
+                    rn = (point_x - position[:, 0]) * ny - (point_y - position[:, 1]) * nx
+                    impulse = -correction / (1.0 / LANDER_MASS + rn * rn / LANDER_INERTIA)
+                    position[:, 0] += impulse * nx / LANDER_MASS
+                    position[:, 1] += impulse * ny / LANDER_MASS
+                    angle += impulse * rn / LANDER_INERTIA
+            solving &= min_separation < -tolerance
+
+    def _solve_velocities(self, position, angle, manifold, vel, omega, normal_impulse, tangent_impulse,
+                          warm_start):
+        """
+        b2ContactSolver's velocity phase over the contacts of manifold in
+        order: friction, then the normal impulse, with Box2D's block solver
+        for two-point manifolds. Updates vel, omega and the (n, C, 2) impulses
+        in place, starting from those impulses if warm_start, from zero
+        otherwise. Restitution is 0, so there is no velocity bias.
+        """
+        points = manifold[7]
+        lander_x, lander_y, nx, ny, distance = self._contact_frame(
+            position, angle, manifold[:4] + (manifold[4][..., None], manifold[5][..., None], manifold[6][..., None]))
+        # b2WorldManifold puts each point halfway between the two surfaces
+        half = 0.5 * distance
+        world_x, world_y = manifold[2], manifold[3]
+        body_normal = manifold[6][..., None]
+        r_x = np.where(body_normal, world_x + half * nx, lander_x - half * nx) - position[:, 0, None, None]
+        r_y = np.where(body_normal, world_y + half * ny, lander_y - half * ny) - position[:, 1, None, None]
+        nx = nx[..., 0]
+        ny = ny[..., 0]
+        rn = r_x * ny[..., None] - r_y * nx[..., None]
+        rt = -r_x * nx[..., None] - r_y * ny[..., None]
+        k_normal = 1.0 / LANDER_MASS + rn * rn / LANDER_INERTIA
+        normal_mass = 1.0 / k_normal
+        tangent_mass = 1.0 / (1.0 / LANDER_MASS + rt * rt / LANDER_INERTIA)
+        k11 = k_normal[..., 0]
+        k22 = k_normal[..., 1]
+        k12 = 1.0 / LANDER_MASS + rn[..., 0] * rn[..., 1] / LANDER_INERTIA
+        determinant = k11 * k22 - k12 * k12
+        block = (points == 2) & (k11 * k11 < MAX_CONDITION_NUMBER * determinant)
+        solved = np.where((points == 2) & ~block, 1, points)
+        active = np.arange(2) < solved[..., None]
+        inverse = np.where(block, 1.0 / np.where(block, determinant, 1.0), 0.0)
+
+        if not warm_start:
+            normal_impulse[active] = 0.0
+            tangent_impulse[active] = 0.0
+        else:
+            impulse_x = np.where(active, normal_impulse * nx[..., None] + tangent_impulse * ny[..., None], 0.0)
+            impulse_y = np.where(active, normal_impulse * ny[..., None] - tangent_impulse * nx[..., None], 0.0)
+            vel[:, 0] += impulse_x.sum(axis=(1, 2)) / LANDER_MASS
+            vel[:, 1] += impulse_y.sum(axis=(1, 2)) / LANDER_MASS
+            omega += (r_x * impulse_y - r_y * impulse_x).sum(axis=(1, 2)) / LANDER_INERTIA
+
+        def apply(j, k, impulse_x, impulse_y):
+            vel[:, 0] += impulse_x / LANDER_MASS
+            vel[:, 1] += impulse_y / LANDER_MASS
+            omega[:] += (r_x[:, j, k] * impulse_y - r_y[:, j, k] * impulse_x) / LANDER_INERTIA
+
+        def normal_speed(j, k):
+            return ((vel[:, 0] - omega * r_y[:, j, k]) * nx[:, j]
+                    + (vel[:, 1] + omega * r_x[:, j, k]) * ny[:, j])
+
+        for _ in range(VELOCITY_ITERATIONS):
+            for j in range(points.shape[1]):
+                # friction, tangent = (normal.y, -normal.x)
+                for k in range(2):
+                    on = active[:, j, k]
+                    if not on.any():
+                        continue
+                    tangent_speed = ((vel[:, 0] - omega * r_y[:, j, k]) * ny[:, j]
+                                     - (vel[:, 1] + omega * r_x[:, j, k]) * nx[:, j])
+                    max_friction = CONTACT_FRICTION * normal_impulse[:, j, k]
+                    total = np.clip(tangent_impulse[:, j, k] - tangent_mass[:, j, k] * tangent_speed,
+                                    -max_friction, max_friction)
+                    change = np.where(on, total - tangent_impulse[:, j, k], 0.0)
+                    tangent_impulse[:, j, k] += change
+                    apply(j, 0 if k == 0 else 1, change * ny[:, j], -change * nx[:, j])
+
+                single = active[:, j, 0] & ~block[:, j]
+                if single.any():
+                    total = np.maximum(normal_impulse[:, j, 0] - normal_mass[:, j, 0] * normal_speed(j, 0), 0.0)
+                    change = np.where(single, total - normal_impulse[:, j, 0], 0.0)
+                    normal_impulse[:, j, 0] += change
+                    apply(j, 0, change * nx[:, j], change * ny[:, j])
+                if block[:, j].any():
+                    old0 = normal_impulse[:, j, 0]
+                    old1 = normal_impulse[:, j, 1]
+                    b0 = normal_speed(j, 0) - (k11[:, j] * old0 + k12[:, j] * old1)
+                    b1 = normal_speed(j, 1) - (k12[:, j] * old0 + k22[:, j] * old1)
+                    # both points resting, then only the first, only the second, neither
+                    both0 = -inverse[:, j] * (k22[:, j] * b0 - k12[:, j] * b1)
+                    both1 = -inverse[:, j] * (k11[:, j] * b1 - k12[:, j] * b0)
+                    first0 = -normal_mass[:, j, 0] * b0
+                    second1 = -normal_mass[:, j, 1] * b1
+                    cases = [(both0 >= 0) & (both1 >= 0),
+                             (first0 >= 0) & (k12[:, j] * first0 + b1 >= 0),
+                             (second1 >= 0) & (k12[:, j] * second1 + b0 >= 0),
+                             (b0 >= 0) & (b1 >= 0)]
+                    new0 = np.select(cases, [both0, first0, 0.0, 0.0], default=old0)
+                    new1 = np.select(cases, [both1, 0.0, second1, 0.0], default=old1)
+                    change0 = np.where(block[:, j], new0 - old0, 0.0)
+                    change1 = np.where(block[:, j], new1 - old1, 0.0)
+                    normal_impulse[:, j, 0] += change0
+                    normal_impulse[:, j, 1] += change1
+                    apply(j, 0, change0 * nx[:, j], change0 * ny[:, j])
+                    apply(j, 1, change1 * nx[:, j], change1 * ny[:, j])
+
+    def _island(self, rows, manifold, first=None):
+        """
+        Order of the touching contacts of the envs in rows in a Box2D
+        island: the lander's contact list, newest first, behind first (a
+        column per row) if given. Returns the manifold and impulses in that
+        order and the column of each entry.
+        """
+        points = manifold[7]
+        n, width = points.shape
+        column = np.arange(width)
+        key = np.where(points > 0, width - 1 - column, width + column)
+        if first is not None:
+            key = np.where(column == first[:, None], -1, key)
+        order = np.argsort(key, axis=1)[:, :max(int((points > 0).sum(axis=1).max(initial=0)), 1)]
+        manifold = tuple(np.take_along_axis(values, order if values.ndim == 2 else order[..., None], axis=1)
+                         for values in manifold)
+        row = rows[:, None]
+        return manifold, self._normal_impulse[row, order], self._tangent_impulse[row, order], order
+
+    def step(self):
+        dt = self.time_step
+        vel = self.linear_velocity
+        self._start_position[:] = self.position
+        self._start_angle[:] = self.angle
+
+        # b2ContactManager::Collide: contacts that left the broadphase go, the
+        # rest get manifolds at the start of the step
+        rows = np.flatnonzero((self._contact_edge[:, 0] >= 0) & ~self.game_over)
+        if len(rows):
+            self._drop_stale_contacts(rows)
+            position = self.position[rows]
+            angle = self.angle[rows]
+            manifold, normal_impulse, tangent_impulse, order = self._island(
+                rows, self._update_contacts(rows, position, angle))
+
+        vel += dt * self._force / LANDER_MASS
+        vel[:, 1] += dt * GRAVITY
+        self.angular_velocity += dt * self._torque / LANDER_INERTIA
+        # pybox2d 2.3 damping: v *= clamp(1 - h * c, 0, 1)
+        vel *= min(max(1.0 - dt * LINEAR_DAMPING, 0.0), 1.0)
+        self.angular_velocity *= min(max(1.0 - dt * ANGULAR_DAMPING, 0.0), 1.0)
+
+        if len(rows):
+            rows_vel = vel[rows]
+            rows_omega = self.angular_velocity[rows]
+            self._solve_velocities(position, angle, manifold, rows_vel, rows_omega, normal_impulse,
+                                   tangent_impulse, warm_start=True)
+            vel[rows] = rows_vel
+            self.angular_velocity[rows] = rows_omega
+            self._normal_impulse[rows[:, None], order] = normal_impulse
+            self._tangent_impulse[rows[:, None], order] = tangent_impulse
+
+        self._integrate(self.position, self.angle, vel, self.angular_velocity, dt)
+        self._force[:] = 0.0
+        self._torque[:] = 0.0
+
+        if len(rows):
+            # the position solver works on the moved landers
+            position = self.position[rows]
+            angle = self.angle[rows]
+            self._solve_positions(position, angle, manifold, BAUMGARTE, POSITION_ITERATIONS, 3.0 * LINEAR_SLOP)
+            self.position[rows] = position
+            self.angle[rows] = angle
+
+        in_play = np.flatnonzero(~self.game_over)
+        self._synchronize(in_play, self._start_position[in_play], self._start_angle[in_play],
+                          self.position[in_play], self.angle[in_play])
+        self._solve_toi(np.flatnonzero((self._contact_edge[:, 0] >= 0) & ~self.game_over))
+        self.check_landing(~self.game_over)
+
+    @staticmethod
+    def _integrate(position, angle, vel, omega, dt):
+        """b2Island's position update with the per-step motion limits, in place."""
+        translation = dt * np.sqrt(np.einsum('ij,ij->i', vel, vel))
+        too_fast = translation > MAX_TRANSLATION
+        if too_fast.any():
+            vel[too_fast] *= (MAX_TRANSLATION / translation[too_fast])[:, None]
+        rotation = dt * np.abs(omega)
+        too_fast = rotation > MAX_ROTATION
+        if too_fast.any():
+            omega[too_fast] *= MAX_ROTATION / rotation[too_fast]
+        position += (dt * vel if np.ndim(dt) == 0 else dt[:, None] * vel)
+        angle += dt * omega
+
+    def _time_of_impact(self, edges, start_position, start_angle, position, angle, crossing):
+        """
+        Fraction of each lander's sweep from the start to the end pose at
+        which it comes within TOI_TARGET of each of its edges, for the
+        (n, C) entries set in crossing (the others come out as 0).
+        """
+        # bisect only the crossing entries, one (lander, edge) pair per row
+        row, column = np.nonzero(crossing)
+        edges = tuple(values[row, column][:, None] for values in edges)
+        start_position = start_position[row]
+        start_angle = start_angle[row]
+        motion = position[row] - start_position
+        rotation = angle[row] - start_angle
+        low = np.zeros(len(row))
+        high = np.ones(len(row))
+        for _ in range(TOI_BISECTIONS):
+            mid = 0.5 * (low + high)
+            distance = self._edge_distance(edges, (start_position + mid[:, None] * motion)[:, None],
+                                           (start_angle + mid * rotation)[:, None])[:, 0]
+            above = distance > TOI_TARGET
+            low = np.where(above, mid, low)
+            high = np.where(above, high, mid)
+        t = np.zeros(crossing.shape)
+        t[row, column] = low
+        return t
+
+    def _solve_toi(self, rows):
+        """
+        b2World::SolveTOI for the landers in rows, which have ground
+        contacts: until no contact reaches TOI_TARGET within the rest of
+        the step, move the lander back to the earliest time of impact (the
+        newest contact on ties), update its contacts there, push it out and
+        solve them like b2Island::SolveTOI, and integrate the rest of the
+        step from there. A contact that has no manifold at its impact sits
+        the step out, and each gets at most MAX_SUB_STEPS + 1 impacts.
+        """
+        if not len(rows):
+            return
+        sweep_position = self._start_position[rows]
+        sweep_angle = self._start_angle[rows]
+        position = self.position[rows]
+        angle = self.angle[rows]
+        vel = self.linear_velocity[rows]
+        omega = self.angular_velocity[rows]
+        alpha0 = np.zeros(len(rows))
+        impacts = np.zeros((len(rows), CONTACT_CAPACITY), dtype=np.int64)
+        enabled = np.ones((len(rows), CONTACT_CAPACITY), dtype=bool)
+
+        pending = np.arange(len(rows))
+        while len(pending):
+            active = pending
+            lanes = rows[active]
+            width = max(int((self._contact_edge[lanes] >= 0).sum(axis=1).max(initial=0)), 1)
+            edges = self._edges(lanes, self._contact_edge[lanes, :width])
+            candidate = edges[10] & enabled[active, :width] & (impacts[active, :width] <= MAX_SUB_STEPS)
+            start_distance = self._edge_distance(edges, sweep_position[active, None], sweep_angle[active, None])
+            end_distance = self._edge_distance(edges, position[active, None], angle[active, None])
+            # b2TimeOfImpact: touching at the start is an impact there, an
+            # overlap at the start or an end within tolerance none at all
+            touching = candidate & (start_distance > 0.0) & (start_distance < TOI_TARGET + TOI_TOLERANCE)
+            crossing = (candidate & (start_distance >= TOI_TARGET + TOI_TOLERANCE)
+                        & (end_distance < TOI_TARGET - TOI_TOLERANCE))
+            t = np.where(touching | crossing, 0.0, 1.0)
+            if crossing.any():
+                t += self._time_of_impact(edges, sweep_position[active], sweep_angle[active], position[active],
+                                          angle[active], crossing)
+            contact = width - 1 - t[:, ::-1].argmin(axis=1)
+            t = t[np.arange(len(active)), contact]
+            alpha = alpha0[active] + (1.0 - alpha0[active]) * t
+            event = (t < 1.0) & (alpha < 1.0 - 10.0 * FLOAT32_EPSILON)
+            # landers without an impact are done; the others go round again after this one
+            pending = active = active[event]
+            lanes, contact, t, alpha = lanes[event], contact[event], t[event], alpha[event]
+            if not len(active):
+                break
+
+            toi_position = sweep_position[active] + t[:, None] * (position[active] - sweep_position[active])
+            toi_angle = sweep_angle[active] + t * (angle[active] - sweep_angle[active])
+            impacts[active, contact] += 1
+            points = self._update_contacts(lanes, toi_position, toi_angle, contact[:, None])[7][:, 0]
+            # no manifold: the contact sits out the rest of the step, the sweep stays
+            enabled[active[points == 0], contact[points == 0]] = False
+            solid = points > 0
+            active, lanes, contact, alpha = active[solid], lanes[solid], contact[solid], alpha[solid]
+            if not len(active):
+                continue
+            toi_position = toi_position[solid]
+            toi_angle = toi_angle[solid]
+
+            # the island: the impact contact, then the others touching at the impact
+            manifold, normal_impulse, tangent_impulse, order = self._island(
+                lanes, self._update_contacts(lanes, toi_position, toi_angle), contact)
+            enabled[active] = True
+            self._solve_positions(toi_position, toi_angle, manifold, TOI_BAUMGARTE, TOI_POSITION_ITERATIONS,
+                                  1.5 * LINEAR_SLOP)
+            # the sub-step's impulses are not kept for warm starting
+            toi_vel = vel[active]
+            toi_omega = omega[active]
+            self._solve_velocities(toi_position, toi_angle, manifold, toi_vel, toi_omega, normal_impulse,
+                                   tangent_impulse, warm_start=False)
+
+            end_position = toi_position.copy()
+            end_angle = toi_angle.copy()
+            self._integrate(end_position, end_angle, toi_vel, toi_omega, (1.0 - alpha) * self.time_step)
+            sweep_position[active] = toi_position
+            sweep_angle[active] = toi_angle
+            position[active] = end_position
+            angle[active] = end_angle
+            vel[active] = toi_vel
+            omega[active] = toi_omega
+            alpha0[active] = alpha
+            self._synchronize(lanes, toi_position, toi_angle, end_position, end_angle)
+
+        self.position[rows] = position
+        self.angle[rows] = angle
+        self.linear_velocity[rows] = vel
+        self.angular_velocity[rows] = omega
+
+    def check_landing(self, mask):
+        """Vectorized PhysicsWorld.check_landing for the envs selected by mask."""
+        x = self.position[:, 0]
+        y = self.position[:, 1]
+        out_of_bounds = (np.abs(x) > 21) | (y < -20) | (y > 30)
+
+        cos = np.cos(self.angle)[:, None]
+        sin = np.sin(self.angle)[:, None]
+        corner_x = x[:, None] + cos * LANDER_CORNERS[:, 0] - sin * LANDER_CORNERS[:, 1]
+        corner_y = y[:, None] + sin * LANDER_CORNERS[:, 0] + cos * LANDER_CORNERS[:, 1]
+        collision = (corner_y <= self.ground_height(corner_x) + 0.1).any(axis=1)
+
+        wrapped_angle = np.mod(self.angle + math.pi, 2 * math.pi) - math.pi
+        speed = np.sqrt(np.einsum('ij,ij->i', self.linear_velocity, self.linear_velocity))
+        success = ((speed < 6.0) & (np.abs(wrapped_angle) < 0.4) &
+                   (self.landing_left <= x) & (x <= self.landing_right))
+
+        landed = (out_of_bounds | collision) & mask
+        self.has_landed[mask] = landed[mask]
+        self.game_over |= landed
+        self.landed_successfully[mask] = (landed & ~out_of_bounds & success)[mask]
+
+
+class VectorLane:
+    """
+    One env of a VectorLunarLanderEnv, as get_attr/set_attr/env_method see
+    it: a view over row index of the env's arrays. Only what is really kept
+    per env is here; other names raise AttributeError.
+    """
+
+    __slots__ = ("env", "index")
+
+    def __init__(self, env, index):
+        self.env = env
+        self.index = index
+
+    def __getattr__(self, name):
+        raise AttributeError(f"{name!r} is not a per-env attribute or method of VectorLunarLanderEnv")
+
+    @property
+    def steps(self):
+        return int(self.env.steps[self.index])
+
+    @property
+    def game_over(self):
+        return bool(self.env.physics.game_over[self.index])
+
+    @property
+    def landed_successfully(self):
+        return bool(self.env.physics.landed_successfully[self.index])
+
+    def reset(self, seed=None):
+        """Start a new episode in this env only and return its observation."""
+        if seed is not None:
+            self.env._seeds[self.index] = seed
+        self.env._reset_envs([self.index])
+        return self.env._get_obs()[self.index]
+
+    def set_state(self, state):
+        """Load a LunarLanderEnv.get_state() snapshot into this env and return its observation."""
+        return self.env.set_state(state, indices=[self.index])[self.index]
+
+
+class VectorLunarLanderEnv(LaneVecEnv):
+    """
+    num_envs LunarLanderEnv copies stepped together on VectorPhysics.
+
+    Episodes auto-reset like DummyVecEnv: the final observation of a finished
+    episode is in info["terminal_observation"] and obs holds the new episode.
+    A seed set for env i after reset() (in self._seeds) is used by that env's
+    next auto-reset. get_attr/set_attr/env_method reach one env through a
+    VectorLane.
+    """
+
+    MAX_STEPS = 1000
+
+    def __init__(self, num_envs, seed=None, terrain_bank=None):
+        self.render_mode = None
+        if isinstance(terrain_bank, str):
+            terrain_bank = TerrainBank(terrain_bank)
+        self.terrain_bank = terrain_bank
+        observation_space = spaces.Box(low=-np.inf, high=np.inf, shape=(6,), dtype=np.float32)
+        action_space = spaces.Box(low=np.array([0.0, -20.0], dtype=np.float32),
+                                  high=np.array([50.0, 20.0], dtype=np.float32),
+                                  dtype=np.float32)
+        super().__init__(num_envs, observation_space, action_space)
+
+        self.physics = VectorPhysics(num_envs)
+        self.steps = np.zeros(num_envs, dtype=np.int64)
+        self._terrain_key = np.zeros(num_envs, dtype=np.int64)  # snapshot terrain loaded by set_state, 0 if none
+        self._rngs = [random.Random() for _ in range(num_envs)]
+        self._actions = np.zeros((num_envs, 2))
+        self._obs = np.zeros((num_envs, 6), dtype=np.float32)
+        if seed is not None:
+            self.seed(seed)
+
+    def _reset_envs(self, indices):
+        # draws terrain exactly like PhysicsWorld.reset, one random stream per env
+        for i in indices:
+            seed = self._seeds[i]
+            if seed is not None:
+                self._rngs[i].seed(seed)
+                self._seeds[i] = None
+            rng = self._rngs[i]
+            if self.terrain_bank is not None:
+                index = (self.terrain_bank.index_for_seed(seed) if seed is not None
+                         else rng.randrange(len(self.terrain_bank)))
+                landing_center, xs, ys = self.terrain_bank.get(index)
+            else:
+                landing_center = rng.uniform(-5, 5)
+                xs, ys = generate_height_profile(GROUND_Y, landing_center, LANDING_ZONE_HALF_WIDTH, rng)
+            self.physics.set_terrain(i, xs, ys, landing_center)
+        self.physics.reset_landers(indices)
+        self.steps[indices] = 0
+        self._terrain_key[indices] = 0
+
+    def _get_obs(self):
+        physics = self.physics
+        center_x = (physics.landing_left + physics.landing_right) / 2.0
+        obs = self._obs
+        obs[:, 0] = physics.position[:, 0] - center_x
+        obs[:, 1] = physics.position[:, 1] - physics.landing_y
+        obs[:, 2:4] = physics.linear_velocity
+        obs[:, 4] = physics.angle
+        obs[:, 5] = physics.angular_velocity
+        return obs.copy()
+
+    def reset(self):
+        self._reset_envs(range(self.num_envs))
+        self._reset_options()
+        self.reset_infos = [{} for _ in range(self.num_envs)]
+        return self._get_obs()
+
+    def set_state(self, state, indices=None):
+        """
+        Fan a LunarLanderEnv.get_state() snapshot out to the envs in indices
+        (all by default), e.g. to roll out many action sequences from one state,
+        or give each its own with a (len(indices), STATE_SIZE) array. Returns
+        the observations of all envs. The snapshot's Box2D contact fields carry
+        over too, so a lander resting on the ground keeps its contacts and
+        warm-start impulses.
+        """
+        state = np.asarray(state)
+        lanes = slice(None) if indices is None else np.atleast_1d(indices)
+        keys = state[..., STATE_TERRAIN].astype(np.int64)
+        stale = keys != self._terrain_key[lanes]
+        if stale.any():
+            lane_ids = np.arange(self.num_envs)[lanes]
+            keys = np.broadcast_to(keys, stale.shape)
+            for key in np.unique(keys[stale]):
+                landing_center, xs, ys = cached_terrain(int(key))
+                for i in lane_ids[stale & (keys == key)]:
+                    self.physics.set_terrain(i, xs, ys, landing_center)
+            self._terrain_key[lane_ids] = keys
+        self.physics.set_landers(lanes, state)
+        self.steps[lanes] = state[..., STATE_STEPS]
+        return self._get_obs()
+
+    def step_async(self, actions):
+        self._actions[:] = np.asarray(actions).reshape(self.num_envs, 2)
+
+    def step_wait(self):
+        physics = self.physics
+        self.steps += 1
+
+        physics.apply_controls(self._actions[:, 0], self._actions[:, 1])
+        physics.step()
+        obs = self._get_obs()
+
+        timeout = self.steps >= self.MAX_STEPS
+
+        # same shaping as LunarLanderEnv.step, including its use of the relative obs
+        center_x = (physics.landing_left + physics.landing_right) / 2.0
+        distance = np.sqrt((obs[:, 0] - center_x) ** 2 + (obs[:, 1] - physics.landing_y) ** 2)
+        rewards = 5.0 - 0.31 * distance - 0.3 * np.abs(obs[:, 3])
+
+        dones = physics.game_over | timeout
+        rewards += np.where(dones, np.where(physics.landed_successfully, 400.0, -100.0), 0.0)
+
+        infos = [
+            {"landed_successfully": bool(landed), "game_over": bool(over), "timeout": bool(t), "distance": float(d)}
+            for landed, over, t, d in zip(physics.landed_successfully, physics.game_over, timeout, distance)
+        ]
+
+        done_indices = np.flatnonzero(dones)
+        if len(done_indices):
+            for i in done_indices:
+                infos[i]["terminal_observation"] = obs[i].copy()
+            self._reset_envs(done_indices)
+            obs[done_indices] = self._get_obs()[done_indices]
+
+        return obs, rewards.astype(np.float32), dones, infos
+
+    def close(self):
+        pass
+
+    def _lane(self, index):
+        return VectorLane(self, index)